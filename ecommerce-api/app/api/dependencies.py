@@ -3,13 +3,17 @@ Dépendances communes pour les routes API
 Authentification, pagination, etc.
 """
 
-from typing import Optional, Annotated
+import functools
+import inspect
+from typing import Any, Callable, Optional, Annotated
 from fastapi import Depends, Query, HTTPException, status
+from fastapi.routing import APIRoute
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.security import get_current_user, RoleChecker
+from app.core.database import get_db, get_read_db, release_request_sessions
+from app.core.security import get_current_user, get_current_principal, Principal, RoleChecker
 from app.models.user import User, UserRole
+from app.utils.pagination import Cursor
 
 
 # ===== Dépendances de base =====
@@ -17,9 +21,48 @@ from app.models.user import User, UserRole
 # Session de base de données
 DatabaseDep = Annotated[AsyncSession, Depends(get_db)]
 
+# Session de lecture (réplica si disponible), routes GET sans écriture
+# Jamais pour alimenter le cache : un réplica en retard y remettrait
+# les données d'avant l'invalidation pour CACHE_TTL
+ReadDatabaseDep = Annotated[AsyncSession, Depends(get_read_db)]
+
+
+def _release_sessions_after(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Enveloppe un handler : ses sessions sont terminées dès son retour"""
+    
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        await release_request_sessions()
+        return result
+    
+    wrapper.releases_sessions = True
+    return wrapper
+
+
+class DatabaseRoute(APIRoute):
+    """
+    Route qui rend les connexions au pool dès la fin du handler
+    
+    Sans elle, les dépendances à yield ne sont terminées qu'après la
+    sérialisation de la réponse : la connexion reste prise pendant
+    la validation du response_model.
+    
+    Usage: APIRouter(..., route_class=DatabaseRoute)
+    """
+    
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "releases_sessions", False):
+            endpoint = _release_sessions_after(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
 # Utilisateur actuel
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
+# Principal (id, rôle, actif) servi depuis le cache, sans session de requête
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+
 
 # ===== Dépendances de rôles =====
 
@@ -52,19 +95,46 @@ StaffUser = Annotated[User, Depends(require_admin_or_manager)]
 # ===== Dépendances de pagination =====
 
 class PaginationParams:
-    """Paramètres de pagination communs"""
+    """
+    Paramètres de pagination communs
+    
+    Deux modes :
+    - offset : page/page_size (OFFSET SQL)
+    - keyset : cursor (renvoyé en next_cursor par la page précédente),
+      dont le coût ne dépend pas de la profondeur de la page
+    """
     
     def __init__(
         self,
         page: int = Query(1, ge=1, description="Numéro de page"),
-        page_size: int = Query(20, ge=1, le=100, description="Taille de page")
+        page_size: int = Query(20, ge=1, le=100, description="Taille de page"),
+        cursor: Optional[str] = Query(
+            None,
+            description="Curseur de la page suivante (remplace page)"
+        ),
+        include_total: bool = Query(
+            True,
+            description="Calculer le nombre total d'éléments (COUNT)"
+        )
     ):
         self.page = page
         self.page_size = page_size
+        self.cursor = cursor
+        self.include_total = include_total
+        
+        try:
+            self.after: Optional[Cursor] = Cursor.decode(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
     
     @property
     def skip(self) -> int:
-        """Calcule l'offset"""
+        """Calcule l'offset (nul en mode curseur)"""
+        if self.after is not None:
+            return 0
         return (self.page - 1) * self.page_size
     
     @property
@@ -169,23 +239,40 @@ CommonParams = Annotated[CommonQueryParams, Depends()]
 
 def create_paginated_response(
     items: list,
-    total: int,
+    total: Optional[int],
     page: int,
-    page_size: int
+    page_size: int,
+    cursor: Optional[str] = None,
+    sort_by: Optional[str] = "created_at"
 ) -> dict:
     """
     Crée une réponse paginée standardisée
     
     Args:
         items: Liste d'items
-        total: Nombre total d'items
+        total: Nombre total d'items (None si non calculé)
         page: Numéro de page actuelle
         page_size: Taille de page
+        cursor: Curseur ayant servi à obtenir cette page (mode keyset)
+        sort_by: Colonne de tri du listing, portée par le curseur
+            (None : tri sans curseur possible, pagination par page)
     
     Returns:
-        Dict avec pagination
+        Dict avec pagination et curseur de la page suivante
     """
-    total_pages = (total + page_size - 1) // page_size
+    page_full = bool(items) and len(items) == page_size
+    
+    next_cursor = None
+    if page_full and sort_by is not None:
+        last = Cursor.from_item(items[-1], sort_by)
+        next_cursor = last.encode() if last else None
+    
+    if total is None:
+        total_pages = None
+        has_next = page_full
+    else:
+        total_pages = (total + page_size - 1) // page_size
+        has_next = next_cursor is not None if cursor else page < total_pages
     
     return {
         "items": items,
@@ -193,6 +280,7 @@ def create_paginated_response(
         "page": page,
         "page_size": page_size,
         "total_pages": total_pages,
-        "has_next": page < total_pages,
-        "has_prev": page > 1
-    }
\ No newline at end of file
+        "has_next": has_next,
+        "has_prev": cursor is not None or page > 1,
+        "next_cursor": next_cursor
+    }
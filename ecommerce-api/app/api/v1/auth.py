@@ -4,10 +4,10 @@ Routes API - Authentification
 Inscription, connexion, tokens, vérification email
 """
 
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.api.dependencies import DatabaseDep, CurrentUser
+from app.api.dependencies import DatabaseDep, DatabaseRoute, CurrentUser
 from app.schemas.auth import (
     LoginRequest,
     LoginResponse,
@@ -30,7 +30,7 @@ from app.services.email import EmailService
 from app.core.security import create_email_verification_token, create_password_reset_token
 
 
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+router = APIRouter(prefix="/auth", tags=["Authentication"], route_class=DatabaseRoute)
 
 
 @router.post(
@@ -41,7 +41,6 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 )
 async def register(
     user_data: UserRegister,
-    background_tasks: BackgroundTasks,
     db: DatabaseDep
 ):
     """
@@ -52,20 +51,16 @@ async def register(
     - Envoie un email de vérification
     """
     auth_service = AuthService(db)
-    email_service = EmailService()
+    email_service = EmailService(db)
     
     # Créer l'utilisateur
     user = await auth_service.register(user_data)
     
-    # Envoyer les emails en arrière-plan
-    background_tasks.add_task(email_service.send_welcome_email, user)
+    # Mettre les emails en file (envoyés par le dispatcher)
+    await email_service.send_welcome_email(user)
     
     verification_token = create_email_verification_token(user.email)
-    background_tasks.add_task(
-        email_service.send_email_verification,
-        user,
-        verification_token
-    )
+    await email_service.send_email_verification(user, verification_token)
     
     return user
 
@@ -179,7 +174,6 @@ async def get_current_user_profile(current_user: CurrentUser):
 )
 async def request_email_verification(
     request: EmailVerificationRequest,
-    background_tasks: BackgroundTasks,
     db: DatabaseDep
 ):
     """
@@ -188,7 +182,7 @@ async def request_email_verification(
     Envoie un lien de vérification à l'email spécifié
     """
     auth_service = AuthService(db)
-    email_service = EmailService()
+    email_service = EmailService(db)
     
     user = await auth_service.get_user_by_email(request.email)
     
@@ -200,11 +194,7 @@ async def request_email_verification(
     
     verification_token = create_email_verification_token(user.email)
     
-    background_tasks.add_task(
-        email_service.send_email_verification,
-        user,
-        verification_token
-    )
+    await email_service.send_email_verification(user, verification_token)
     
     return AuthSuccessResponse(
         message="Email de vérification envoyé"
@@ -241,7 +231,6 @@ async def confirm_email_verification(
 )
 async def request_password_reset(
     request: PasswordResetRequest,
-    background_tasks: BackgroundTasks,
     db: DatabaseDep
 ):
     """
@@ -250,17 +239,13 @@ async def request_password_reset(
     Envoie un email avec un lien de réinitialisation
     """
     auth_service = AuthService(db)
-    email_service = EmailService()
+    email_service = EmailService(db)
     
     try:
         user = await auth_service.get_user_by_email(request.email)
         reset_token = create_password_reset_token(user.email)
         
-        background_tasks.add_task(
-            email_service.send_password_reset,
-            user,
-            reset_token
-        )
+        await email_service.send_password_reset(user, reset_token)
     except:
         # Ne pas révéler si l'email existe (sécurité)
         pass
@@ -6,7 +6,7 @@ Gestion du panier d'achat
 
 from fastapi import APIRouter, HTTPException, status
 
-from app.api.dependencies import DatabaseDep, CurrentUser
+from app.api.dependencies import DatabaseDep, DatabaseRoute, CurrentPrincipal
 from app.schemas.cart import (
     CartResponse,
     CartItemResponse,
@@ -19,7 +19,7 @@ from app.schemas.cart import (
 from app.services.cart import CartService
 
 
-router = APIRouter(prefix="/cart", tags=["Cart"])
+router = APIRouter(prefix="/cart", tags=["Cart"], route_class=DatabaseRoute)
 
 
 @router.get(
@@ -28,7 +28,7 @@ router = APIRouter(prefix="/cart", tags=["Cart"])
     summary="Mon panier"
 )
 async def get_cart(
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     db: DatabaseDep
 ):
     """
@@ -50,7 +50,7 @@ async def get_cart(
     summary="Résumé du panier"
 )
 async def get_cart_summary(
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     db: DatabaseDep
 ):
     """
@@ -75,7 +75,7 @@ async def get_cart_summary(
 )
 async def add_to_cart(
     item_data: AddToCartRequest,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     db: DatabaseDep
 ):
     """
@@ -100,7 +100,7 @@ async def add_to_cart(
 async def update_cart_item(
     item_id: int,
     item_update: UpdateCartItemRequest,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     db: DatabaseDep
 ):
     """
@@ -127,7 +127,7 @@ async def update_cart_item(
 )
 async def remove_from_cart(
     item_id: int,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     db: DatabaseDep
 ):
     """
@@ -148,7 +148,7 @@ async def remove_from_cart(
     summary="Vider le panier"
 )
 async def clear_cart(
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     db: DatabaseDep
 ):
     """
@@ -169,7 +169,7 @@ async def clear_cart(
     summary="Valider le panier"
 )
 async def validate_cart(
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     db: DatabaseDep
 ):
     """
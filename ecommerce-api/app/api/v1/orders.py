@@ -4,12 +4,16 @@ Routes API - Commandes
 Création et gestion des commandes
 """
 
-from typing import Optional
-from fastapi import APIRouter, HTTPException, status, Query, BackgroundTasks
+from typing import List, Optional
+from datetime import date
+from fastapi import APIRouter, HTTPException, status, Query
 
 from app.api.dependencies import (
     DatabaseDep,
+    ReadDatabaseDep,
+    DatabaseRoute,
     CurrentUser,
+    CurrentPrincipal,
     StaffUser,
     PaginationDep,
     create_paginated_response
@@ -19,14 +23,18 @@ from app.schemas.order import (
     OrderResponse,
     OrderDetailResponse,
     OrderUpdateStatus,
+    OrderBulkStatusUpdate,
+    OrderBulkStatusResponse,
     OrderCreatedResponse
 )
 from app.models.order import OrderStatus
+from app.core.metrics import CHECKOUT_DURATION
 from app.services.order import OrderService
 from app.services.email import EmailService
+from app.repositories.user import UserRepository
 
 
-router = APIRouter(prefix="/orders", tags=["Orders"])
+router = APIRouter(prefix="/orders", tags=["Orders"], route_class=DatabaseRoute)
 
 
 # ===== Routes utilisateur =====
@@ -39,7 +47,6 @@ router = APIRouter(prefix="/orders", tags=["Orders"])
 )
 async def create_order(
     order_data: OrderFromCart,
-    background_tasks: BackgroundTasks,
     current_user: CurrentUser,
     db: DatabaseDep
 ):
@@ -53,19 +60,16 @@ async def create_order(
     - Envoie un email de confirmation
     """
     order_service = OrderService(db)
-    email_service = EmailService()
+    email_service = EmailService(db)
     
-    order = await order_service.create_order_from_cart(
-        current_user.id,
-        order_data
-    )
+    with CHECKOUT_DURATION.timer():
+        order = await order_service.create_order_from_cart(
+            current_user.id,
+            order_data
+        )
     
-    # Envoyer l'email de confirmation en arrière-plan
-    background_tasks.add_task(
-        email_service.send_order_confirmation,
-        current_user,
-        order
-    )
+    # Mettre l'email de confirmation en file
+    await email_service.send_order_confirmation(current_user, order)
     
     return OrderCreatedResponse(
         order=order,
@@ -81,28 +85,31 @@ async def create_order(
 )
 async def get_my_orders(
     pagination: PaginationDep,
-    current_user: CurrentUser,
-    db: DatabaseDep
+    current_user: CurrentPrincipal,
+    db: ReadDatabaseDep
 ):
     """
     Récupère les commandes de l'utilisateur connecté
     
     - Historique des commandes
-    - Pagination
+    - Pagination (offset ou curseur)
     """
     order_service = OrderService(db)
     
     orders, total = await order_service.get_user_orders(
         current_user.id,
         pagination.skip,
-        pagination.limit
+        pagination.limit,
+        after=pagination.after,
+        include_total=pagination.include_total
     )
     
     return create_paginated_response(
         items=[OrderResponse.model_validate(o) for o in orders],
         total=total,
         page=pagination.page,
-        page_size=pagination.page_size
+        page_size=pagination.page_size,
+        cursor=pagination.cursor
     )
 
 
@@ -113,8 +120,8 @@ async def get_my_orders(
 )
 async def get_order(
     order_id: int,
-    current_user: CurrentUser,
-    db: DatabaseDep
+    current_user: CurrentPrincipal,
+    db: ReadDatabaseDep
 ):
     """
     Récupère les détails complets d'une commande
@@ -140,7 +147,6 @@ async def get_order(
 )
 async def cancel_order(
     order_id: int,
-    background_tasks: BackgroundTasks,
     current_user: CurrentUser,
     db: DatabaseDep
 ):
@@ -154,16 +160,12 @@ async def cancel_order(
     Possible uniquement si statut = pending ou paid
     """
     order_service = OrderService(db)
-    email_service = EmailService()
+    email_service = EmailService(db)
     
     cancelled_order = await order_service.cancel_order(order_id, current_user.id)
     
-    # Envoyer l'email en arrière-plan
-    background_tasks.add_task(
-        email_service.send_order_cancelled,
-        current_user,
-        cancelled_order
-    )
+    # Mettre l'email en file
+    await email_service.send_order_cancelled(current_user, cancelled_order)
     
     return cancelled_order
 
@@ -179,14 +181,14 @@ async def get_all_orders(
     pagination: PaginationDep,
     status: Optional[OrderStatus] = Query(None, description="Filtrer par statut"),
     staff_user: StaffUser = None,
-    db: DatabaseDep = None
+    db: ReadDatabaseDep = None
 ):
     """
     Récupère toutes les commandes
     
     **Réservé au staff (admin/manager)**
     
-    - Pagination
+    - Pagination (offset ou curseur)
     - Filtrage par statut
     """
     order_service = OrderService(db)
@@ -194,14 +196,17 @@ async def get_all_orders(
     orders, total = await order_service.get_all_orders(
         pagination.skip,
         pagination.limit,
-        status
+        status,
+        after=pagination.after,
+        include_total=pagination.include_total
     )
     
     return create_paginated_response(
         items=[OrderResponse.model_validate(o) for o in orders],
         total=total,
         page=pagination.page,
-        page_size=pagination.page_size
+        page_size=pagination.page_size,
+        cursor=pagination.cursor
     )
 
 
@@ -212,20 +217,82 @@ async def get_all_orders(
 )
 async def get_order_statistics(
     staff_user: StaffUser,
-    db: DatabaseDep
+    db: ReadDatabaseDep,
+    date_from: Optional[date] = Query(None, description="Premier jour de création inclus"),
+    date_to: Optional[date] = Query(None, description="Dernier jour de création inclus")
 ):
     """
     Récupère les statistiques des commandes
     
     **Réservé au staff (admin/manager)**
+    
+    - Nombre de commandes par statut et chiffre d'affaires
+    - Lues dans les agrégats journaliers (pas de parcours de la table orders)
     """
     order_service = OrderService(db)
     
-    stats = await order_service.get_order_statistics()
+    stats = await order_service.get_order_statistics(date_from, date_to)
     
     return stats
 
 
+@router.get(
+    "/statistics/daily",
+    response_model=List[dict],
+    summary="Chiffre d'affaires jour par jour (Staff)"
+)
+async def get_daily_revenue(
+    staff_user: StaffUser,
+    db: ReadDatabaseDep,
+    date_from: date = Query(..., description="Premier jour inclus"),
+    date_to: date = Query(..., description="Dernier jour inclus")
+):
+    """
+    Rapport jour par jour des commandes créées et du chiffre d'affaires
+    
+    **Réservé au staff (admin/manager)**
+    
+    Période de 366 jours maximum.
+    """
+    order_service = OrderService(db)
+    
+    return await order_service.get_daily_revenue(date_from, date_to)
+
+
+@router.post(
+    "/bulk/status",
+    response_model=OrderBulkStatusResponse,
+    summary="Changer le statut de plusieurs commandes (Staff)"
+)
+async def bulk_update_order_status(
+    bulk_update: OrderBulkStatusUpdate,
+    staff_user: StaffUser,
+    db: DatabaseDep
+):
+    """
+    Met à jour le statut de plusieurs commandes (ex: tout un envoi expédié)
+    
+    **Réservé au staff (admin/manager)**
+    
+    - Les transitions non autorisées sont rejetées, les autres appliquées
+    - Les emails de notification sont mis en file en un seul lot
+    """
+    order_service = OrderService(db)
+    email_service = EmailService(db)
+    
+    report, recipients = await order_service.bulk_update_order_status(
+        bulk_update.order_ids,
+        bulk_update.status
+    )
+    
+    report.notifications_queued = await email_service.send_order_status_notifications(
+        bulk_update.status,
+        recipients
+    )
+    
+    return report
+
+
 @router.get(
     "/admin/{order_id}",
     response_model=OrderDetailResponse,
@@ -234,7 +301,7 @@ async def get_order_statistics(
 async def get_order_admin(
     order_id: int,
     staff_user: StaffUser,
-    db: DatabaseDep
+    db: ReadDatabaseDep
 ):
     """
     Récupère les détails d'une commande (vue admin)
@@ -256,7 +323,6 @@ async def get_order_admin(
 async def update_order_status(
     order_id: int,
     status_update: OrderUpdateStatus,
-    background_tasks: BackgroundTasks,
     staff_user: StaffUser,
     db: DatabaseDep
 ):
@@ -268,7 +334,7 @@ async def update_order_status(
     - Envoie un email selon le nouveau statut
     """
     order_service = OrderService(db)
-    email_service = EmailService()
+    email_service = EmailService(db)
     
     order = await order_service.get_order_by_id(order_id)
     updated_order = await order_service.update_order_status(
@@ -276,20 +342,13 @@ async def update_order_status(
         status_update.status
     )
     
-    # Envoyer les emails appropriés
-    user = order.user
-    
-    if status_update.status == OrderStatus.SHIPPED:
-        background_tasks.add_task(
-            email_service.send_order_shipped,
-            user,
-            updated_order
-        )
-    elif status_update.status == OrderStatus.DELIVERED:
-        background_tasks.add_task(
-            email_service.send_order_delivered,
-            user,
-            updated_order
-        )
+    # Mettre en file les emails appropriés
+    if status_update.status in (OrderStatus.SHIPPED, OrderStatus.DELIVERED):
+        user = await UserRepository(db).get_by_id(order.user_id)
+        
+        if status_update.status == OrderStatus.SHIPPED:
+            await email_service.send_order_shipped(user, updated_order)
+        else:
+            await email_service.send_order_delivered(user, updated_order)
     
     return updated_order
\ No newline at end of file
@@ -6,10 +6,12 @@ CRUD produits, recherche, filtres
 
 from typing import Optional
 from decimal import Decimal
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, File, UploadFile
+from fastapi.responses import StreamingResponse
 
 from app.api.dependencies import (
     DatabaseDep,
+    DatabaseRoute,
     StaffUser,
     PaginationDep,
     create_paginated_response
@@ -20,12 +22,19 @@ from app.schemas.product import (
     ProductResponse,
     ProductDetailResponse,
     ProductUpdateStock,
-    ProductFilterParams
+    ProductFilterParams,
+    ProductImportReport
 )
 from app.services.product import ProductService
+from app.services.catalog import (
+    CatalogService,
+    CATALOG_MEDIA_TYPES,
+    iter_rows,
+    resolve_format
+)
 
 
-router = APIRouter(prefix="/products", tags=["Products"])
+router = APIRouter(prefix="/products", tags=["Products"], route_class=DatabaseRoute)
 
 
 # ===== Routes publiques =====
@@ -43,14 +52,21 @@ async def get_products(
     in_stock: Optional[bool] = Query(None, description="En stock uniquement"),
     on_sale: Optional[bool] = Query(None, description="En promotion uniquement"),
     search: Optional[str] = Query(None, min_length=2, description="Recherche"),
+    sort_by: Optional[str] = Query(
+        None,
+        regex="^(created_at|price|name|stock|relevance)$",
+        description="Champ de tri (défaut : relevance si recherche, sinon created_at)"
+    ),
+    sort_order: str = Query("desc", regex="^(asc|desc)$", description="Ordre de tri"),
     db: DatabaseDep = None
 ):
     """
     Récupère la liste des produits avec filtres et pagination
     
-    - Pagination
+    - Pagination (offset ou curseur)
     - Recherche par nom/description/SKU
-    - Filtrage par catégorie, prix, stock, promotion
+    - Filtrage par catégorie, prix, stock, promotion (combinables)
+    - Tri par date, prix, nom ou stock
     """
     product_service = ProductService(db)
     
@@ -61,23 +77,88 @@ async def get_products(
         in_stock=in_stock,
         on_sale=on_sale,
         search=search,
-        is_active=True
+        is_active=True,
+        sort_by=sort_by,
+        sort_order=sort_order
     )
     
-    products, total = await product_service.get_products(
+    products, total = await product_service.get_product_page(
         filters,
         pagination.skip,
-        pagination.limit
+        pagination.limit,
+        after=pagination.after,
+        include_total=pagination.include_total
     )
     
     return create_paginated_response(
-        items=[ProductResponse.model_validate(p) for p in products],
+        items=products,
         total=total,
         page=pagination.page,
-        page_size=pagination.page_size
+        page_size=pagination.page_size,
+        cursor=pagination.cursor,
+        sort_by=ProductService.cursor_field(filters)
+    )
+
+
+# ===== Import / export du catalogue (Staff) =====
+# Déclarées avant /{product_id} pour ne pas être capturées par ce chemin
+
+@router.get(
+    "/export",
+    summary="Exporter le catalogue (Staff)"
+)
+async def export_products(
+    staff_user: StaffUser,
+    format: str = Query("csv", regex="^(csv|ndjson)$", description="Format du fichier")
+):
+    """
+    Exporte tout le catalogue en flux (CSV ou NDJSON)
+    
+    **Réservé au staff (admin/manager)**
+    
+    Le fichier est produit par lots : le catalogue n'est jamais
+    chargé entièrement en mémoire.
+    """
+    return StreamingResponse(
+        CatalogService.export_products(format),
+        media_type=CATALOG_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'}
     )
 
 
+@router.post(
+    "/import",
+    response_model=ProductImportReport,
+    summary="Importer le catalogue (Staff)"
+)
+async def import_products(
+    staff_user: StaffUser,
+    db: DatabaseDep,
+    file: UploadFile = File(..., description="Fichier CSV ou NDJSON"),
+    format: Optional[str] = Query(
+        None,
+        regex="^(csv|ndjson)$",
+        description="Format (déduit de l'extension si absent)"
+    )
+):
+    """
+    Crée ou met à jour des produits en masse
+    
+    **Réservé au staff (admin/manager)**
+    
+    - Colonnes : sku, slug, name, description, price, sale_price,
+      stock, is_active, category_ids (séparés par "|" en CSV)
+    - Rapprochement par SKU puis par slug
+    - Les lignes invalides sont rejetées et listées dans le rapport
+    - Traitement par lots, chaque lot est validé en base séparément
+    """
+    file_format = resolve_format(file.filename, format)
+    
+    catalog_service = CatalogService(db)
+    
+    return await catalog_service.import_products(iter_rows(file.file, file_format))
+
+
 @router.get(
     "/{product_id}",
     response_model=ProductDetailResponse,
@@ -97,7 +178,7 @@ async def get_product(
     """
     product_service = ProductService(db)
     
-    product = await product_service.get_product_by_id(product_id)
+    product = await product_service.get_product_detail(product_id)
     
     return product
 
@@ -118,7 +199,7 @@ async def get_product_by_slug(
     """
     product_service = ProductService(db)
     
-    product = await product_service.get_product_by_slug(slug)
+    product = await product_service.get_product_detail_by_slug(slug)
     
     return product
 
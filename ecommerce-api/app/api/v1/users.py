@@ -9,6 +9,8 @@ from fastapi import APIRouter, HTTPException, status, Query
 
 from app.api.dependencies import (
     DatabaseDep,
+    ReadDatabaseDep,
+    DatabaseRoute,
     CurrentUser,
     AdminUser,
     PaginationDep,
@@ -26,7 +28,7 @@ from app.models.user import UserRole
 from app.services.user import UserService
 
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=DatabaseRoute)
 
 
 # ===== Routes publiques/utilisateur =====
@@ -103,14 +105,14 @@ async def get_users(
     role: Optional[UserRole] = Query(None, description="Filtrer par rôle"),
     is_active: Optional[bool] = Query(None, description="Filtrer par statut"),
     admin_user: AdminUser = None,
-    db: DatabaseDep = None
+    db: ReadDatabaseDep = None
 ):
     """
     Récupère la liste des utilisateurs avec filtres et pagination
     
     **Réservé aux administrateurs**
     
-    - Pagination
+    - Pagination (offset ou curseur)
     - Recherche par nom/email
     - Filtrage par rôle et statut
     """
@@ -121,28 +123,35 @@ async def get_users(
         users, total = await user_service.search_users(
             search.clean_query,
             pagination.skip,
-            pagination.limit
+            pagination.limit,
+            after=pagination.after,
+            include_total=pagination.include_total
         )
     # Filtrage par rôle
     elif role:
         users, total = await user_service.get_users_by_role(
             role,
             pagination.skip,
-            pagination.limit
+            pagination.limit,
+            after=pagination.after,
+            include_total=pagination.include_total
         )
     # Tous les utilisateurs
     else:
         users, total = await user_service.get_all_users(
             pagination.skip,
             pagination.limit,
-            active_only=is_active if is_active is not None else False
+            active_only=is_active if is_active is not None else False,
+            after=pagination.after,
+            include_total=pagination.include_total
         )
     
     return create_paginated_response(
         items=[UserResponse.model_validate(u) for u in users],
         total=total,
         page=pagination.page,
-        page_size=pagination.page_size
+        page_size=pagination.page_size,
+        cursor=pagination.cursor
     )
 
 
@@ -153,7 +162,7 @@ async def get_users(
 )
 async def get_user_statistics(
     admin_user: AdminUser,
-    db: DatabaseDep
+    db: ReadDatabaseDep
 ):
     """
     Récupère les statistiques des utilisateurs
@@ -175,7 +184,7 @@ async def get_user_statistics(
 async def get_user_by_id(
     user_id: int,
     admin_user: AdminUser,
-    db: DatabaseDep
+    db: ReadDatabaseDep
 ):
     """
     Récupère les détails d'un utilisateur par son ID
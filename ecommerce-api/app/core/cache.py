@@ -0,0 +1,341 @@
+"""
+Cache applicatif (read-through)
+Backend Redis en production, backend mémoire pour le développement et les tests
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+
+
+logger = logging.getLogger(__name__)
+
+# Clé de session où sont accumulées les invalidations à appliquer après commit
+PENDING_INVALIDATIONS_KEY = "cache_invalidations"
+
+
+# ===== Backends =====
+class CacheBackend:
+    """
+    Interface minimale d'un backend de cache
+    Les valeurs sont des chaînes (JSON sérialisé)
+    """
+    
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+    
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        raise NotImplementedError
+    
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+    
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+    
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Backend en mémoire du processus
+    Utilisé quand Redis est désactivé et dans les tests
+    """
+    
+    def __init__(self):
+        self._store: Dict[str, Tuple[Optional[float], str]] = {}
+    
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._store[key]
+            return None
+        
+        return value
+    
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        self._store[key] = (time.monotonic() + ttl, value)
+    
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._store.pop(key, None)
+    
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        self._store[key] = (None, str(value))
+        return value
+    
+    def clear(self) -> None:
+        """Vide le cache (tests)"""
+        self._store.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend Redis (redis.asyncio)
+    Accepte un client existant (ex: fakeredis.aioredis.FakeRedis en test)
+    """
+    
+    def __init__(self, client: Any = None, url: Optional[str] = None):
+        if client is None:
+            from redis import asyncio as aioredis
+            
+            client = aioredis.from_url(
+                url or settings.REDIS_URL,
+                decode_responses=True
+            )
+        self.client = client
+    
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.client.get(key)
+        if isinstance(value, bytes):
+            return value.decode()
+        return value
+    
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await self.client.set(key, value, ex=ttl)
+    
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*keys)
+    
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+    
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+# ===== Cache =====
+class Cache:
+    """
+    Cache read-through avec protection contre les ruées (single-flight)
+    
+    - get_or_load: lit la clé, sinon exécute le loader une seule fois
+      par processus même si plusieurs requêtes la demandent en parallèle
+    - Espaces de noms versionnés: incrémenter la version invalide d'un coup
+      toutes les clés dérivées (pages de listing, filtres...)
+    - Une panne du backend n'empêche jamais la lecture: on retombe sur le loader
+    """
+    
+    def __init__(
+        self,
+        backend: CacheBackend,
+        default_ttl: int = 300,
+        enabled: bool = True,
+        prefix: str = "ecommerce"
+    ):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.enabled = enabled
+        self.prefix = prefix
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+    
+    def use_backend(self, backend: CacheBackend) -> None:
+        """Remplace le backend (tests)"""
+        self.backend = backend
+        self._inflight.clear()
+    
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None
+    ) -> Any:
+        """
+        Retourne la valeur en cache ou la charge via le loader
+        
+        Args:
+            key: Clé (sans préfixe)
+            loader: Coroutine retournant une valeur sérialisable en JSON
+            ttl: Durée de vie en secondes (défaut: CACHE_TTL)
+        
+        Returns:
+            Valeur désérialisée (None n'est pas mis en cache)
+        """
+        if not self.enabled:
+            return await loader()
+        
+        full_key = self._key(key)
+        
+        cached = await self._safe_get(full_key)
+        if cached is not None:
+            CACHE_REQUESTS.inc("hit")
+            return json.loads(cached)
+        
+        CACHE_REQUESTS.inc("miss")
+        
+        # Single-flight: une seule requête recharge la clé
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        
+        try:
+            value = await loader()
+            if value is not None:
+                await self._safe_set(full_key, json.dumps(value), ttl or self.default_ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Évite l'avertissement "exception never retrieved" sans attente concurrente
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(full_key, None)
+    
+    async def namespace(self, name: str) -> str:
+        """
+        Retourne l'espace de noms versionné courant
+        
+        Args:
+            name: Nom de l'espace (ex: "products:list")
+        
+        Returns:
+            Préfixe de clé incluant la version
+        """
+        if not self.enabled:
+            return name
+        
+        version = await self._safe_get(self._key(f"ns:{name}"))
+        return f"{name}:v{version or 0}"
+    
+    async def invalidate(
+        self,
+        keys: Iterable[str] = (),
+        namespaces: Iterable[str] = ()
+    ) -> None:
+        """
+        Supprime des clés et/ou invalide des espaces de noms
+        
+        Args:
+            keys: Clés à supprimer
+            namespaces: Espaces de noms dont la version est incrémentée
+        """
+        if not self.enabled:
+            return
+        
+        try:
+            full_keys = [self._key(key) for key in keys]
+            if full_keys:
+                await self.backend.delete(*full_keys)
+            for name in namespaces:
+                await self.backend.incr(self._key(f"ns:{name}"))
+        except Exception:
+            logger.warning("Invalidation du cache impossible", exc_info=True)
+    
+    def invalidate_on_commit(
+        self,
+        session: AsyncSession,
+        keys: Iterable[str] = (),
+        namespaces: Iterable[str] = ()
+    ) -> None:
+        """
+        Programme une invalidation à appliquer après le commit de la session
+        Évite qu'une lecture concurrente remette en cache l'état non commité
+        
+        Args:
+            session: Session de la requête en cours
+            keys: Clés à supprimer
+            namespaces: Espaces de noms à invalider
+        """
+        pending_keys, pending_namespaces = session.info.setdefault(
+            PENDING_INVALIDATIONS_KEY,
+            (set(), set())
+        )
+        pending_keys.update(keys)
+        pending_namespaces.update(namespaces)
+    
+    async def flush_pending(self, session: AsyncSession) -> None:
+        """
+        Applique les invalidations programmées (à appeler après commit)
+        
+        Args:
+            session: Session commitée
+        """
+        pending = session.info.pop(PENDING_INVALIDATIONS_KEY, None)
+        if pending:
+            keys, namespaces = pending
+            await self.invalidate(keys, namespaces)
+    
+    def discard_pending(self, session: AsyncSession) -> None:
+        """
+        Abandonne les invalidations programmées (après rollback)
+        
+        Args:
+            session: Session annulée
+        """
+        session.info.pop(PENDING_INVALIDATIONS_KEY, None)
+    
+    async def close(self) -> None:
+        """Ferme la connexion au backend"""
+        await self.backend.close()
+    
+    async def _safe_get(self, key: str) -> Optional[str]:
+        try:
+            return await self.backend.get(key)
+        except Exception:
+            logger.warning("Lecture du cache impossible: %s", key, exc_info=True)
+            return None
+    
+    async def _safe_set(self, key: str, value: str, ttl: int) -> None:
+        try:
+            await self.backend.set(key, value, ttl)
+        except Exception:
+            logger.warning("Écriture du cache impossible: %s", key, exc_info=True)
+
+
+def hash_key(payload: Any) -> str:
+    """
+    Hash stable d'un ensemble de paramètres (filtres, pagination...)
+    
+    Args:
+        payload: Données sérialisables en JSON
+    
+    Returns:
+        Empreinte courte
+    """
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def create_cache() -> Cache:
+    """
+    Crée le cache selon la configuration
+    """
+    if settings.CACHE_BACKEND == "redis":
+        backend: CacheBackend = RedisCacheBackend()
+    else:
+        backend = MemoryCacheBackend()
+    
+    return Cache(
+        backend,
+        default_ttl=settings.CACHE_TTL,
+        enabled=settings.CACHE_ENABLED
+    )
+
+
+# Instance globale du cache
+cache: Cache = create_cache()
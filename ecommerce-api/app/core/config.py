@@ -34,12 +34,21 @@ class Settings(BaseSettings):
     DB_NAME: str = "ecommerce_db"
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 10
+    DB_REPLICA_URLS: str = ""  # URLs séparées par des virgules (vide: pas de réplica)
+    DB_REPLICA_POOL_SIZE: int = 20
+    DB_REPLICA_STICKY_SECONDS: int = 5  # lectures sur le primaire après une écriture
+    DB_REPLICA_RETRY_SECONDS: int = 30  # durée d'éviction d'un réplica en échec
     
     @property
     def DATABASE_URL(self) -> str:
         """Génère l'URL de connexion MySQL avec asyncmy"""
         return f"mysql+asyncmy://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
     
+    @property
+    def DATABASE_REPLICA_URLS(self) -> List[str]:
+        """Convertit la chaîne DB_REPLICA_URLS en liste"""
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+    
     @property
     def SYNC_DATABASE_URL(self) -> str:
         """URL de connexion synchrone (pour Alembic migrations)"""
@@ -51,6 +60,8 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # au-delà: 429
     
     @field_validator("SECRET_KEY")
     @classmethod
@@ -82,6 +93,8 @@ class Settings(BaseSettings):
     REDIS_PASSWORD: Optional[str] = None
     CACHE_ENABLED: bool = True
     CACHE_TTL: int = 300  # secondes
+    CACHE_BACKEND: str = "redis"  # redis | memory
+    COUPON_INDEX_TTL: int = 300  # rechargement complet de l'index des coupons (secondes)
     
     @property
     def REDIS_URL(self) -> str:
@@ -99,6 +112,12 @@ class Settings(BaseSettings):
     MAIL_FROM_NAME: str = "E-commerce"
     MAIL_TLS: bool = True
     MAIL_SSL: bool = False
+    SMTP_POOL_SIZE: int = 2
+    EMAIL_DISPATCHER_ENABLED: bool = True  # envoi en tâche de fond dans l'API
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_POLL_INTERVAL: float = 2.0  # secondes
+    EMAIL_DEFAULT_LOCALE: str = "fr"
     
     # ===== File Upload =====
     UPLOAD_DIR: str = "uploads"
@@ -122,6 +141,8 @@ class Settings(BaseSettings):
     # ===== Rate Limiting =====
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_USER_PER_MINUTE: int = 120
+    RATE_LIMIT_BACKEND: str = "memory"  # memory | redis
     
     # ===== Pagination =====
     DEFAULT_PAGE_SIZE: int = 20
@@ -131,6 +152,12 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/app.log"
     
+    # ===== Profilage SQL =====
+    PROFILING_ENABLED: bool = True
+    PROFILING_SLOW_QUERY_MS: float = 100
+    PROFILING_SLOW_REQUEST_MS: float = 1000
+    PROFILING_N_PLUS_ONE_THRESHOLD: int = 10  # même requête répétée plus de N fois
+    
     # ===== Sentry =====
     SENTRY_DSN: Optional[str] = None
     SENTRY_TRACES_SAMPLE_RATE: float = 0.1
@@ -4,18 +4,37 @@ Configuration de la base de données
 SQLAlchemy 2.0 avec support async (asyncmy pour MySQL)
 """
 
-from typing import AsyncGenerator
+import hashlib
+import logging
+import time
+from contextvars import ContextVar
+from typing import AsyncGenerator, List, Optional, Sequence, Tuple
+from fastapi import Request
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     AsyncEngine,
     create_async_engine,
     async_sessionmaker
 )
-from sqlalchemy.orm import DeclarativeBase, declarative_base
-from sqlalchemy.pool import NullPool, QueuePool
-from sqlalchemy import MetaData
+from sqlalchemy.orm import DeclarativeBase, Session, declarative_base
+from sqlalchemy.pool import NullPool, QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy import MetaData, event
 
 from app.core.config import settings
+from app.core.cache import cache, CacheBackend, PENDING_INVALIDATIONS_KEY
+from app.core.profiling import install_sql_profiling
+from app.core.metrics import (
+    registry,
+    DB_POOL_SIZE,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_OVERFLOW,
+    DB_POOL_WAIT,
+    DB_READ_SESSIONS
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 # ===== Conventions de nommage pour les contraintes =====
@@ -46,57 +65,365 @@ class Base(DeclarativeBase):
 
 
 # ===== Configuration du moteur de base de données =====
-def create_engine() -> AsyncEngine:
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool de connexions mesurant le temps d'attente d'une connexion
+    (attente d'une connexion libre ou ouverture d'une nouvelle)
+    """
+    
+    metrics_label = "primary"
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started, self.metrics_label)
+
+
+def create_engine(
+    url: Optional[str] = None,
+    pool_size: Optional[int] = None,
+    metrics_label: str = InstrumentedQueuePool.metrics_label
+) -> AsyncEngine:
     """
     Crée et configure le moteur de base de données async
+    
+    Args:
+        url: URL de connexion (défaut: base primaire)
+        pool_size: Taille du pool (défaut: DB_POOL_SIZE)
+        metrics_label: Nom du pool dans les métriques
     """
+    poolclass = InstrumentedQueuePool
+    if metrics_label != InstrumentedQueuePool.metrics_label:
+        # Sous-classe : le label survit à la recréation du pool (dispose)
+        poolclass = type("InstrumentedQueuePool", (InstrumentedQueuePool,), {"metrics_label": metrics_label})
+    
     engine = create_async_engine(
-        settings.DATABASE_URL,
+        url or settings.DATABASE_URL,
         echo=settings.DEBUG,  # Log les requêtes SQL en dev
         pool_pre_ping=True,  # Vérifie la connexion avant utilisation
-        pool_size=settings.DB_POOL_SIZE,
+        pool_size=pool_size or settings.DB_POOL_SIZE,
         max_overflow=settings.DB_MAX_OVERFLOW,
         pool_recycle=3600,  # Recycle les connexions après 1h
         pool_use_lifo=True,  # LIFO pour réutiliser les connexions chaudes
+        poolclass=poolclass,
     )
+    
+    # Mesures SQL par requête HTTP (nombre, durée, N+1)
+    if settings.PROFILING_ENABLED:
+        install_sql_profiling(engine.sync_engine)
+    
     return engine
 
 
+def create_session_maker(bind: AsyncEngine) -> async_sessionmaker:
+    """
+    Crée une fabrique de sessions sur un moteur
+    """
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,  # Permet d'accéder aux objets après commit
+        autocommit=False,
+        autoflush=False,
+    )
+
+
 # Instance globale du moteur
 engine: AsyncEngine = create_engine()
 
+# Réplicas de lecture (DB_REPLICA_URLS)
+replica_engines: List[AsyncEngine] = [
+    create_engine(url, settings.DB_REPLICA_POOL_SIZE, f"replica{index}")
+    for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+]
+
+
+def collect_pool_metrics() -> None:
+    """Relève l'état des pools de connexions (appelé à chaque export /metrics)"""
+    for pool_engine in [engine, *replica_engines]:
+        pool = pool_engine.sync_engine.pool
+        label = pool.metrics_label
+        
+        DB_POOL_SIZE.set(pool.size(), label)
+        DB_POOL_CHECKED_OUT.set(pool.checkedout(), label)
+        DB_POOL_OVERFLOW.set(max(0, pool.overflow()), label)
+
+
+registry.add_collector(collect_pool_metrics)
+
 
 # ===== Session Factory =====
-async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,  # Permet d'accéder aux objets après commit
-    autocommit=False,
-    autoflush=False,
+async_session_maker = create_session_maker(engine)
+
+
+# ===== Réplicas de lecture =====
+
+# Clé de session indiquant qu'elle a écrit (flush ou INSERT/UPDATE/DELETE)
+SESSION_WRITES_KEY = "has_writes"
+
+# Requête HTTP d'une session (marque read-your-writes), session de lecture
+# (jamais commitée) et session déjà terminée
+SESSION_REQUEST_KEY = "request"
+SESSION_READ_ONLY_KEY = "read_only"
+SESSION_RELEASED_KEY = "released"
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush_writes(session, flush_context):
+    session.info[SESSION_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_statement_writes(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[SESSION_WRITES_KEY] = True
+
+
+class ReplicaRouter:
+    """
+    Routage des sessions de lecture vers les réplicas
+    
+    - Round-robin entre les réplicas disponibles
+    - Read-your-writes : après une écriture, le client lit sur le primaire
+      pendant `sticky_seconds` (marque partagée via le backend de cache,
+      donc entre workers uniquement quand le cache est sur Redis)
+    - Un réplica injoignable est écarté `retry_seconds` et les lectures
+      retombent sur le primaire
+    """
+    
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replicas: Sequence[async_sessionmaker],
+        sticky_backend: Optional[CacheBackend] = None,
+        sticky_seconds: int = 5,
+        retry_seconds: int = 30,
+        prefix: str = "ecommerce:db:sticky"
+    ):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky_backend = sticky_backend
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self.prefix = prefix
+        self._down_until = [0.0] * len(self.replicas)
+        self._next = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+    
+    @property
+    def backend(self) -> CacheBackend:
+        """Backend des marques read-your-writes (celui du cache à défaut, résolu à chaque appel)"""
+        return self.sticky_backend or cache.backend
+    
+    @staticmethod
+    def client_key(request: Request) -> str:
+        """Identifie le client : jeton (haché) sinon IP"""
+        authorization = request.headers.get("authorization")
+        if authorization:
+            return "auth:" + hashlib.sha1(authorization.encode()).hexdigest()[:16]
+        return "ip:" + (request.client.host if request.client else "unknown")
+    
+    def _sticky_key(self, request: Request) -> str:
+        return f"{self.prefix}:{self.client_key(request)}"
+    
+    async def mark_write(self, request: Request) -> None:
+        """Force les lectures du client sur le primaire pendant sticky_seconds"""
+        if not self.enabled:
+            return
+        
+        try:
+            await self.backend.set(self._sticky_key(request), "1", self.sticky_seconds)
+        except Exception:
+            logger.warning("Marque read-your-writes non enregistrée", exc_info=True)
+    
+    async def is_sticky(self, request: Request) -> bool:
+        """Indique si le client a écrit récemment"""
+        try:
+            return await self.backend.get(self._sticky_key(request)) is not None
+        except Exception:
+            logger.warning("Marque read-your-writes illisible", exc_info=True)
+            # Dans le doute, lecture sur le primaire
+            return True
+    
+    def mark_down(self, index: int) -> None:
+        """Écarte un réplica pendant retry_seconds"""
+        self._down_until[index] = time.monotonic() + self.retry_seconds
+        logger.warning(
+            "Réplica %s indisponible, lectures sur le primaire pendant %ss",
+            index,
+            self.retry_seconds
+        )
+    
+    def _available(self) -> List[int]:
+        """Réplicas disponibles, en commençant par le suivant du round-robin"""
+        now = time.monotonic()
+        count = len(self.replicas)
+        start = self._next
+        self._next = (start + 1) % count
+        
+        return [
+            index
+            for index in ((start + offset) % count for offset in range(count))
+            if self._down_until[index] <= now
+        ]
+    
+    async def open_read_session(self, request: Request) -> Tuple[AsyncSession, Optional[int]]:
+        """
+        Ouvre une session de lecture
+        
+        Aucune connexion n'est prise ici : la session se connecte à sa
+        première requête SQL (une réponse servie par le cache n'occupe
+        aucune connexion). Un réplica injoignable est écarté par
+        get_read_db() à la première erreur de connexion.
+        
+        Args:
+            request: Requête HTTP (identification du client)
+        
+        Returns:
+            (Session, index du réplica ou None pour le primaire)
+        """
+        if self.enabled and not await self.is_sticky(request):
+            available = self._available()
+            if available:
+                index = available[0]
+                DB_READ_SESSIONS.inc(f"replica{index}")
+                return self.replicas[index](), index
+        
+        DB_READ_SESSIONS.inc("primary")
+        return self.primary(), None
+
+
+# Instance globale du routeur de lecture
+replica_router = ReplicaRouter(
+    async_session_maker,
+    [create_session_maker(replica_engine) for replica_engine in replica_engines],
+    sticky_seconds=settings.DB_REPLICA_STICKY_SECONDS,
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS
 )
 
+if replica_router.enabled and settings.CACHE_BACKEND != "redis":
+    logger.warning(
+        "Réplicas configurés sans cache Redis : read-your-writes limité au worker courant"
+    )
+
 
 # ===== Dependency pour FastAPI =====
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+
+# Sessions ouvertes par les dépendances de la requête en cours
+_request_sessions: ContextVar[Optional[List[AsyncSession]]] = ContextVar(
+    "request_sessions",
+    default=None
+)
+
+
+def _track_session(session: AsyncSession, request: Request, read_only: bool = False) -> None:
+    """Rattache une session à la requête en cours"""
+    session.info[SESSION_REQUEST_KEY] = request
+    session.info[SESSION_READ_ONLY_KEY] = read_only
+    
+    sessions = _request_sessions.get()
+    if sessions is None:
+        sessions = []
+        _request_sessions.set(sessions)
+    sessions.append(session)
+
+
+def has_writes(session: AsyncSession) -> bool:
+    """Indique si la session a quelque chose à commiter"""
+    return bool(
+        session.info.get(SESSION_WRITES_KEY)
+        or PENDING_INVALIDATIONS_KEY in session.info
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
+
+async def release_session(session: AsyncSession) -> None:
+    """
+    Termine une session et rend sa connexion au pool
+    
+    - Écriture : COMMIT, invalidations du cache, marque read-your-writes
+    - Lecture seule : pas de COMMIT, la connexion est simplement rendue
+      (le pool fait le ROLLBACK de remise à zéro)
+    
+    Idempotent : sans effet sur une session déjà terminée. Les objets
+    chargés restent lisibles (expire_on_commit=False, close() n'expire rien).
+    """
+    if session.info.get(SESSION_RELEASED_KEY):
+        return
+    session.info[SESSION_RELEASED_KEY] = True
+    
+    if not session.info[SESSION_READ_ONLY_KEY] and has_writes(session):
+        await session.commit()
+        await cache.flush_pending(session)
+        await replica_router.mark_write(session.info[SESSION_REQUEST_KEY])
+    
+    await session.close()
+
+
+async def release_request_sessions() -> None:
+    """
+    Termine les sessions de la requête en cours
+    Appelé dès la fin du handler, avant la sérialisation de la réponse
+    """
+    for session in _request_sessions.get() or ():
+        await release_session(session)
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Générateur de session de base de données pour FastAPI
     Usage: db: AsyncSession = Depends(get_db)
     
     Gère automatiquement:
-    - L'ouverture de la session
-    - Le commit en cas de succès
+    - L'ouverture de la session (la connexion n'est prise au pool
+      qu'à la première requête SQL)
+    - Le commit en cas de succès, uniquement si la session a écrit
     - Le rollback en cas d'erreur
-    - La fermeture de la session
+    - La fermeture de la session (dès la fin du handler avec DatabaseRoute)
+    - La marque read-your-writes si la session a écrit
     """
-    async with async_session_maker() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+    session = async_session_maker()
+    _track_session(session, request)
+    try:
+        yield session
+        await release_session(session)
+    except Exception:
+        await session.rollback()
+        cache.discard_pending(session)
+        raise
+    finally:
+        await session.close()
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session de lecture pour les routes GET
+    Usage: db: ReadDatabaseDep
+    
+    Servie par un réplica si possible, sinon par le primaire (aucun
+    réplica configuré, écriture récente du client, réplicas en échec).
+    La session n'est jamais commitée : ne pas l'utiliser pour écrire.
+    Un réplica en erreur de connexion est écarté pour les requêtes suivantes.
+    """
+    session, replica = await replica_router.open_read_session(request)
+    _track_session(session, request, read_only=True)
+    try:
+        yield session
+    except DBAPIError as e:
+        if replica is not None and (
+            e.connection_invalidated or isinstance(e, (OperationalError, InterfaceError))
+        ):
+            replica_router.mark_down(replica)
+        raise
+    finally:
+        await session.close()
 
 
 # ===== Fonctions utilitaires =====
@@ -133,6 +460,8 @@ async def close_db() -> None:
     À appeler lors de l'arrêt de l'application
     """
     await engine.dispose()
+    for replica_engine in replica_engines:
+        await replica_engine.dispose()
 
 
 # ===== Context Manager pour transactions manuelles =====
@@ -156,8 +485,10 @@ class DatabaseTransaction:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if exc_type is not None:
             await self.session.rollback()
+            cache.discard_pending(self.session)
         else:
             await self.session.commit()
+            await cache.flush_pending(self.session)
         await self.session.close()
 
 
@@ -0,0 +1,278 @@
+"""
+Métriques applicatives au format Prometheus (exposition texte)
+Compteurs en mémoire du processus, sans verrou : toutes les mises à jour
+ont lieu sur la boucle d'événements
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+
+# Bornes par défaut des histogrammes de latence (secondes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base d'une métrique nommée avec étiquettes"""
+    
+    type = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+    
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+    
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Compteur monotone"""
+    
+    type = "counter"
+    
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    """Valeur instantanée"""
+    
+    type = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def set(self, value: float, *label_values: str) -> None:
+        self._values[label_values] = value
+    
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+    
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    """
+    Histogramme à bornes fixes
+    observe() incrémente un seul compteur (bisect) ; les cumuls sont
+    calculés à l'export
+    """
+    
+    type = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        # Par jeu d'étiquettes : [compteurs par borne (+Inf inclus), somme]
+        self._series: Dict[LabelValues, list] = {}
+    
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = [[0] * (len(self.buckets) + 1), 0.0]
+            self._series[label_values] = series
+        
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+    
+    @contextmanager
+    def timer(self, *label_values: str) -> Iterator[None]:
+        """Mesure la durée du bloc (secondes)"""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - started, *label_values)
+    
+    def render(self) -> List[str]:
+        lines = self.header()
+        bucket_labels = self.label_names + ("le",)
+        
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(bucket_labels, labels + (_format_value(bound),))} {cumulative}"
+                )
+            suffix = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registre des métriques
+    Les collecteurs sont appelés à chaque export pour mettre à jour les
+    jauges lues ailleurs (pool SQL, pool bcrypt...)
+    """
+    
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+    
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+    
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+    
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Ajoute une fonction appelée avant chaque export"""
+        self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """
+        Exporte toutes les métriques
+        
+        Returns:
+            Texte au format d'exposition Prometheus 0.0.4
+        """
+        for collector in self._collectors:
+            collector()
+        
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registre global
+registry = MetricsRegistry()
+
+
+# ===== HTTP =====
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total",
+    "Requêtes HTTP traitées",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "Durée des requêtes HTTP par route",
+    ["method", "route"]
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight",
+    "Requêtes HTTP en cours"
+)
+HTTP_RATE_LIMITED = registry.counter(
+    "http_rate_limited_total",
+    "Requêtes refusées par le limiteur de débit"
+)
+
+# ===== Base de données =====
+DB_POOL_SIZE = registry.gauge("db_pool_size", "Taille du pool de connexions", ["pool"])
+DB_POOL_CHECKED_OUT = registry.gauge("db_pool_checked_out", "Connexions utilisées", ["pool"])
+DB_POOL_OVERFLOW = registry.gauge("db_pool_overflow", "Connexions ouvertes au-delà de pool_size", ["pool"])
+DB_POOL_WAIT = registry.histogram(
+    "db_pool_wait_seconds",
+    "Attente pour obtenir une connexion du pool",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+DB_READ_SESSIONS = registry.counter(
+    "db_read_sessions_total",
+    "Sessions de lecture par cible (primary, replicaN)",
+    ["target"]
+)
+
+# ===== Cache =====
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total",
+    "Lectures du cache applicatif",
+    ["result"]
+)
+
+# ===== Hashing des mots de passe =====
+PASSWORD_HASH_PENDING = registry.gauge(
+    "password_hash_pending",
+    "Calculs bcrypt en cours ou en attente"
+)
+PASSWORD_HASH_COMPLETED = registry.counter(
+    "password_hash_completed_total",
+    "Calculs bcrypt terminés"
+)
+PASSWORD_HASH_FAILED = registry.counter(
+    "password_hash_failed_total",
+    "Calculs bcrypt en erreur"
+)
+PASSWORD_HASH_REJECTED = registry.counter(
+    "password_hash_rejected_total",
+    "Calculs bcrypt refusés (pool saturé)"
+)
+
+# ===== Parcours métier =====
+CHECKOUT_DURATION = registry.histogram(
+    "checkout_duration_seconds",
+    "Durée de création d'une commande depuis le panier"
+)
+STOCK_RESERVATION_DURATION = registry.histogram(
+    "stock_reservation_duration_seconds",
+    "Durée de réservation du stock d'une commande"
+)
@@ -0,0 +1,185 @@
+"""
+Profilage SQL par requête HTTP
+Nombre de requêtes, temps base de données, requêtes lentes et motifs N+1
+"""
+
+import heapq
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Nombre de requêtes lentes conservées par requête HTTP
+SLOWEST_STATEMENTS = 5
+
+# Longueur maximale d'une requête SQL dans les logs
+MAX_STATEMENT_LENGTH = 500
+
+# Paramètres liés (format, qmark, pyformat, named)
+_PARAMETER = r"(?:%s|\?|%\(\w+\)s|:\w+)"
+_PARAMETER_LIST = re.compile(rf"\(\s*{_PARAMETER}(?:\s*,\s*{_PARAMETER})*\s*\)")
+_VALUES_ROWS = re.compile(r"(VALUES\s*\(\?\))(?:\s*,\s*\(\?\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "request_profile",
+    default=None
+)
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Forme normalisée d'une requête (sert à détecter les N+1)
+    
+    - Espaces normalisés
+    - Listes de paramètres (IN, VALUES multi-lignes) réduites à (?)
+    
+    Example:
+        "SELECT ... WHERE id IN (%s, %s)" -> "SELECT ... WHERE id IN (?)"
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PARAMETER_LIST.sub("(?)", shape)
+    return _VALUES_ROWS.sub(r"\1", shape)
+
+
+class RequestProfile:
+    """
+    Mesures SQL d'une requête HTTP
+    
+    Seule la requête SQL paramétrée est conservée : les valeurs des
+    paramètres ne sont jamais enregistrées.
+    """
+    
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started_at = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.shapes: Dict[str, int] = {}
+        self._slowest: List[Tuple[float, int, str]] = []
+    
+    def record(self, statement: str, duration: float) -> None:
+        """Enregistre une requête exécutée"""
+        self.query_count += 1
+        self.db_time += duration
+        
+        shape = statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+        
+        entry = (duration, self.query_count, shape)
+        if len(self._slowest) < SLOWEST_STATEMENTS:
+            heapq.heappush(self._slowest, entry)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+    
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+    
+    def slowest(self) -> List[Dict[str, Any]]:
+        """Requêtes les plus lentes (ms, SQL sans paramètres)"""
+        return [
+            {"ms": round(duration * 1000, 2), "sql": shape[:MAX_STATEMENT_LENGTH]}
+            for duration, _, shape in sorted(self._slowest, reverse=True)
+        ]
+    
+    def repeated_statements(self, threshold: int) -> List[Dict[str, Any]]:
+        """Motifs N+1 : même forme de requête exécutée plus de `threshold` fois"""
+        return [
+            {"count": count, "sql": shape[:MAX_STATEMENT_LENGTH]}
+            for shape, count in sorted(self.shapes.items(), key=lambda item: -item[1])
+            if count > threshold
+        ]
+    
+    def server_timing(self) -> str:
+        """Valeur de l'en-tête Server-Timing"""
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.query_count} queries", '
+            f"total;dur={self.elapsed * 1000:.2f}"
+        )
+    
+    def summary(self, status_code: int) -> Dict[str, Any]:
+        """Entrée de log structurée"""
+        return {
+            "event": "request_profile",
+            "method": self.method,
+            "path": self.path,
+            "status": status_code,
+            "duration_ms": round(self.elapsed * 1000, 2),
+            "db_ms": round(self.db_time * 1000, 2),
+            "queries": self.query_count,
+            "slowest": self.slowest(),
+            "n_plus_one": self.repeated_statements(settings.PROFILING_N_PLUS_ONE_THRESHOLD),
+        }
+
+
+def start_profile(method: str, path: str) -> RequestProfile:
+    """Démarre le profilage de la requête HTTP courante"""
+    profile = RequestProfile(method, path)
+    _current_profile.set(profile)
+    return profile
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """Profil de la requête HTTP courante (None hors requête)"""
+    return _current_profile.get()
+
+
+def log_profile(profile: RequestProfile, status_code: int) -> None:
+    """
+    Écrit le profil en JSON
+    
+    Toujours en DEBUG ; sinon seulement si la requête est lente, contient
+    une requête SQL lente ou un motif N+1
+    """
+    summary = profile.summary(status_code)
+    
+    slow_query = bool(summary["slowest"]) and summary["slowest"][0]["ms"] >= settings.PROFILING_SLOW_QUERY_MS
+    flagged = (
+        slow_query
+        or summary["n_plus_one"]
+        or summary["duration_ms"] >= settings.PROFILING_SLOW_REQUEST_MS
+    )
+    
+    if flagged:
+        logger.warning(json.dumps(summary, ensure_ascii=False))
+    elif settings.DEBUG:
+        logger.info(json.dumps(summary, ensure_ascii=False))
+
+
+def install_sql_profiling(engine: Engine) -> None:
+    """
+    Branche le profilage sur les événements d'un moteur (synchrone)
+    
+    Args:
+        engine: Moteur SQLAlchemy (AsyncEngine.sync_engine pour un moteur async)
+    """
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record(statement, time.perf_counter() - started)
+    
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        starts = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+        if starts:
+            starts.pop()
@@ -0,0 +1,329 @@
+"""
+Limitation de débit (token bucket)
+Seaux par utilisateur authentifié ou par IP, coût pondéré par route
+Stockage local (mémoire du processus) ou Redis (script Lua atomique)
+"""
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.security import decode_token
+
+
+logger = logging.getLogger(__name__)
+
+# Routes jamais limitées (supervision, documentation)
+EXEMPT_PATHS = frozenset({"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"})
+
+# Coût par défaut d'une requête (en jetons)
+DEFAULT_COST = 1
+
+# Routes coûteuses : (méthode, chemin) -> coût
+ROUTE_COSTS: Dict[Tuple[str, str], int] = {
+    ("POST", f"{settings.API_V1_PREFIX}/auth/login"): 5,
+    ("POST", f"{settings.API_V1_PREFIX}/auth/login/oauth2"): 5,
+    ("POST", f"{settings.API_V1_PREFIX}/auth/register"): 5,
+    ("POST", f"{settings.API_V1_PREFIX}/auth/password-reset/request"): 5,
+    ("POST", f"{settings.API_V1_PREFIX}/auth/password/change"): 5,
+}
+
+# Recherche plein texte sur le catalogue
+SEARCH_PATH = f"{settings.API_V1_PREFIX}/products"
+SEARCH_COST = 5
+
+# Nombre de shards et taille maximale de chacun (store local)
+LOCAL_STORE_SHARDS = 16
+LOCAL_STORE_SHARD_SIZE = 10_000
+
+
+class RateLimitDecision(NamedTuple):
+    """Résultat d'une demande de jetons"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int
+    reset: int
+    
+    def headers(self) -> Dict[str, str]:
+        """En-têtes X-RateLimit-* (et Retry-After si refusé)"""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(self.reset),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+# ===== Stores =====
+class TokenBucketStore:
+    """
+    Interface d'un stockage de seaux
+    take() retourne (accordé, jetons restants)
+    """
+    
+    async def take(
+        self,
+        key: str,
+        cost: int,
+        capacity: int,
+        refill_rate: float
+    ) -> Tuple[bool, float]:
+        raise NotImplementedError
+    
+    async def close(self) -> None:
+        pass
+
+
+class LocalTokenBucketStore(TokenBucketStore):
+    """
+    Seaux en mémoire du processus
+    
+    - Découpé en shards LRU bornés : l'éviction reste en O(1) et la
+      mémoire est plafonnée même face à un grand nombre d'IP
+    - Aucun verrou : la boucle d'événements sérialise les accès
+    """
+    
+    def __init__(
+        self,
+        shards: int = LOCAL_STORE_SHARDS,
+        shard_size: int = LOCAL_STORE_SHARD_SIZE
+    ):
+        self.shard_size = shard_size
+        self._shards: List["OrderedDict[str, List[float]]"] = [
+            OrderedDict() for _ in range(shards)
+        ]
+    
+    def take_now(
+        self,
+        key: str,
+        cost: int,
+        capacity: int,
+        refill_rate: float,
+        now: Optional[float] = None
+    ) -> Tuple[bool, float]:
+        """Version synchrone de take() (horloge injectable pour les tests)"""
+        now = time.monotonic() if now is None else now
+        shard = self._shards[hash(key) % len(self._shards)]
+        
+        bucket = shard.get(key)
+        if bucket is None:
+            bucket = [float(capacity), now]
+            shard[key] = bucket
+            if len(shard) > self.shard_size:
+                shard.popitem(last=False)
+        else:
+            shard.move_to_end(key)
+            bucket[0] = min(float(capacity), bucket[0] + (now - bucket[1]) * refill_rate)
+            bucket[1] = now
+        
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return True, bucket[0]
+        
+        return False, bucket[0]
+    
+    async def take(
+        self,
+        key: str,
+        cost: int,
+        capacity: int,
+        refill_rate: float
+    ) -> Tuple[bool, float]:
+        return self.take_now(key, cost, capacity, refill_rate)
+    
+    def clear(self) -> None:
+        """Vide tous les seaux (tests)"""
+        for shard in self._shards:
+            shard.clear()
+
+
+# Recharge, consommation et expiration en un seul aller-retour atomique
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisTokenBucketStore(TokenBucketStore):
+    """
+    Seaux partagés entre workers dans Redis
+    Le script Lua rend la décision atomique ; en cas de panne de Redis
+    la requête est acceptée (fail open)
+    """
+    
+    def __init__(self, client: Any = None, url: Optional[str] = None, prefix: str = "ratelimit"):
+        if client is None:
+            from redis import asyncio as aioredis
+            
+            client = aioredis.from_url(
+                url or settings.REDIS_URL,
+                decode_responses=True
+            )
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_LUA)
+    
+    async def take(
+        self,
+        key: str,
+        cost: int,
+        capacity: int,
+        refill_rate: float
+    ) -> Tuple[bool, float]:
+        try:
+            allowed, tokens = await self._script(
+                keys=[f"{self.prefix}:{key}"],
+                args=[capacity, refill_rate, time.time(), cost]
+            )
+        except Exception:
+            logger.warning("Limiteur Redis indisponible: requête acceptée", exc_info=True)
+            return True, float(capacity)
+        
+        return bool(int(allowed)), float(tokens)
+    
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+# ===== Limiteur =====
+class RateLimiter:
+    """
+    Limiteur par token bucket
+    
+    - Utilisateur authentifié : seau "user:<id>" (RATE_LIMIT_USER_PER_MINUTE)
+    - Sinon : seau "ip:<adresse>" (RATE_LIMIT_PER_MINUTE)
+    - La capacité du seau vaut la limite par minute (rafale autorisée),
+      rechargée en continu à limite / 60 jetons par seconde
+    """
+    
+    def __init__(
+        self,
+        store: TokenBucketStore,
+        ip_per_minute: int,
+        user_per_minute: int,
+        enabled: bool = True
+    ):
+        self.store = store
+        self.ip_per_minute = ip_per_minute
+        self.user_per_minute = user_per_minute
+        self.enabled = enabled
+    
+    def use_store(self, store: TokenBucketStore) -> None:
+        """Remplace le stockage (tests)"""
+        self.store = store
+    
+    def is_exempt(self, request: Request) -> bool:
+        """Indique si la route échappe à la limitation"""
+        return not self.enabled or request.url.path in EXEMPT_PATHS
+    
+    @staticmethod
+    def request_cost(request: Request) -> int:
+        """Coût en jetons d'une requête"""
+        path = request.url.path.rstrip("/") or "/"
+        
+        if request.method == "GET" and path == SEARCH_PATH and request.query_params.get("search"):
+            return SEARCH_COST
+        
+        return ROUTE_COSTS.get((request.method, path), DEFAULT_COST)
+    
+    def identify(self, request: Request) -> Tuple[str, int]:
+        """
+        Détermine le seau et la limite d'une requête
+        
+        Le token est décodé via le cache de tokens vérifiés ; un token
+        invalide ou absent retombe sur l'IP.
+        
+        Returns:
+            (Clé du seau, Limite par minute)
+        """
+        authorization = request.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        
+        if scheme.lower() == "bearer" and token:
+            try:
+                payload = decode_token(token)
+            except Exception:
+                payload = None
+            
+            if payload and payload.get("type") == "access" and payload.get("sub") is not None:
+                return f"user:{payload['sub']}", self.user_per_minute
+        
+        client_ip = request.client.host if request.client else "unknown"
+        return f"ip:{client_ip}", self.ip_per_minute
+    
+    async def check(self, request: Request) -> RateLimitDecision:
+        """
+        Consomme les jetons d'une requête
+        
+        Args:
+            request: Requête entrante
+        
+        Returns:
+            Décision (accordée ou non) et valeurs des en-têtes
+        """
+        key, limit = self.identify(request)
+        cost = min(self.request_cost(request), limit)
+        refill_rate = limit / 60
+        
+        allowed, tokens = await self.store.take(key, cost, limit, refill_rate)
+        
+        missing = 0 if allowed else cost - tokens
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=limit,
+            remaining=max(0, int(tokens)),
+            retry_after=max(1, math.ceil(missing / refill_rate)),
+            reset=math.ceil((limit - tokens) / refill_rate)
+        )
+    
+    async def close(self) -> None:
+        """Ferme le stockage"""
+        await self.store.close()
+
+
+def create_rate_limiter() -> RateLimiter:
+    """
+    Crée le limiteur selon la configuration
+    """
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        store: TokenBucketStore = RedisTokenBucketStore()
+    else:
+        store = LocalTokenBucketStore()
+    
+    return RateLimiter(
+        store,
+        ip_per_minute=settings.RATE_LIMIT_PER_MINUTE,
+        user_per_minute=settings.RATE_LIMIT_USER_PER_MINUTE,
+        enabled=settings.RATE_LIMIT_ENABLED
+    )
+
+
+# Instance globale du limiteur
+rate_limiter: RateLimiter = create_rate_limiter()
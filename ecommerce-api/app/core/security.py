@@ -4,8 +4,13 @@ Sécurité & Authentification
 Gestion JWT, hashing passwords, OAuth2
 """
 
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, NamedTuple, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -13,17 +18,132 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, async_session_maker
+from app.core.cache import cache
+from app.core.metrics import (
+    PASSWORD_HASH_PENDING,
+    PASSWORD_HASH_COMPLETED,
+    PASSWORD_HASH_FAILED,
+    PASSWORD_HASH_REJECTED
+)
 
 
 # ===== Configuration du hashing des mots de passe =====
+# Les hashs dont le coût diffère de BCRYPT_ROUNDS sont recalculés à la connexion
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__rounds=settings.BCRYPT_ROUNDS
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_desired_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_desired_rounds=settings.BCRYPT_ROUNDS
+)
+
+
+class PasswordHashPool:
+    """
+    Exécute bcrypt hors de la boucle d'événements
+    
+    - Pool de threads borné (bcrypt libère le GIL)
+    - Contre-pression: au-delà de max_pending calculs en cours ou en
+      attente, la requête est refusée (429) au lieu d'allonger la file
+    - Compteurs exposés par stats() pour la supervision
+    """
+    
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="bcrypt"
+            )
+        return self._executor
+    
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Exécute un calcul bcrypt sur le pool
+        
+        Args:
+            func: Fonction bloquante (pwd_context.hash, verify...)
+            *args: Arguments de la fonction
+        
+        Returns:
+            Résultat de la fonction
+        
+        Raises:
+            HTTPException: Si le pool est saturé (429)
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            PASSWORD_HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Trop de demandes d'authentification, réessayez dans un instant",
+                headers={"Retry-After": "1"}
+            )
+        
+        loop = asyncio.get_running_loop()
+        job = self._get_executor().submit(func, *args)
+        self.pending += 1
+        PASSWORD_HASH_PENDING.inc()
+        # Place libérée à la fin du calcul et non à l'abandon de l'appelant:
+        # un calcul déjà démarré occupe son thread même si la requête est annulée
+        job.add_done_callback(lambda done: loop.call_soon_threadsafe(self._release, done))
+        return await asyncio.wrap_future(job)
+    
+    def _release(self, job: Future) -> None:
+        """Libère la place d'un calcul terminé (exécuté sur la boucle)"""
+        self.pending -= 1
+        PASSWORD_HASH_PENDING.dec()
+        if job.cancelled() or job.exception() is not None:
+            self.failed += 1
+            PASSWORD_HASH_FAILED.inc()
+        else:
+            self.completed += 1
+            PASSWORD_HASH_COMPLETED.inc()
+    
+    def stats(self) -> Dict[str, int]:
+        """Profondeur de file et compteurs du pool"""
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+    
+    def shutdown(self) -> None:
+        """Arrête le pool (fermeture de l'application)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Pool global de hashing
+password_hasher = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
 )
 
 
+# ===== Caches d'authentification =====
+# Tokens dont la signature a déjà été vérifiée (LRU, jusqu'à expiration)
+TOKEN_CACHE_SIZE = 10_000
+
+# Durée de vie du principal (id, rôle, actif) en cache
+PRINCIPAL_CACHE_TTL = 60  # secondes
+
+_verified_tokens: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
 # ===== OAuth2 Schema =====
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_PREFIX}/auth/login"
@@ -58,6 +178,64 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    """
+    Hash un mot de passe sur le pool bcrypt (non bloquant)
+    
+    Args:
+        password: Mot de passe en clair
+    
+    Returns:
+        Hash du mot de passe
+    
+    Raises:
+        HTTPException: Si le pool est saturé (429)
+    """
+    return await password_hasher.run(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Vérifie un mot de passe sur le pool bcrypt (non bloquant)
+    
+    Args:
+        plain_password: Mot de passe en clair
+        hashed_password: Hash à vérifier
+    
+    Returns:
+        True si le mot de passe est correct
+    
+    Raises:
+        HTTPException: Si le pool est saturé (429)
+    """
+    return await password_hasher.run(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Vérifie un mot de passe et recalcule le hash s'il est obsolète
+    (coût bcrypt différent de BCRYPT_ROUNDS), en un seul passage sur le pool
+    
+    Args:
+        plain_password: Mot de passe en clair
+        hashed_password: Hash stocké
+    
+    Returns:
+        (Mot de passe correct, Nouveau hash à enregistrer ou None)
+    
+    Raises:
+        HTTPException: Si le pool est saturé (429)
+    """
+    return await password_hasher.run(
+        pwd_context.verify_and_update,
+        plain_password,
+        hashed_password
+    )
+
+
 # ===== Fonctions JWT =====
 def create_access_token(
     data: Dict[str, Any],
@@ -139,6 +317,10 @@ def decode_token(token: str) -> Dict[str, Any]:
     """
     Décode et valide un token JWT
     
+    Les tokens déjà vérifiés sont servis depuis un cache LRU (clé: hash
+    du token) jusqu'à leur expiration, sans recalculer la signature.
+    Chaque appel reçoit sa propre copie du payload mis en cache.
+    
     Args:
         token: Token JWT à décoder
     
@@ -148,12 +330,28 @@ def decode_token(token: str) -> Dict[str, Any]:
     Raises:
         HTTPException: Si le token est invalide ou expiré
     """
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    
+    cached = _verified_tokens.get(token_hash)
+    if cached is not None:
+        expires_at, payload = cached
+        if expires_at > time.time():
+            _verified_tokens.move_to_end(token_hash)
+            return dict(payload)
+        del _verified_tokens[token_hash]
+    
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
+        
+        if "exp" in payload:
+            _verified_tokens[token_hash] = (float(payload["exp"]), dict(payload))
+            if len(_verified_tokens) > TOKEN_CACHE_SIZE:
+                _verified_tokens.popitem(last=False)
+        
         return payload
     
     except JWTError as e:
@@ -268,6 +466,78 @@ async def get_current_user(
     return user
 
 
+class Principal(NamedTuple):
+    """
+    Identité minimale de l'utilisateur authentifié
+    Suffit aux routes qui n'ont besoin que de l'ID et du rôle
+    """
+    id: int
+    role: str
+    is_active: bool
+
+
+def principal_cache_key(user_id: int) -> str:
+    """Clé du principal d'un utilisateur dans le cache"""
+    return f"principals:{user_id}"
+
+
+async def _load_principal(user_id: int) -> Optional[Dict[str, Any]]:
+    """Lit (id, rôle, actif) en base, sur une session dédiée et courte"""
+    from app.models.user import User
+    from sqlalchemy import select
+    
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(User.id, User.role, User.is_active).where(User.id == user_id)
+        )
+        row = result.first()
+    
+    if row is None:
+        return None
+    
+    return {"id": row.id, "role": getattr(row.role, "value", row.role), "is_active": row.is_active}
+
+
+async def get_current_principal(
+    user_id: int = Depends(get_current_user_id)
+) -> Principal:
+    """
+    Récupère le principal de l'utilisateur courant sans session de requête
+    
+    Servi depuis le cache (TTL court, invalidé à l'activation, la
+    désactivation ou au changement de rôle) ; la base n'est lue qu'en cas
+    d'absence du cache.
+    
+    Args:
+        user_id: ID de l'utilisateur depuis le token
+    
+    Returns:
+        Principal (id, role, is_active)
+    
+    Raises:
+        HTTPException: Si l'utilisateur n'existe pas ou est inactif
+    """
+    data = await cache.get_or_load(
+        principal_cache_key(user_id),
+        lambda: _load_principal(user_id),
+        ttl=PRINCIPAL_CACHE_TTL
+    )
+    
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Utilisateur non trouvé"
+        )
+    
+    if not data["is_active"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Compte utilisateur désactivé"
+        )
+    
+    return Principal(**data)
+
+
 async def get_current_active_user(
     current_user = Depends(get_current_user)
 ):
@@ -0,0 +1,96 @@
+"""
+Templates d'emails (Jinja2)
+Compilés une seule fois au démarrage, échappement HTML automatique
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+from app.core.config import settings
+
+
+# Répertoire des templates : <locale>/<nom>.html
+EMAIL_TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates" / "emails"
+
+
+class EmailTemplates:
+    """
+    Registre des templates d'emails
+    
+    - Tous les templates sont compilés au chargement (auto_reload désactivé :
+      aucun stat() du fichier à chaque rendu)
+    - Résolution (locale, nom) -> Template mise en cache, avec repli
+      sur la locale par défaut
+    - Les parties statiques sont des constantes du code compilé ; seules
+      les variables sont évaluées au rendu (streaming via generate())
+    """
+    
+    def __init__(self, directory: Path, default_locale: str):
+        self.default_locale = default_locale
+        self.env = Environment(
+            loader=FileSystemLoader(str(directory)),
+            autoescape=select_autoescape(["html"]),
+            auto_reload=False,
+            cache_size=-1,
+            trim_blocks=True,
+            lstrip_blocks=True
+        )
+        self.env.globals.update(
+            app_name=settings.APP_NAME,
+            frontend_url=settings.FRONTEND_URL
+        )
+        self._templates: Dict[str, Template] = {}
+    
+    def load(self) -> int:
+        """
+        Compile tous les templates du répertoire
+        
+        Returns:
+            Nombre de templates compilés
+        """
+        for name in self.env.list_templates(extensions=["html"]):
+            self._templates[name] = self.env.get_template(name)
+        return len(self._templates)
+    
+    def get(self, name: str, locale: Optional[str] = None) -> Template:
+        """
+        Retourne un template compilé
+        
+        Args:
+            name: Nom du template (sans extension)
+            locale: Locale souhaitée (défaut: EMAIL_DEFAULT_LOCALE)
+        
+        Returns:
+            Template de la locale, ou de la locale par défaut
+        """
+        key = f"{locale or self.default_locale}/{name}.html"
+        
+        template = self._templates.get(key)
+        if template is None:
+            template = self.env.get_or_select_template([
+                key,
+                f"{self.default_locale}/{name}.html"
+            ])
+            self._templates[key] = template
+        
+        return template
+    
+    def render(self, name: str, locale: Optional[str] = None, **context: Any) -> str:
+        """
+        Rend un template
+        
+        Args:
+            name: Nom du template
+            locale: Locale souhaitée
+            **context: Variables du template
+        
+        Returns:
+            HTML rendu
+        """
+        return "".join(self.get(name, locale).generate(**context))
+
+
+# Instance globale des templates d'emails
+email_templates = EmailTemplates(EMAIL_TEMPLATES_DIR, settings.EMAIL_DEFAULT_LOCALE)
@@ -0,0 +1,4 @@
+"""
+Module jobs - Tâches périodiques
+À lancer par cron / planificateur : python -m app.jobs.<nom>
+"""
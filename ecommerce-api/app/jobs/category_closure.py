@@ -0,0 +1,41 @@
+"""
+Job de reconstruction de la table de fermeture des catégories
+À lancer une fois pour initialiser la table, puis en cas de dérive
+
+Usage: python -m app.jobs.category_closure
+"""
+
+import asyncio
+import logging
+
+from app.core.database import DatabaseTransaction, close_db
+from app.repositories.category import CategoryRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_category_closure() -> int:
+    """
+    Reconstruit la table category_closure depuis categories.parent_id
+    
+    Returns:
+        Nombre de liens ancêtre -> descendant
+    """
+    async with DatabaseTransaction() as session:
+        links = await CategoryRepository(session).rebuild_closure()
+    
+    logger.info("Table de fermeture des catégories reconstruite (%s liens)", links)
+    return links
+
+
+async def main() -> None:
+    try:
+        await rebuild_category_closure()
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""
+Job de réconciliation des compteurs d'utilisation des coupons
+Répare les écarts entre coupons.usage_count/total_discount et order_coupons
+
+Usage: python -m app.jobs.coupon_usage
+"""
+
+import asyncio
+import logging
+
+from app.core.database import DatabaseTransaction, close_db
+from app.repositories.coupon import CouponRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_coupon_usage() -> int:
+    """
+    Recalcule les compteurs d'utilisation de tous les coupons
+    
+    Returns:
+        Nombre de coupons dont les compteurs ont changé
+    """
+    async with DatabaseTransaction() as session:
+        updated = await CouponRepository(session).reconcile_usage_counters()
+    
+    logger.info("Compteurs des coupons réconciliés (%s coupons corrigés)", updated)
+    return updated
+
+
+async def main() -> None:
+    try:
+        await reconcile_coupon_usage()
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
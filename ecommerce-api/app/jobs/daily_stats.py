@@ -0,0 +1,46 @@
+"""
+Job de réconciliation des agrégats journaliers
+Répare les écarts entre order_daily_stats / payment_daily_stats et les
+tables orders / payments (et initialise les agrégats au premier lancement)
+
+Usage: python -m app.jobs.daily_stats
+"""
+
+import asyncio
+import logging
+
+from app.core.database import DatabaseTransaction, close_db
+from app.models.order import Order
+from app.models.payment import Payment
+from app.repositories.statistics import StatisticsRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_daily_stats() -> int:
+    """
+    Recalcule les agrégats journaliers des commandes et des paiements
+    
+    Returns:
+        Nombre de lignes d'agrégats réécrites
+    """
+    rewritten = 0
+    for source in (Order, Payment):
+        async with DatabaseTransaction() as session:
+            rewritten += await StatisticsRepository(session).reconcile(source)
+    
+    logger.info("Agrégats journaliers réconciliés (%s lignes réécrites)", rewritten)
+    return rewritten
+
+
+async def main() -> None:
+    try:
+        await reconcile_daily_stats()
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,30 @@
+"""
+Worker d'envoi des emails en file
+À lancer à part quand EMAIL_DISPATCHER_ENABLED=False dans l'API
+(ex: plusieurs workers Uvicorn, un seul processus d'envoi)
+
+Usage: python -m app.jobs.email_dispatcher
+"""
+
+import asyncio
+import logging
+
+from app.core.database import close_db
+from app.services.email_dispatcher import email_dispatcher
+
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    logger.info("Dispatcher d'emails démarré")
+    try:
+        await email_dispatcher.run_forever()
+    finally:
+        await email_dispatcher.stop()
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""
+Job de réconciliation des agrégats de notes produits
+Répare les écarts entre product_rating_stats et la table reviews
+
+Usage: python -m app.jobs.rating_stats
+"""
+
+import asyncio
+import logging
+
+from app.core.database import DatabaseTransaction, close_db
+from app.repositories.review import ReviewRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_rating_stats() -> int:
+    """
+    Recalcule les agrégats de notes de tous les produits
+    
+    Returns:
+        Nombre de lignes d'agrégats réécrites
+    """
+    async with DatabaseTransaction() as session:
+        rewritten = await ReviewRepository(session).reconcile_rating_stats()
+    
+    logger.info("Agrégats de notes réconciliés (%s lignes réécrites)", rewritten)
+    return rewritten
+
+
+async def main() -> None:
+    try:
+        await reconcile_rating_stats()
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""
+Job de report des deltas dans les agrégats journaliers
+Vide order_stats_deltas / payment_stats_deltas dans order_daily_stats /
+payment_daily_stats (à lancer fréquemment, ex. toutes les minutes)
+
+Usage: python -m app.jobs.stats_rollup
+"""
+
+import asyncio
+import logging
+
+from app.core.database import DatabaseTransaction, close_db
+from app.models.order import Order
+from app.models.payment import Payment
+from app.repositories.statistics import StatisticsRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+async def fold_stats_deltas() -> int:
+    """
+    Reporte les deltas en attente des commandes et des paiements
+    
+    Returns:
+        Nombre de deltas reportés
+    """
+    folded = 0
+    for source in (Order, Payment):
+        async with DatabaseTransaction() as session:
+            folded += await StatisticsRepository(session).fold_deltas(source)
+    
+    logger.info("Deltas d'agrégats reportés (%s lignes)", folded)
+    return folded
+
+
+async def main() -> None:
+    try:
+        await fold_stats_deltas()
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -4,7 +4,7 @@ Point d'entrée de l'application FastAPI E-commerce
 """
 
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
@@ -12,6 +12,20 @@ import time
 
 from app.core.config import settings
 from app.core.database import init_db, close_db
+from app.core.cache import cache
+from app.core.security import password_hasher
+from app.core.rate_limit import rate_limiter
+from app.core.templates import email_templates
+from app.core.profiling import start_profile, log_profile
+from app.core.metrics import (
+    registry,
+    HTTP_REQUESTS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_RATE_LIMITED
+)
+from app.services.email_dispatcher import email_dispatcher
+from app.services.coupon_index import coupon_index
 from app.api.v1 import api_router
 
 
@@ -30,11 +44,28 @@ async def lifespan(app: FastAPI):
     if settings.DEBUG:
         print("🔧 Mode DEBUG activé")
     
+    # Compiler les templates d'emails une seule fois
+    print(f"✉️  {email_templates.load()} templates d'emails compilés")
+    
+    # Index des coupons (rechargé à la demande si la base est indisponible)
+    try:
+        print(f"🏷️  {await coupon_index.load()} coupons indexés")
+    except Exception as e:
+        print(f"⚠️  Index des coupons non chargé: {e}")
+    
+    # Envoi des emails en file
+    if settings.EMAIL_DISPATCHER_ENABLED:
+        email_dispatcher.start()
+    
     yield
     
     # Shutdown
     print("🛑 Arrêt de l'application...")
+    await email_dispatcher.stop()
     await close_db()
+    await cache.close()
+    password_hasher.shutdown()
+    await rate_limiter.close()
     print("✅ Connexions fermées")
 
 
@@ -52,6 +83,29 @@ app = FastAPI(
 
 # ===== Middlewares =====
 
+# Limitation de débit (déclarée en premier : s'exécute à l'intérieur du CORS,
+# les réponses 429 portent donc les en-têtes CORS)
+@app.middleware("http")
+async def rate_limit(request: Request, call_next):
+    """Applique les token buckets et ajoute les en-têtes X-RateLimit-*"""
+    if rate_limiter.is_exempt(request):
+        return await call_next(request)
+    
+    decision = await rate_limiter.check(request)
+    
+    if not decision.allowed:
+        HTTP_RATE_LIMITED.inc()
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Trop de requêtes, réessayez plus tard"},
+            headers=decision.headers()
+        )
+    
+    response = await call_next(request)
+    response.headers.update(decision.headers())
+    return response
+
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -69,14 +123,34 @@ if settings.is_production:
     )
 
 
-# Middleware de timing des requêtes
+# Middleware de timing, métriques et profilage SQL des requêtes
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    """Ajoute le temps de traitement dans les headers"""
+    """Ajoute le temps de traitement et les mesures SQL dans les headers"""
     start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
+    profile = start_profile(request.method, request.url.path) if settings.PROFILING_ENABLED else None
+    status_code = 500
+    
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        process_time = time.time() - start_time
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        
+        # Gabarit de route (ex: /api/v1/products/{product_id}) : cardinalité bornée
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        HTTP_REQUESTS.inc(request.method, route_path, str(status_code))
+        HTTP_REQUEST_DURATION.observe(process_time, request.method, route_path)
+    
     response.headers["X-Process-Time"] = str(process_time)
+    
+    if profile is not None:
+        response.headers["Server-Timing"] = profile.server_timing()
+        log_profile(profile, status_code)
+    
     return response
 
 
@@ -132,6 +206,21 @@ async def health_check():
     }
 
 
+@app.get(
+    "/metrics",
+    tags=["Health"],
+    summary="Métriques Prometheus",
+    response_class=PlainTextResponse,
+    include_in_schema=False
+)
+async def metrics():
+    """Expose les métriques au format texte Prometheus"""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # Inclure le router API v1
 app.include_router(
     api_router,
@@ -7,14 +7,16 @@ Importations centralisées pour faciliter l'usage
 from app.models.base import BaseModel, TimestampMixin
 from app.models.user import User, UserRole
 from app.models.address import Address, AddressType
-from app.models.category import Category
+from app.models.category import Category, category_closure
 from app.models.product import Product, ProductImage, product_categories
 from app.models.cart import Cart, CartItem
-from app.models.order import Order, OrderItem, OrderStatus, order_coupons
+from app.models.order import Order, OrderItem, OrderStatus, ORDER_STATUS_TRANSITIONS, order_coupons
 from app.models.payment import Payment, PaymentMethod, PaymentStatus
-from app.models.review import Review
+from app.models.review import Review, ProductRatingStats
 from app.models.coupon import Coupon, DiscountType
 from app.models.activity_log import ActivityLog
+from app.models.email_outbox import EmailOutbox, EmailStatus
+from app.models.statistics import OrderDailyStats, PaymentDailyStats, OrderStatsDelta, PaymentStatsDelta
 
 
 __all__ = [
@@ -32,6 +34,7 @@ __all__ = [
     
     # Category
     "Category",
+    "category_closure",
     
     # Product
     "Product",
@@ -46,6 +49,7 @@ __all__ = [
     "Order",
     "OrderItem",
     "OrderStatus",
+    "ORDER_STATUS_TRANSITIONS",
     "order_coupons",
     
     # Payment
@@ -55,6 +59,7 @@ __all__ = [
     
     # Review
     "Review",
+    "ProductRatingStats",
     
     # Coupon
     "Coupon",
@@ -62,4 +67,14 @@ __all__ = [
     
     # Activity Log
     "ActivityLog",
+    
+    # Email Outbox
+    "EmailOutbox",
+    "EmailStatus",
+    
+    # Statistics
+    "OrderDailyStats",
+    "PaymentDailyStats",
+    "OrderStatsDelta",
+    "PaymentStatsDelta",
 ]
\ No newline at end of file
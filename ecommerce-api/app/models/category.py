@@ -3,13 +3,42 @@ Modèle Category - Catégories de produits (hiérarchiques)
 """
 
 from sqlalchemy import (
-    Column, BigInteger, String, Text, Boolean, ForeignKey, DateTime, func
+    Column, BigInteger, Integer, String, Text, Boolean, ForeignKey, DateTime,
+    func, Table, Index
 )
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 
 
+# ===== Table de fermeture transitive (ancêtre -> descendant) =====
+# Une ligne par couple (ancêtre, descendant), y compris (c, c) à profondeur 0.
+# Maintenue par CategoryRepository à la création, au déplacement et à la suppression.
+category_closure = Table(
+    "category_closure",
+    Base.metadata,
+    Column(
+        "ancestor_id",
+        BigInteger,
+        ForeignKey("categories.id", ondelete="CASCADE"),
+        primary_key=True
+    ),
+    Column(
+        "descendant_id",
+        BigInteger,
+        ForeignKey("categories.id", ondelete="CASCADE"),
+        primary_key=True
+    ),
+    Column(
+        "depth",
+        Integer,
+        nullable=False,
+        comment="Distance entre l'ancêtre et le descendant (0 = lui-même)"
+    ),
+    Index("ix_category_closure_descendant_depth", "descendant_id", "depth"),
+)
+
+
 class Category(Base):
     """
     Modèle Category - Catégories de produits
@@ -4,11 +4,13 @@ Modèle Coupon - Coupons de réduction
 """
 
 from sqlalchemy import (
-    Column, BigInteger, String, DECIMAL, Enum, Boolean, DateTime, func
+    Column, BigInteger, Integer, String, DECIMAL, Enum, Boolean, DateTime, func
 )
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, Optional
 
 from app.core.database import Base
 
@@ -19,6 +21,49 @@ class DiscountType(str, enum.Enum):
     FIXED = "fixed"
 
 
+# Arrondi des réductions au centime
+CENT = Decimal("0.01")
+
+
+def compile_discount(
+    discount_type: DiscountType,
+    discount_value: Decimal,
+    min_order_amount: Optional[Decimal] = None
+) -> Callable[[Decimal], Decimal]:
+    """
+    Compile le calcul de réduction d'un coupon (Decimal exact)
+    
+    Le taux et les seuils sont convertis une fois ; la fonction retournée
+    ne fait plus qu'une comparaison et une multiplication.
+    
+    Args:
+        discount_type: Pourcentage ou montant fixe
+        discount_value: Valeur de la réduction
+        min_order_amount: Montant minimum de commande (optionnel)
+    
+    Returns:
+        Fonction montant -> réduction (arrondie au centime, jamais
+        supérieure au montant, 0 sous le minimum de commande)
+    """
+    value = Decimal(discount_value)
+    minimum = Decimal(min_order_amount) if min_order_amount else None
+    
+    if discount_type == DiscountType.PERCENTAGE:
+        rate = value / 100
+        
+        def discount(amount: Decimal) -> Decimal:
+            if minimum is not None and amount < minimum:
+                return Decimal("0")
+            return min((amount * rate).quantize(CENT, rounding=ROUND_HALF_UP), amount)
+    else:
+        def discount(amount: Decimal) -> Decimal:
+            if minimum is not None and amount < minimum:
+                return Decimal("0")
+            return min(value, amount)
+    
+    return discount
+
+
 class Coupon(Base):
     """
     Modèle Coupon - Coupons de réduction
@@ -76,6 +121,20 @@ class Coupon(Base):
         comment="Coupon actif ou désactivé"
     )
     
+    usage_count = Column(
+        Integer,
+        default=0,
+        nullable=False,
+        comment="Nombre de commandes ayant utilisé le coupon (maintenu au checkout)"
+    )
+    
+    total_discount = Column(
+        DECIMAL(14, 2),
+        default=0,
+        nullable=False,
+        comment="Somme des réductions accordées (maintenue au checkout)"
+    )
+    
     created_at = Column(
         DateTime,
         default=func.now(),
@@ -113,7 +172,7 @@ class Coupon(Base):
         """Vérifie si c'est une réduction fixe"""
         return self.discount_type == DiscountType.FIXED
     
-    def calculate_discount(self, order_amount: float) -> float:
+    def calculate_discount(self, order_amount: Decimal) -> Decimal:
         """
         Calcule le montant de la réduction pour un montant donné
         
@@ -121,20 +180,16 @@ class Coupon(Base):
             order_amount: Montant de la commande
         
         Returns:
-            Montant de la réduction
+            Montant de la réduction (arrondi au centime)
         """
         if not self.is_valid:
-            return 0.0
-        
-        if self.min_order_amount and order_amount < float(self.min_order_amount):
-            return 0.0
-        
-        if self.is_percentage:
-            discount = order_amount * (float(self.discount_value) / 100)
-            return min(discount, order_amount)  # Ne peut pas dépasser le montant
+            return Decimal("0")
         
-        # Fixed discount
-        return min(float(self.discount_value), order_amount)
+        return compile_discount(
+            self.discount_type,
+            self.discount_value,
+            self.min_order_amount
+        )(Decimal(order_amount))
     
     def __repr__(self) -> str:
         discount_str = f"{self.discount_value}%" if self.is_percentage else f"{self.discount_value}€"
@@ -0,0 +1,105 @@
+"""
+Modèle EmailOutbox - File d'envoi des emails
+"""
+
+from datetime import datetime
+from sqlalchemy import (
+    Column, BigInteger, Integer, String, Text, Enum, DateTime, Index
+)
+import enum
+
+from app.models.base import BaseModel
+
+
+class EmailStatus(str, enum.Enum):
+    """Statuts d'un email en file"""
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class EmailOutbox(BaseModel):
+    """
+    Modèle EmailOutbox - Emails en attente d'envoi
+    
+    Les routes ne font qu'insérer une ligne (dans la transaction de la
+    requête) ; le dispatcher d'emails les envoie en arrière-plan.
+    """
+    
+    __tablename__ = "email_outbox"
+    
+    # ===== Colonnes =====
+    id = Column(
+        BigInteger().with_variant(BigInteger, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+        comment="Identifiant unique"
+    )
+    
+    to_email = Column(
+        String(255),
+        nullable=False,
+        comment="Destinataire"
+    )
+    
+    subject = Column(
+        String(255),
+        nullable=False,
+        comment="Sujet"
+    )
+    
+    html_content = Column(
+        Text,
+        nullable=False,
+        comment="Contenu HTML"
+    )
+    
+    text_content = Column(
+        Text,
+        nullable=True,
+        comment="Contenu texte (optionnel)"
+    )
+    
+    status = Column(
+        Enum(EmailStatus),
+        default=EmailStatus.PENDING,
+        nullable=False,
+        comment="Statut d'envoi"
+    )
+    
+    attempts = Column(
+        Integer,
+        default=0,
+        nullable=False,
+        comment="Nombre de tentatives d'envoi"
+    )
+    
+    # Horloge UTC de l'application, comme claim_batch (func.now() suivrait
+    # le fuseau du serveur MySQL)
+    next_attempt_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False,
+        comment="Date de la prochaine tentative (UTC)"
+    )
+    
+    last_error = Column(
+        Text,
+        nullable=True,
+        comment="Dernière erreur SMTP"
+    )
+    
+    sent_at = Column(
+        DateTime,
+        nullable=True,
+        comment="Date d'envoi"
+    )
+    
+    # ===== Index (sélection des emails à envoyer) =====
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<EmailOutbox(id={self.id}, to='{self.to_email}', status='{self.status}')>"
@@ -23,6 +23,17 @@ class OrderStatus(str, enum.Enum):
     REFUNDED = "refunded"
 
 
+# Transitions de statut autorisées (machine à états des commandes)
+ORDER_STATUS_TRANSITIONS = {
+    OrderStatus.PENDING: frozenset({OrderStatus.PAID, OrderStatus.CANCELLED}),
+    OrderStatus.PAID: frozenset({OrderStatus.SHIPPED, OrderStatus.CANCELLED, OrderStatus.REFUNDED}),
+    OrderStatus.SHIPPED: frozenset({OrderStatus.DELIVERED, OrderStatus.REFUNDED}),
+    OrderStatus.DELIVERED: frozenset({OrderStatus.REFUNDED}),
+    OrderStatus.CANCELLED: frozenset(),
+    OrderStatus.REFUNDED: frozenset(),
+}
+
+
 # ===== Table d'association commandes <-> coupons =====
 order_coupons = Table(
     "order_coupons",
@@ -87,6 +98,13 @@ class Order(BaseModel):
         comment="Montant total TTC"
     )
     
+    discount_amount = Column(
+        DECIMAL(12, 2),
+        default=0,
+        nullable=False,
+        comment="Réduction appliquée par coupon (déjà déduite du total)"
+    )
+    
     billing_address_id = Column(
         BigInteger,
         ForeignKey("addresses.id", ondelete="SET NULL"),
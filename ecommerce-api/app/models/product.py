@@ -5,7 +5,7 @@ Modèles Product - Produits et images
 
 from sqlalchemy import (
     Column, BigInteger, String, Text, DECIMAL, Integer, Boolean,
-    ForeignKey, DateTime, func, Table
+    ForeignKey, DateTime, func, Table, Index
 )
 from sqlalchemy.orm import relationship
 from typing import Optional
@@ -43,6 +43,7 @@ class Product(BaseModel):
         - cart_items: Items de panier contenant ce produit (1-N)
         - order_items: Items de commande contenant ce produit (1-N)
         - reviews: Avis clients sur ce produit (1-N)
+        - rating_stats: Agrégats des avis approuvés (1-1)
     """
     
     __tablename__ = "products"
@@ -109,6 +110,16 @@ class Product(BaseModel):
         comment="Produit actif ou désactivé"
     )
     
+    # ===== Index composites (listings filtrés sur is_active puis triés) =====
+    __table_args__ = (
+        Index("ix_products_active_created_at", "is_active", "created_at"),
+        Index("ix_products_active_price", "is_active", "price"),
+        Index("ix_products_active_stock", "is_active", "stock"),
+        Index("ix_products_fulltext", "name", "description", "sku", mysql_prefix="FULLTEXT"),
+        # Recherche par préfixe des termes trop courts pour le FULLTEXT
+        Index("ix_products_name", "name"),
+    )
+    
     # ===== Relations =====
     categories = relationship(
         "Category",
@@ -140,6 +151,13 @@ class Product(BaseModel):
         cascade="all, delete-orphan"
     )
     
+    rating_stats = relationship(
+        "ProductRatingStats",
+        back_populates="product",
+        uselist=False,
+        cascade="all, delete-orphan"
+    )
+    
     # ===== Propriétés calculées =====
     @property
     def current_price(self) -> float:
@@ -177,21 +195,17 @@ class Product(BaseModel):
     
     @property
     def average_rating(self) -> Optional[float]:
-        """Calcule la note moyenne des avis"""
-        if not self.reviews:
-            return None
-        approved_reviews = [r for r in self.reviews if r.is_approved]
-        if not approved_reviews:
+        """Note moyenne des avis approuvés (agrégat rating_stats)"""
+        if self.rating_stats is None:
             return None
-        total = sum(r.rating for r in approved_reviews)
-        return round(total / len(approved_reviews), 2)
+        return self.rating_stats.average
     
     @property
     def review_count(self) -> int:
-        """Nombre d'avis approuvés"""
-        if not self.reviews:
+        """Nombre d'avis approuvés (agrégat rating_stats)"""
+        if self.rating_stats is None:
             return 0
-        return len([r for r in self.reviews if r.is_approved])
+        return self.rating_stats.review_count
     
     def __repr__(self) -> str:
         return f"<Product(id={self.id}, name='{self.name}', price={self.current_price})>"
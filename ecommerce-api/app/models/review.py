@@ -1,6 +1,6 @@
 
 """
-Modèle Review - Avis clients
+Modèles Review - Avis clients et agrégats de notes
 """
 
 from sqlalchemy import (
@@ -8,6 +8,7 @@ from sqlalchemy import (
     func, CheckConstraint
 )
 from sqlalchemy.orm import relationship
+from typing import Dict, Optional
 
 from app.core.database import Base
 
@@ -101,4 +102,77 @@ class Review(Base):
         return "★" * self.rating + "☆" * (5 - self.rating)
     
     def __repr__(self) -> str:
-        return f"<Review(id={self.id}, product_id={self.product_id}, user_id={self.user_id}, rating={self.rating})>"
\ No newline at end of file
+        return f"<Review(id={self.id}, product_id={self.product_id}, user_id={self.user_id}, rating={self.rating})>"
+
+
+class ProductRatingStats(Base):
+    """
+    Modèle ProductRatingStats - Agrégats des avis approuvés d'un produit
+    
+    Maintenu de façon incrémentale par ReviewRepository (création,
+    approbation, rejet, suppression) et réconcilié périodiquement
+    depuis la table reviews.
+    
+    Relations:
+        - product: Produit concerné (1-1)
+    """
+    
+    __tablename__ = "product_rating_stats"
+    
+    # ===== Colonnes =====
+    product_id = Column(
+        BigInteger,
+        ForeignKey("products.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="Identifiant du produit"
+    )
+    
+    review_count = Column(
+        Integer,
+        default=0,
+        nullable=False,
+        comment="Nombre d'avis approuvés"
+    )
+    
+    rating_sum = Column(
+        Integer,
+        default=0,
+        nullable=False,
+        comment="Somme des notes approuvées"
+    )
+    
+    rating_1 = Column(Integer, default=0, nullable=False, comment="Avis approuvés à 1 étoile")
+    rating_2 = Column(Integer, default=0, nullable=False, comment="Avis approuvés à 2 étoiles")
+    rating_3 = Column(Integer, default=0, nullable=False, comment="Avis approuvés à 3 étoiles")
+    rating_4 = Column(Integer, default=0, nullable=False, comment="Avis approuvés à 4 étoiles")
+    rating_5 = Column(Integer, default=0, nullable=False, comment="Avis approuvés à 5 étoiles")
+    
+    updated_at = Column(
+        DateTime,
+        default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+        comment="Date de dernière mise à jour"
+    )
+    
+    # ===== Relations =====
+    product = relationship(
+        "Product",
+        back_populates="rating_stats"
+    )
+    
+    # ===== Propriétés calculées =====
+    @property
+    def average(self) -> Optional[float]:
+        """Note moyenne des avis approuvés"""
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
+    
+    @property
+    def distribution(self) -> Dict[int, int]:
+        """Distribution des notes {note: nombre_avis}"""
+        return {rating: getattr(self, f"rating_{rating}") or 0 for rating in range(1, 6)}
+    
+    def __repr__(self) -> str:
+        return f"<ProductRatingStats(product_id={self.product_id}, count={self.review_count}, average={self.average})>"
@@ -0,0 +1,162 @@
+"""
+Modèles de statistiques - Agrégats journaliers des commandes et paiements
+"""
+
+from sqlalchemy import Column, BigInteger, Integer, DECIMAL, Date, DateTime, Enum, func
+
+from app.core.database import Base
+from app.models.order import OrderStatus
+from app.models.payment import PaymentStatus
+
+
+class DailyStatsMixin:
+    """
+    Colonnes communes d'un agrégat journalier (jour x statut)
+    
+    Le jour est celui de création de la ligne source : un changement de
+    statut déplace la ligne d'un statut à l'autre sans changer de jour.
+    """
+    
+    day = Column(
+        Date,
+        primary_key=True,
+        comment="Jour de création"
+    )
+    
+    total = Column(
+        Integer,
+        default=0,
+        nullable=False,
+        comment="Nombre de lignes"
+    )
+    
+    amount = Column(
+        DECIMAL(14, 2),
+        default=0,
+        nullable=False,
+        comment="Somme des montants"
+    )
+    
+    updated_at = Column(
+        DateTime,
+        default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+        comment="Date de dernière mise à jour"
+    )
+
+
+class OrderDailyStats(DailyStatsMixin, Base):
+    """
+    Modèle OrderDailyStats - Commandes et montants par jour et statut
+    
+    Alimenté par le report des deltas (OrderStatsDelta) écrits par
+    OrderRepository et réconcilié périodiquement depuis la table orders.
+    """
+    
+    __tablename__ = "order_daily_stats"
+    
+    status = Column(
+        Enum(OrderStatus),
+        primary_key=True,
+        comment="Statut de la commande"
+    )
+    
+    def __repr__(self) -> str:
+        return f"<OrderDailyStats(day={self.day}, status='{self.status}', total={self.total})>"
+
+
+class PaymentDailyStats(DailyStatsMixin, Base):
+    """
+    Modèle PaymentDailyStats - Paiements et montants par jour et statut
+    
+    Alimenté par le report des deltas (PaymentStatsDelta) écrits par
+    PaymentRepository et réconcilié périodiquement depuis la table payments.
+    """
+    
+    __tablename__ = "payment_daily_stats"
+    
+    status = Column(
+        Enum(PaymentStatus),
+        primary_key=True,
+        comment="Statut du paiement"
+    )
+    
+    def __repr__(self) -> str:
+        return f"<PaymentDailyStats(day={self.day}, status='{self.status}', total={self.total})>"
+
+
+class StatsDeltaMixin:
+    """
+    Colonnes communes d'un delta d'agrégat (journal en ajout seul)
+    
+    Les transactions métier (checkout, changements de statut) n'insèrent
+    que des lignes nouvelles : aucune ligne partagée n'est verrouillée.
+    Le job stats_rollup reporte périodiquement les deltas dans les
+    agrégats journaliers puis les supprime.
+    """
+    
+    id = Column(
+        BigInteger,
+        primary_key=True,
+        autoincrement=True
+    )
+    
+    day = Column(
+        Date,
+        nullable=False,
+        comment="Jour de création de la ligne source"
+    )
+    
+    total = Column(
+        Integer,
+        nullable=False,
+        comment="Variation du nombre de lignes"
+    )
+    
+    amount = Column(
+        DECIMAL(14, 2),
+        nullable=False,
+        comment="Variation de la somme des montants"
+    )
+    
+    created_at = Column(
+        DateTime,
+        default=func.now(),
+        nullable=False,
+        comment="Date d'enregistrement du delta"
+    )
+
+
+class OrderStatsDelta(StatsDeltaMixin, Base):
+    """
+    Modèle OrderStatsDelta - Variations en attente de order_daily_stats
+    """
+    
+    __tablename__ = "order_stats_deltas"
+    
+    status = Column(
+        Enum(OrderStatus),
+        nullable=False,
+        comment="Statut de la commande"
+    )
+    
+    def __repr__(self) -> str:
+        return f"<OrderStatsDelta(id={self.id}, day={self.day}, status='{self.status}', total={self.total})>"
+
+
+class PaymentStatsDelta(StatsDeltaMixin, Base):
+    """
+    Modèle PaymentStatsDelta - Variations en attente de payment_daily_stats
+    """
+    
+    __tablename__ = "payment_stats_deltas"
+    
+    status = Column(
+        Enum(PaymentStatus),
+        nullable=False,
+        comment="Statut du paiement"
+    )
+    
+    def __repr__(self) -> str:
+        return f"<PaymentStatsDelta(id={self.id}, day={self.day}, status='{self.status}', total={self.total})>"
@@ -12,6 +12,8 @@ from app.repositories.order import OrderRepository, OrderItemRepository
 from app.repositories.payment import PaymentRepository
 from app.repositories.review import ReviewRepository
 from app.repositories.coupon import CouponRepository
+from app.repositories.email_outbox import EmailOutboxRepository
+from app.repositories.statistics import StatisticsRepository
 
 
 __all__ = [
@@ -26,4 +28,6 @@ __all__ = [
     "PaymentRepository",
     "ReviewRepository",
     "CouponRepository",
+    "EmailOutboxRepository",
+    "StatisticsRepository",
 ]
\ No newline at end of file
@@ -4,15 +4,22 @@ Repository de base générique
 Pattern Repository pour abstraire l'accès aux données
 """
 
-from typing import TypeVar, Generic, Type, Optional, List, Any
-from sqlalchemy import select, update, delete, func
+from typing import TypeVar, Generic, Type, Optional, List, Any, Tuple, Dict, FrozenSet
+from sqlalchemy import select, insert, update, delete, func, case, literal, text, Select, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import Base
+from app.utils.pagination import Cursor
 
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Nombre de lignes par INSERT multi-lignes (limite max_allowed_packet)
+BULK_INSERT_CHUNK_SIZE = 1000
+
+# Nombre de lignes par UPDATE ... CASE (taille de la requête générée)
+BULK_UPDATE_CHUNK_SIZE = 500
+
 
 class BaseRepository(Generic[ModelType]):
     """
@@ -49,7 +56,8 @@ class BaseRepository(Generic[ModelType]):
         self,
         skip: int = 0,
         limit: int = 100,
-        order_by: Optional[str] = None
+        order_by: Optional[str] = None,
+        after: Optional[Cursor] = None
     ) -> List[ModelType]:
         """
         Récupère tous les enregistrements avec pagination
@@ -58,19 +66,119 @@ class BaseRepository(Generic[ModelType]):
             skip: Nombre d'enregistrements à sauter
             limit: Nombre maximum d'enregistrements
             order_by: Colonne pour le tri
+            after: Curseur keyset (remplace skip)
         
         Returns:
             Liste d'enregistrements
+        
+        Sans order_by, le tri est (created_at, id) décroissant, ce qui
+        permet de poursuivre le listing avec un curseur.
+        
+        Raises:
+            ValueError: Si order_by est combiné à un curseur
         """
-        query = select(self.model).offset(skip).limit(limit)
+        query = select(self.model)
+        
+        if order_by and after is not None:
+            raise ValueError(
+                "La pagination par curseur requiert le tri par date de création"
+            )
         
         if order_by:
+            query = query.offset(skip).limit(limit)
+            
             if hasattr(self.model, order_by):
                 query = query.order_by(getattr(self.model, order_by))
+        else:
+            query = self.keyset_page(query, skip, limit, after)
         
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
+    def apply_cursor(
+        self,
+        query: Select,
+        after: Optional[Cursor],
+        descending: bool = True
+    ) -> Select:
+        """
+        Applique la pagination keyset sur (created_at, id)
+        
+        La requête est triée par (created_at, id) et, si un curseur est
+        fourni, restreinte aux lignes situées strictement après lui.
+        Le coût ne dépend plus de la profondeur de la page.
+        
+        Args:
+            query: Requête SELECT filtrée (sans tri)
+            after: Curseur du dernier élément de la page précédente
+            descending: Tri décroissant (plus récents d'abord)
+        
+        Returns:
+            Requête triée et restreinte
+        
+        Raises:
+            ValueError: Si le curseur provient d'un listing trié autrement
+        """
+        created_at = self.model.created_at
+        id_column = self.model.id
+        
+        if descending:
+            query = query.order_by(created_at.desc(), id_column.desc())
+        else:
+            query = query.order_by(created_at.asc(), id_column.asc())
+        
+        if after is None:
+            return query
+        
+        if after.sort != "created_at":
+            raise ValueError(
+                "La pagination par curseur requiert le tri par date de création"
+            )
+        
+        if descending:
+            return query.where(
+                or_(
+                    created_at < after.value,
+                    and_(created_at == after.value, id_column < after.id)
+                )
+            )
+        
+        return query.where(
+            or_(
+                created_at > after.value,
+                and_(created_at == after.value, id_column > after.id)
+            )
+        )
+    
+    def keyset_page(
+        self,
+        query: Select,
+        skip: int,
+        limit: int,
+        after: Optional[Cursor] = None
+    ) -> Select:
+        """
+        Pagine une requête triée par (created_at, id) décroissants
+        
+        Avec un curseur, la page commence juste après lui (keyset).
+        Sans curseur, l'offset classique est utilisé.
+        
+        Args:
+            query: Requête SELECT filtrée (sans tri)
+            skip: Offset (ignoré si curseur)
+            limit: Limite
+            after: Curseur optionnel
+        
+        Returns:
+            Requête paginée
+        """
+        query = self.apply_cursor(query, after).limit(limit)
+        
+        if after is None:
+            query = query.offset(skip)
+        
+        return query
+    
     async def create(self, obj_in: dict) -> ModelType:
         """
         Crée un nouvel enregistrement
@@ -151,6 +259,60 @@ class BaseRepository(Generic[ModelType]):
         result = await self.db.execute(query)
         return result.scalar_one()
     
+    async def count_query(self, query: Select) -> int:
+        """
+        Compte les lignes retournées par une requête (sans pagination)
+        
+        Args:
+            query: Requête SELECT filtrée
+        
+        Returns:
+            Nombre de lignes correspondant au prédicat
+        """
+        subquery = query.order_by(None).limit(None).offset(None).subquery()
+        result = await self.db.execute(
+            select(func.count()).select_from(subquery)
+        )
+        return result.scalar_one()
+    
+    async def paginate(
+        self,
+        query: Select,
+        skip: int = 0,
+        limit: int = 100
+    ) -> Tuple[List[ModelType], int]:
+        """
+        Exécute une requête paginée et retourne la page avec le total
+        
+        Le total est obtenu dans la même requête via COUNT(*) OVER ().
+        Si la page est vide (offset au-delà des résultats), un COUNT(*)
+        sur le même prédicat est exécuté pour connaître le total.
+        
+        Args:
+            query: Requête SELECT filtrée et triée
+            skip: Offset
+            limit: Limite
+        
+        Returns:
+            (Liste d'enregistrements, Total)
+        """
+        windowed_query = (
+            query
+            .add_columns(func.count().over().label("total_count"))
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self.db.execute(windowed_query)
+        rows = result.all()
+        
+        if rows:
+            return [row[0] for row in rows], rows[0][1]
+        
+        if skip == 0:
+            return [], 0
+        
+        return [], await self.count_query(query)
+    
     async def exists(self, id: int) -> bool:
         """
         Vérifie si un enregistrement existe
@@ -180,43 +342,184 @@ class BaseRepository(Generic[ModelType]):
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
-    async def bulk_create(self, objects: List[dict]) -> List[ModelType]:
+    async def bulk_create(
+        self,
+        objects: List[dict],
+        hydrate: bool = True,
+        chunk_size: int = BULK_INSERT_CHUNK_SIZE
+    ) -> List[ModelType]:
         """
-        Crée plusieurs enregistrements en une seule opération
+        Crée plusieurs enregistrements en un INSERT multi-lignes par lot
+        
+        Les clés primaires sont récupérées sans rafraîchir chaque objet :
+        - via RETURNING si le dialecte le supporte (MariaDB, SQLite, PostgreSQL)
+        - sinon (MySQL) via LAST_INSERT_ID(), qui donne le premier ID d'un
+          INSERT multi-lignes, les suivants étant espacés de
+          @@auto_increment_increment (Galera, réplication multi-primaire),
+          puis un unique SELECT sur ces IDs
         
         Args:
-            objects: Liste de dictionnaires de données
+            objects: Liste de dictionnaires de données (mêmes clés)
+            hydrate: Retourner les enregistrements créés (False: INSERT seul)
+            chunk_size: Nombre maximal de lignes par INSERT
         
         Returns:
-            Liste d'enregistrements créés
+            Liste d'enregistrements créés (vide si hydrate=False)
         """
-        db_objects = [self.model(**obj) for obj in objects]
-        self.db.add_all(db_objects)
-        await self.db.flush()
+        created: List[ModelType] = []
+        
+        for start in range(0, len(objects), chunk_size):
+            chunk = objects[start:start + chunk_size]
+            created.extend(await self._insert_chunk(chunk, hydrate))
+        
+        return created
+    
+    async def _insert_chunk(self, rows: List[dict], hydrate: bool) -> List[ModelType]:
+        """
+        Insère un lot de lignes
+        
+        Args:
+            rows: Lignes à insérer
+            hydrate: Recharger les enregistrements créés
+        
+        Returns:
+            Enregistrements créés, dans l'ordre des lignes (vide si hydrate=False)
+        
+        Raises:
+            RuntimeError: Si les IDs déduits ne retrouvent pas toutes les lignes
+        """
+        if not hydrate:
+            await self.db.execute(insert(self.model), rows)
+            return []
+        
+        dialect = self.db.get_bind().dialect
         
-        for obj in db_objects:
-            await self.db.refresh(obj)
+        if dialect.insert_executemany_returning:
+            result = await self.db.scalars(
+                insert(self.model).returning(self.model),
+                rows
+            )
+            return list(result.all())
         
-        return db_objects
+        result = await self.db.execute(insert(self.model.__table__).values(rows))
+        first_id = result.lastrowid
+        step = await self._auto_increment_step()
+        ids = [first_id + i * step for i in range(len(rows))]
+        
+        query = select(self.model).where(self.model.id.in_(ids))
+        loaded = await self.db.execute(query)
+        by_id = {obj.id: obj for obj in loaded.scalars().all()}
+        
+        if len(by_id) != len(rows):
+            raise RuntimeError(
+                f"{len(rows)} lignes insérées dans {self.model.__tablename__}, "
+                f"{len(by_id)} retrouvées par leurs IDs"
+            )
+        
+        return [by_id[id] for id in ids]
+    
+    async def _auto_increment_step(self) -> int:
+        """Écart entre deux IDs auto-incrémentés (@@auto_increment_increment)"""
+        result = await self.db.execute(text("SELECT @@auto_increment_increment"))
+        return int(result.scalar_one())
     
-    async def bulk_update(self, updates: List[dict]) -> bool:
+    async def bulk_update(
+        self,
+        updates: List[dict],
+        chunk_size: int = BULK_UPDATE_CHUNK_SIZE,
+        refetch: bool = False,
+        skip_none: bool = True
+    ) -> int:
         """
-        Met à jour plusieurs enregistrements
+        Met à jour plusieurs enregistrements en quelques requêtes
+        
+        Les lignes sont regroupées par ensemble de colonnes modifiées, puis
+        chaque groupe est envoyé par lots sous la forme :
+        UPDATE ... SET col = CASE id WHEN ... END WHERE id IN (...)
+        
+        Comme update(), les valeurs None sont ignorées, sauf si
+        skip_none=False (elles remettent alors la colonne à NULL). Les objets
+        déjà chargés dans la session ne sont pas synchronisés, sauf si
+        refetch=True.
         
         Args:
             updates: Liste de dicts avec 'id' et les champs à mettre à jour
+            chunk_size: Nombre maximal de lignes par UPDATE
+            refetch: Recharger les objets de la session après mise à jour
+            skip_none: Ignorer les valeurs None
         
         Returns:
-            True si succès
+            Nombre de lignes trouvées et mises à jour
         """
+        groups: Dict[FrozenSet[str], Dict[int, dict]] = {}
+        
         for update_data in updates:
             if 'id' not in update_data:
                 continue
             
-            obj_id = update_data.pop('id')
-            await self.update(obj_id, update_data)
+            values = {
+                k: v for k, v in update_data.items()
+                if k != 'id' and (v is not None or not skip_none)
+            }
+            if values:
+                # Une ligne répétée garde la dernière valeur
+                groups.setdefault(frozenset(values), {})[update_data['id']] = values
+        
+        affected = 0
+        
+        for columns, rows in groups.items():
+            ids = list(rows)
+            for start in range(0, len(ids), chunk_size):
+                chunk_ids = ids[start:start + chunk_size]
+                affected += await self._update_chunk(columns, chunk_ids, rows)
+        
+        if refetch and groups:
+            updated_ids = list({id for rows in groups.values() for id in rows})
+            for start in range(0, len(updated_ids), chunk_size):
+                query = (
+                    select(self.model)
+                    .where(self.model.id.in_(updated_ids[start:start + chunk_size]))
+                    .execution_options(populate_existing=True)
+                )
+                await self.db.execute(query)
+        
+        return affected
+    
+    async def _update_chunk(
+        self,
+        columns: FrozenSet[str],
+        ids: List[int],
+        rows: Dict[int, dict]
+    ) -> int:
+        """
+        Met à jour un lot de lignes partageant les mêmes colonnes
+        
+        Args:
+            columns: Colonnes modifiées
+            ids: Identifiants du lot
+            rows: Valeurs par identifiant
+        
+        Returns:
+            Nombre de lignes trouvées
+        """
+        values = {}
+        for column_name in columns:
+            column = getattr(self.model, column_name)
+            values[column_name] = case(
+                {id: literal(rows[id][column_name], column.type) for id in ids},
+                value=self.model.id,
+                else_=column
+            )
         
-        return True
+        query = (
+            update(self.model)
+            .where(self.model.id.in_(ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        
+        result = await self.db.execute(query)
+        return result.rowcount
     
     async def bulk_delete(self, ids: List[int]) -> int:
         """
@@ -1,16 +1,25 @@
-
 """
 Repository pour Category
 Gestion de l'accès aux données catégories
 """
 
-from typing import Optional, List
-from sqlalchemy import select
+from typing import Any, Dict, Optional, List
+from sqlalchemy import select, insert, update, delete, literal, true
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.category import Category
-from app.repositories.base import BaseRepository
+from app.models.category import Category, category_closure
+from app.core.cache import cache
+from app.repositories.base import BaseRepository, BULK_INSERT_CHUNK_SIZE
+from app.repositories.product import PRODUCT_LIST_CACHE_NAMESPACE
+from app.schemas.category import CategoryResponse
+
+
+# ===== Clés de cache =====
+CATEGORY_CACHE_NAMESPACE = "categories"
+
+# Copie locale de l'arbre, indexée par version de l'espace de noms
+_tree_snapshots: Dict[str, List[Dict[str, Any]]] = {}
 
 
 class CategoryRepository(BaseRepository[Category]):
@@ -19,6 +28,238 @@ class CategoryRepository(BaseRepository[Category]):
     def __init__(self, db: AsyncSession):
         super().__init__(Category, db)
     
+    def invalidate_cache(self) -> None:
+        """
+        Invalide l'arbre des catégories et les listings produits en cache
+        L'invalidation est appliquée après le commit de la session
+        """
+        cache.invalidate_on_commit(
+            self.db,
+            namespaces=[CATEGORY_CACHE_NAMESPACE, PRODUCT_LIST_CACHE_NAMESPACE]
+        )
+    
+    # ===== Écritures maintenant la table de fermeture =====
+    
+    async def create(self, obj_in: dict) -> Category:
+        """Crée une catégorie et l'ajoute à la table de fermeture"""
+        category = await super().create(obj_in)
+        
+        await self.db.execute(
+            insert(category_closure).values(
+                ancestor_id=category.id,
+                descendant_id=category.id,
+                depth=0
+            )
+        )
+        
+        if category.parent_id is not None:
+            await self.db.execute(
+                insert(category_closure).from_select(
+                    ["ancestor_id", "descendant_id", "depth"],
+                    select(
+                        category_closure.c.ancestor_id,
+                        literal(category.id),
+                        category_closure.c.depth + 1
+                    ).where(category_closure.c.descendant_id == category.parent_id)
+                )
+            )
+        
+        self.invalidate_cache()
+        return category
+    
+    async def update(self, id: int, obj_in: dict) -> Optional[Category]:
+        """
+        Met à jour une catégorie (déplacement compris) et invalide le cache
+        
+        Args:
+            id: ID de la catégorie
+            obj_in: Champs fournis (model_dump(exclude_unset=True)) ; la
+                présence de parent_id déclenche un déplacement, None
+                ramenant la catégorie à la racine
+        
+        Returns:
+            Catégorie mise à jour ou None
+        """
+        update_data = dict(obj_in)
+        
+        if "parent_id" in update_data:
+            await self.move(id, update_data.pop("parent_id"))
+        
+        category = await super().update(id, update_data)
+        self.invalidate_cache()
+        return category
+    
+    async def move(self, category_id: int, parent_id: Optional[int]) -> Optional[Category]:
+        """
+        Déplace une catégorie (et son sous-arbre) sous un nouveau parent
+        
+        Args:
+            category_id: ID de la catégorie
+            parent_id: Nouveau parent (None = racine)
+        
+        Returns:
+            Catégorie déplacée ou None si non trouvée
+        
+        Raises:
+            ValueError: Si le nouveau parent est dans le sous-arbre déplacé
+        """
+        result = await self.db.execute(
+            select(Category.parent_id).where(Category.id == category_id)
+        )
+        current = result.first()
+        
+        if current is None:
+            return None
+        
+        if current.parent_id == parent_id:
+            return await self.get_by_id(category_id)
+        
+        subtree = await self.get_descendant_ids(category_id)
+        
+        if parent_id is not None and parent_id in subtree:
+            raise ValueError(
+                "Une catégorie ne peut pas être déplacée sous l'une de ses sous-catégories"
+            )
+        
+        # Détacher le sous-arbre de ses anciens ancêtres
+        await self.db.execute(
+            delete(category_closure)
+            .where(category_closure.c.descendant_id.in_(subtree))
+            .where(category_closure.c.ancestor_id.not_in(subtree))
+        )
+        
+        # Rattacher le sous-arbre aux ancêtres du nouveau parent
+        if parent_id is not None:
+            supertree = category_closure.alias("supertree")
+            subtree_links = category_closure.alias("subtree")
+            
+            await self.db.execute(
+                insert(category_closure).from_select(
+                    ["ancestor_id", "descendant_id", "depth"],
+                    select(
+                        supertree.c.ancestor_id,
+                        subtree_links.c.descendant_id,
+                        supertree.c.depth + subtree_links.c.depth + 1
+                    )
+                    # Produit cartésien voulu : ancêtres du parent x nœuds du sous-arbre
+                    .select_from(supertree.join(subtree_links, true()))
+                    .where(supertree.c.descendant_id == parent_id)
+                    .where(subtree_links.c.ancestor_id == category_id)
+                )
+            )
+        
+        await self.db.execute(
+            update(Category)
+            .where(Category.id == category_id)
+            .values(parent_id=parent_id)
+            .execution_options(synchronize_session="fetch")
+        )
+        
+        self.invalidate_cache()
+        return await self.get_by_id(category_id)
+    
+    async def delete(self, id: int) -> bool:
+        """
+        Supprime une catégorie
+        Ses sous-catégories deviennent des racines (parent_id SET NULL) :
+        leurs sous-arbres sont détachés des anciens ancêtres
+        """
+        children_subtree = [
+            descendant_id
+            for descendant_id in await self.get_descendant_ids(id)
+            if descendant_id != id
+        ]
+        
+        if children_subtree:
+            await self.db.execute(
+                delete(category_closure)
+                .where(category_closure.c.descendant_id.in_(children_subtree))
+                .where(category_closure.c.ancestor_id.not_in(children_subtree))
+            )
+        
+        deleted = await super().delete(id)
+        if deleted:
+            self.invalidate_cache()
+        return deleted
+    
+    async def rebuild_closure(self) -> int:
+        """
+        Reconstruit entièrement la table de fermeture depuis parent_id
+        (initialisation ou réparation)
+        
+        Returns:
+            Nombre de liens insérés
+        """
+        result = await self.db.execute(select(Category.id, Category.parent_id))
+        parents = dict(result.all())
+        
+        links = []
+        for category_id in parents:
+            ancestor_id, depth, seen = category_id, 0, set()
+            
+            while ancestor_id is not None and ancestor_id not in seen:
+                links.append({
+                    "ancestor_id": ancestor_id,
+                    "descendant_id": category_id,
+                    "depth": depth
+                })
+                seen.add(ancestor_id)
+                ancestor_id = parents.get(ancestor_id)
+                depth += 1
+        
+        await self.db.execute(delete(category_closure))
+        
+        for start in range(0, len(links), BULK_INSERT_CHUNK_SIZE):
+            await self.db.execute(
+                insert(category_closure),
+                links[start:start + BULK_INSERT_CHUNK_SIZE]
+            )
+        
+        self.invalidate_cache()
+        return len(links)
+    
+    # ===== Lectures via la table de fermeture =====
+    
+    async def get_descendant_ids(self, category_id: int, include_self: bool = True) -> List[int]:
+        """
+        IDs de tous les descendants d'une catégorie (une requête indexée)
+        
+        Args:
+            category_id: ID de la catégorie
+            include_self: Inclure la catégorie elle-même
+        
+        Returns:
+            Liste d'IDs
+        """
+        query = select(category_closure.c.descendant_id).where(
+            category_closure.c.ancestor_id == category_id
+        )
+        
+        if not include_self:
+            query = query.where(category_closure.c.depth > 0)
+        
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+    
+    async def get_breadcrumbs(self, category_id: int) -> List[Category]:
+        """
+        Chemin de la racine jusqu'à la catégorie, sans récursion
+        
+        Args:
+            category_id: ID de la catégorie
+        
+        Returns:
+            Catégories de la racine à la catégorie incluse
+        """
+        query = (
+            select(Category)
+            .join(category_closure, category_closure.c.ancestor_id == Category.id)
+            .where(category_closure.c.descendant_id == category_id)
+            .order_by(category_closure.c.depth.desc())
+        )
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+    
     async def get_by_slug(self, slug: str) -> Optional[Category]:
         """
         Récupère une catégorie par son slug
@@ -114,6 +355,65 @@ class CategoryRepository(BaseRepository[Category]):
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
+    async def get_tree_snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Arbre imbriqué des catégories actives (format CategoryTreeResponse)
+        
+        Conservé en mémoire du processus ; la version de l'espace de noms
+        "categories", partagée par le cache, invalide la copie locale dès
+        qu'une catégorie est modifiée (ici ou dans un autre processus).
+        
+        Returns:
+            Catégories racines avec leurs enfants (children, level)
+        """
+        if not cache.enabled:
+            return await self._build_tree()
+        
+        namespace = await cache.namespace(CATEGORY_CACHE_NAMESPACE)
+        snapshot = _tree_snapshots.get(namespace)
+        
+        if snapshot is None:
+            snapshot = await cache.get_or_load(f"{namespace}:tree", self._build_tree)
+            _tree_snapshots.clear()
+            _tree_snapshots[namespace] = snapshot
+        
+        return snapshot
+    
+    async def _build_tree(self) -> List[Dict[str, Any]]:
+        """Construit l'arbre imbriqué en une requête (sans chargement paresseux)"""
+        query = (
+            select(Category)
+            .where(Category.is_active == True)
+            .order_by(Category.name)
+        )
+        result = await self.db.execute(query)
+        categories = list(result.scalars().all())
+        
+        nodes = {
+            category.id: {
+                **CategoryResponse.model_validate(category).model_dump(mode="json"),
+                "children": [],
+                "level": 0,
+            }
+            for category in categories
+        }
+        
+        roots = []
+        for category in categories:
+            node = nodes[category.id]
+            if category.parent_id is None:
+                roots.append(node)
+            elif category.parent_id in nodes:
+                nodes[category.parent_id]["children"].append(node)
+        
+        stack = [(root, 0) for root in roots]
+        while stack:
+            node, level = stack.pop()
+            node["level"] = level
+            stack.extend((child, level + 1) for child in node["children"])
+        
+        return roots
+    
     async def get_active(
         self,
         skip: int = 0,
@@ -4,21 +4,67 @@ Repository pour Coupon
 Gestion de l'accès aux données des coupons
 """
 
-from typing import Optional, List
-from sqlalchemy import select, and_, func
+from typing import Optional, List, Tuple
+from sqlalchemy import select, insert, update, and_, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from decimal import Decimal
 
+from app.core.cache import cache
 from app.models.coupon import Coupon, DiscountType
+from app.models.order import Order, order_coupons
 from app.repositories.base import BaseRepository
 
 
+# Espace de noms dont la version signale une modification des coupons
+# (rechargement de l'index des coupons de chaque worker)
+COUPON_CACHE_NAMESPACE = "coupons"
+
+
 class CouponRepository(BaseRepository[Coupon]):
     """Repository pour gérer les coupons"""
     
     def __init__(self, db: AsyncSession):
         super().__init__(Coupon, db)
     
+    def invalidate_index(self) -> None:
+        """Programme le rechargement de l'index des coupons après commit"""
+        cache.invalidate_on_commit(self.db, namespaces=[COUPON_CACHE_NAMESPACE])
+    
+    async def create(self, obj_in: dict) -> Coupon:
+        """Crée un coupon et invalide l'index des coupons"""
+        coupon = await super().create(obj_in)
+        self.invalidate_index()
+        return coupon
+    
+    async def update(self, id: int, obj_in: dict) -> Optional[Coupon]:
+        """Met à jour un coupon et invalide l'index des coupons"""
+        coupon = await super().update(id, obj_in)
+        
+        if coupon is not None:
+            self.invalidate_index()
+        
+        return coupon
+    
+    async def delete(self, id: int) -> bool:
+        """Supprime un coupon et invalide l'index des coupons"""
+        deleted = await super().delete(id)
+        
+        if deleted:
+            self.invalidate_index()
+        
+        return deleted
+    
+    async def get_all_for_index(self) -> List[Coupon]:
+        """
+        Récupère tous les coupons (chargement de l'index en mémoire)
+        
+        Returns:
+            Liste de tous les coupons
+        """
+        result = await self.db.execute(select(Coupon))
+        return list(result.scalars().all())
+    
     async def get_by_code(self, code: str) -> Optional[Coupon]:
         """
         Récupère un coupon par son code
@@ -280,11 +326,125 @@ class CouponRepository(BaseRepository[Coupon]):
         Returns:
             Nombre d'utilisations
         """
-        coupon = await self.get_by_id(coupon_id)
-        if not coupon:
-            return 0
+        result = await self.db.execute(
+            select(func.count())
+            .select_from(order_coupons)
+            .where(order_coupons.c.coupon_id == coupon_id)
+        )
+        return result.scalar_one()
+    
+    async def get_usage_stats(self, coupon_id: int) -> Tuple[int, Decimal, Decimal]:
+        """
+        Statistiques d'utilisation d'un coupon (une requête agrégée)
+        
+        Args:
+            coupon_id: ID du coupon
+        
+        Returns:
+            (Nombre d'utilisations, Total des réductions, Montant moyen des commandes)
+        """
+        result = await self.db.execute(
+            select(
+                func.count(Order.id),
+                func.coalesce(func.sum(Order.discount_amount), 0),
+                func.coalesce(func.avg(Order.total_amount), 0)
+            )
+            .select_from(order_coupons)
+            .join(Order, Order.id == order_coupons.c.order_id)
+            .where(order_coupons.c.coupon_id == coupon_id)
+        )
+        usage_count, total_discount, average_amount = result.one()
+        return usage_count, Decimal(total_discount), Decimal(average_amount).quantize(Decimal("0.01"))
+    
+    async def record_usage(self, coupon_id: int, order_id: int, discount_amount: Decimal) -> None:
+        """
+        Enregistre l'utilisation d'un coupon par une commande (checkout)
+        
+        Lie la commande au coupon et incrémente les compteurs du coupon
+        dans le même UPDATE. À appeler en fin de transaction : la ligne
+        du coupon reste verrouillée jusqu'au commit.
+        
+        Args:
+            coupon_id: ID du coupon
+            order_id: ID de la commande
+            discount_amount: Réduction accordée
+        """
+        await self.db.execute(
+            insert(order_coupons).values(order_id=order_id, coupon_id=coupon_id)
+        )
+        await self.db.execute(
+            update(Coupon)
+            .where(Coupon.id == coupon_id)
+            .values(
+                usage_count=Coupon.usage_count + 1,
+                total_discount=Coupon.total_discount + discount_amount
+            )
+            .execution_options(synchronize_session=False)
+        )
+    
+    async def reconcile_usage_counters(self) -> int:
+        """
+        Recalcule les compteurs de tous les coupons depuis order_coupons
+        
+        Seuls les coupons en écart sont réécrits.
         
-        return len(coupon.orders) if coupon.orders else 0
+        Returns:
+            Nombre de coupons dont les compteurs ont changé
+        """
+        usage = (
+            select(
+                order_coupons.c.coupon_id,
+                func.count().label("usage_count"),
+                func.sum(Order.discount_amount).label("total_discount")
+            )
+            .join(Order, Order.id == order_coupons.c.order_id)
+            .group_by(order_coupons.c.coupon_id)
+            .subquery()
+        )
+        
+        usage_count = func.coalesce(
+            select(usage.c.usage_count).where(usage.c.coupon_id == Coupon.id).scalar_subquery(),
+            0
+        )
+        total_discount = func.coalesce(
+            select(usage.c.total_discount).where(usage.c.coupon_id == Coupon.id).scalar_subquery(),
+            0
+        )
+        
+        # Filtre sur l'écart : avec CLIENT_FOUND_ROWS, rowcount compte les
+        # lignes trouvées, pas seulement les lignes modifiées
+        result = await self.db.execute(
+            update(Coupon)
+            .where(or_(Coupon.usage_count != usage_count, Coupon.total_discount != total_discount))
+            .values(usage_count=usage_count, total_discount=total_discount)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
+    async def get_global_stats(self) -> Tuple[int, int, int, int, Decimal]:
+        """
+        Statistiques globales des coupons (une seule requête)
+        
+        Returns:
+            (Total, Actifs, Valides, Utilisations, Total des réductions)
+        """
+        now = datetime.utcnow()
+        valid = and_(
+            Coupon.is_active == True,
+            or_(Coupon.expires_at.is_(None), Coupon.expires_at > now)
+        )
+        
+        result = await self.db.execute(
+            select(
+                func.count(Coupon.id),
+                func.coalesce(func.sum(case((Coupon.is_active == True, 1), else_=0)), 0),
+                func.coalesce(func.sum(case((valid, 1), else_=0)), 0),
+                func.coalesce(func.sum(Coupon.usage_count), 0),
+                func.coalesce(func.sum(Coupon.total_discount), 0)
+            )
+        )
+        total, active, valid_count, uses, total_discount = result.one()
+        return int(total), int(active), int(valid_count), int(uses), Decimal(total_discount)
 
 
 # Import nécessaire pour les conditions OR
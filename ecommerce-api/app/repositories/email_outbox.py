@@ -0,0 +1,174 @@
+"""
+Repository pour EmailOutbox
+Mise en file et réservation des emails à envoyer
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.email_outbox import EmailOutbox, EmailStatus
+from app.repositories.base import BaseRepository
+
+
+class EmailOutboxRepository(BaseRepository[EmailOutbox]):
+    """Repository pour gérer la file d'emails"""
+    
+    def __init__(self, db: AsyncSession):
+        super().__init__(EmailOutbox, db)
+    
+    async def enqueue(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> EmailOutbox:
+        """
+        Ajoute un email à la file (commité avec la transaction en cours)
+        
+        Args:
+            to_email: Destinataire
+            subject: Sujet
+            html_content: Contenu HTML
+            text_content: Contenu texte (optionnel)
+        
+        Returns:
+            Email en file
+        """
+        message = EmailOutbox(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content,
+            status=EmailStatus.PENDING,
+            attempts=0
+        )
+        self.db.add(message)
+        await self.db.flush()
+        return message
+    
+    async def enqueue_many(self, messages: List[dict]) -> None:
+        """
+        Ajoute plusieurs emails à la file (INSERT multi-lignes)
+        
+        Args:
+            messages: Dicts to_email, subject, html_content (et text_content)
+        """
+        await self.bulk_create(
+            [
+                {
+                    "text_content": None,
+                    **message,
+                    "status": EmailStatus.PENDING,
+                    "attempts": 0,
+                }
+                for message in messages
+            ],
+            hydrate=False
+        )
+    
+    async def claim_batch(self, limit: int, lease: timedelta) -> List[EmailOutbox]:
+        """
+        Réserve les prochains emails à envoyer
+        
+        - Emails en attente dont la tentative est due
+        - Emails "sending" dont le bail a expiré (dispatcher interrompu)
+        - SKIP LOCKED : plusieurs dispatchers ne réservent jamais la même ligne
+        
+        Args:
+            limit: Nombre maximal d'emails
+            lease: Durée du bail avant qu'un envoi interrompu soit repris
+        
+        Returns:
+            Emails réservés (statut "sending")
+        """
+        now = datetime.utcnow()
+        
+        query = (
+            select(EmailOutbox)
+            .where(
+                EmailOutbox.status.in_([EmailStatus.PENDING, EmailStatus.SENDING]),
+                EmailOutbox.next_attempt_at <= now
+            )
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.db.execute(query)
+        messages = list(result.scalars().all())
+        
+        if messages:
+            await self.db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_([message.id for message in messages]))
+                .values(
+                    status=EmailStatus.SENDING,
+                    attempts=EmailOutbox.attempts + 1,
+                    next_attempt_at=now + lease
+                )
+                .execution_options(synchronize_session=False)
+            )
+        
+        return messages
+    
+    async def mark_sent(self, message_ids: Iterable[int]) -> None:
+        """
+        Marque des emails comme envoyés
+        
+        Args:
+            message_ids: IDs des emails
+        """
+        message_ids = list(message_ids)
+        if not message_ids:
+            return
+        
+        await self.db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(message_ids))
+            .values(status=EmailStatus.SENT, sent_at=datetime.utcnow(), last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+    
+    async def mark_failed(
+        self,
+        message_id: int,
+        error: str,
+        retry_at: Optional[datetime]
+    ) -> None:
+        """
+        Enregistre un échec d'envoi
+        
+        Args:
+            message_id: ID de l'email
+            error: Erreur SMTP
+            retry_at: Prochaine tentative, ou None pour abandonner
+        """
+        values = {"last_error": error[:2000]}
+        
+        if retry_at is None:
+            values["status"] = EmailStatus.FAILED
+        else:
+            values["status"] = EmailStatus.PENDING
+            values["next_attempt_at"] = retry_at
+        
+        await self.db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == message_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    
+    async def count_pending(self) -> int:
+        """
+        Profondeur de la file (emails en attente ou en cours d'envoi)
+        
+        Returns:
+            Nombre d'emails non envoyés
+        """
+        query = select(func.count(EmailOutbox.id)).where(
+            EmailOutbox.status.in_([EmailStatus.PENDING, EmailStatus.SENDING])
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one()
@@ -4,14 +4,16 @@ Repository pour Order
 Gestion de l'accès aux données des commandes
 """
 
-from typing import Optional, List
-from sqlalchemy import select, and_
+from typing import Dict, Iterable, Optional, List
+from sqlalchemy import select, update, and_, func
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
 from app.models.order import Order, OrderItem, OrderStatus
 from app.repositories.base import BaseRepository
+from app.repositories.statistics import StatisticsRepository
+from app.utils.pagination import Cursor
 
 
 class OrderRepository(BaseRepository[Order]):
@@ -19,6 +21,21 @@ class OrderRepository(BaseRepository[Order]):
     
     def __init__(self, db: AsyncSession):
         super().__init__(Order, db)
+        self.stats_repo = StatisticsRepository(db)
+    
+    async def create(self, obj_in: dict) -> Order:
+        """
+        Crée une commande et journalise son delta d'agrégats journaliers
+        
+        Args:
+            obj_in: Données de la commande
+        
+        Returns:
+            Commande créée
+        """
+        order = await super().create(obj_in)
+        await self.stats_repo.record_created(Order, [order.id])
+        return order
     
     async def get_by_id_with_details(self, order_id: int) -> Optional[Order]:
         """
@@ -40,6 +57,9 @@ class OrderRepository(BaseRepository[Order]):
                 selectinload(Order.payments),
                 selectinload(Order.coupons)
             )
+            # Recharge les collections d'une commande déjà présente en session
+            # (ex: articles insérés en masse juste après sa création)
+            .execution_options(populate_existing=True)
         )
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
@@ -48,7 +68,8 @@ class OrderRepository(BaseRepository[Order]):
         self,
         user_id: int,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[Cursor] = None
     ) -> List[Order]:
         """
         Récupère les commandes d'un utilisateur
@@ -57,6 +78,7 @@ class OrderRepository(BaseRepository[Order]):
             user_id: ID de l'utilisateur
             skip: Offset
             limit: Limite
+            after: Curseur keyset (remplace skip)
         
         Returns:
             Liste de commandes
@@ -65,10 +87,8 @@ class OrderRepository(BaseRepository[Order]):
             select(Order)
             .where(Order.user_id == user_id)
             .options(selectinload(Order.items))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Order.created_at.desc())
         )
+        query = self.keyset_page(query, skip, limit, after)
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
@@ -76,7 +96,8 @@ class OrderRepository(BaseRepository[Order]):
         self,
         status: OrderStatus,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[Cursor] = None
     ) -> List[Order]:
         """
         Récupère les commandes par statut
@@ -85,6 +106,7 @@ class OrderRepository(BaseRepository[Order]):
             status: Statut recherché
             skip: Offset
             limit: Limite
+            after: Curseur keyset (remplace skip)
         
         Returns:
             Liste de commandes
@@ -93,10 +115,8 @@ class OrderRepository(BaseRepository[Order]):
             select(Order)
             .where(Order.status == status)
             .options(selectinload(Order.items))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Order.created_at.desc())
         )
+        query = self.keyset_page(query, skip, limit, after)
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
@@ -183,8 +203,52 @@ class OrderRepository(BaseRepository[Order]):
         Returns:
             Commande mise à jour
         """
+        await self.stats_repo.record_transition(Order, [order_id], status)
         return await self.update(order_id, {"status": status})
     
+    async def lock_statuses(self, order_ids: Iterable[int]) -> List:
+        """
+        Verrouille des commandes et retourne leur statut (sans charger les objets)
+        
+        Args:
+            order_ids: IDs des commandes
+        
+        Returns:
+            Lignes (id, user_id, status) des commandes existantes
+        """
+        query = (
+            select(Order.id, Order.user_id, Order.status)
+            .where(Order.id.in_(list(order_ids)))
+            .order_by(Order.id)
+            .with_for_update()
+        )
+        result = await self.db.execute(query)
+        return list(result.all())
+    
+    async def bulk_update_status(self, order_ids: List[int], status: OrderStatus) -> int:
+        """
+        Passe plusieurs commandes au même statut (un seul UPDATE)
+        
+        Args:
+            order_ids: IDs des commandes
+            status: Nouveau statut
+        
+        Returns:
+            Nombre de commandes mises à jour
+        """
+        if not order_ids:
+            return 0
+        
+        await self.stats_repo.record_transition(Order, order_ids, status)
+        
+        result = await self.db.execute(
+            update(Order)
+            .where(Order.id.in_(order_ids))
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
     async def count_by_status(self, status: OrderStatus) -> int:
         """
         Compte les commandes par statut
@@ -237,17 +301,19 @@ class OrderItemRepository(BaseRepository[OrderItem]):
     async def bulk_create_items(
         self,
         order_id: int,
-        items: List[dict]
+        items: List[dict],
+        hydrate: bool = True
     ) -> List[OrderItem]:
         """
-        Crée plusieurs articles de commande
+        Crée plusieurs articles de commande (un seul INSERT)
         
         Args:
             order_id: ID de la commande
             items: Liste d'articles à créer
+            hydrate: Retourner les articles créés
         
         Returns:
-            Liste des articles créés
+            Liste des articles créés (vide si hydrate=False)
         """
         items_data = []
         for item in items:
@@ -258,4 +324,25 @@ class OrderItemRepository(BaseRepository[OrderItem]):
                 "unit_price": item["unit_price"]
             })
         
-        return await self.bulk_create(items_data)
\ No newline at end of file
+        return await self.bulk_create(items_data, hydrate=hydrate)
+    
+    async def sum_quantities_by_product(self, order_ids: List[int]) -> Dict[int, int]:
+        """
+        Quantités commandées par produit sur plusieurs commandes
+        
+        Args:
+            order_ids: IDs des commandes
+        
+        Returns:
+            Quantité totale par ID produit
+        """
+        if not order_ids:
+            return {}
+        
+        query = (
+            select(OrderItem.product_id, func.sum(OrderItem.quantity))
+            .where(OrderItem.order_id.in_(order_ids))
+            .group_by(OrderItem.product_id)
+        )
+        result = await self.db.execute(query)
+        return {product_id: int(quantity) for product_id, quantity in result.all()}
\ No newline at end of file
@@ -5,13 +5,15 @@ Gestion de l'accès aux données des paiements
 """
 
 from typing import Optional, List
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
 from app.models.payment import Payment, PaymentStatus, PaymentMethod
 from app.repositories.base import BaseRepository
+from app.repositories.statistics import StatisticsRepository
+from app.utils.pagination import Cursor
 
 
 class PaymentRepository(BaseRepository[Payment]):
@@ -19,6 +21,21 @@ class PaymentRepository(BaseRepository[Payment]):
     
     def __init__(self, db: AsyncSession):
         super().__init__(Payment, db)
+        self.stats_repo = StatisticsRepository(db)
+    
+    async def create(self, obj_in: dict) -> Payment:
+        """
+        Crée un paiement et journalise son delta d'agrégats journaliers
+        
+        Args:
+            obj_in: Données du paiement
+        
+        Returns:
+            Paiement créé
+        """
+        payment = await super().create(obj_in)
+        await self.stats_repo.record_created(Payment, [payment.id])
+        return payment
     
     async def get_by_order_id(self, order_id: int) -> List[Payment]:
         """
@@ -61,7 +78,8 @@ class PaymentRepository(BaseRepository[Payment]):
         self,
         status: PaymentStatus,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[Cursor] = None
     ) -> List[Payment]:
         """
         Récupère les paiements par statut
@@ -70,6 +88,7 @@ class PaymentRepository(BaseRepository[Payment]):
             status: Statut recherché
             skip: Offset
             limit: Limite
+            after: Curseur keyset (remplace skip)
         
         Returns:
             Liste de paiements
@@ -77,10 +96,8 @@ class PaymentRepository(BaseRepository[Payment]):
         query = (
             select(Payment)
             .where(Payment.status == status)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Payment.created_at.desc())
         )
+        query = self.keyset_page(query, skip, limit, after)
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
@@ -88,7 +105,8 @@ class PaymentRepository(BaseRepository[Payment]):
         self,
         method: PaymentMethod,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[Cursor] = None
     ) -> List[Payment]:
         """
         Récupère les paiements par méthode
@@ -97,6 +115,7 @@ class PaymentRepository(BaseRepository[Payment]):
             method: Méthode de paiement
             skip: Offset
             limit: Limite
+            after: Curseur keyset (remplace skip)
         
         Returns:
             Liste de paiements
@@ -104,10 +123,8 @@ class PaymentRepository(BaseRepository[Payment]):
         query = (
             select(Payment)
             .where(Payment.method == method)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Payment.created_at.desc())
         )
+        query = self.keyset_page(query, skip, limit, after)
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
@@ -203,6 +220,7 @@ class PaymentRepository(BaseRepository[Payment]):
         elif status == PaymentStatus.SUCCESS and not paid_at:
             update_data["paid_at"] = datetime.utcnow()
         
+        await self.stats_repo.record_transition(Payment, [payment_id], status)
         return await self.update(payment_id, update_data)
     
     async def mark_as_success(
@@ -228,6 +246,7 @@ class PaymentRepository(BaseRepository[Payment]):
         if transaction_reference:
             update_data["transaction_reference"] = transaction_reference
         
+        await self.stats_repo.record_transition(Payment, [payment_id], PaymentStatus.SUCCESS)
         return await self.update(payment_id, update_data)
     
     async def mark_as_failed(self, payment_id: int) -> Optional[Payment]:
@@ -288,5 +307,8 @@ class PaymentRepository(BaseRepository[Payment]):
         Returns:
             Montant total
         """
-        payments = await self.get_by_status(status, skip=0, limit=10000)
-        return sum(float(p.amount) for p in payments)
\ No newline at end of file
+        result = await self.db.execute(
+            select(func.coalesce(func.sum(Payment.amount), 0))
+            .where(Payment.status == status)
+        )
+        return float(result.scalar_one())
\ No newline at end of file
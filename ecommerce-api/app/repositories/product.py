@@ -4,15 +4,296 @@ Repository pour Product
 Gestion de l'accès aux données produits
 """
 
-from typing import Optional, List
-from sqlalchemy import select, or_, and_
+from typing import Dict, Iterable, NamedTuple, Optional, List, Tuple
+from sqlalchemy import select, update, case, or_, and_, Select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.mysql import match
 from decimal import Decimal
 
-from app.models.product import Product, ProductImage
-from app.models.category import Category
-from app.repositories.base import BaseRepository
+from app.models.product import Product, ProductImage, product_categories
+from app.models.category import Category, category_closure
+from app.core.cache import cache
+from app.repositories.base import BaseRepository, BULK_UPDATE_CHUNK_SIZE
+from app.schemas.product import ProductFilterParams
+from app.utils.pagination import Cursor
+from app.utils.search import build_boolean_query
+
+
+# Colonnes autorisées pour le tri des listings
+PRODUCT_SORT_FIELDS = {
+    "created_at": Product.created_at,
+    "price": Product.price,
+    "name": Product.name,
+    "stock": Product.stock,
+}
+
+# ===== Clés de cache =====
+PRODUCT_LIST_CACHE_NAMESPACE = "products:list"
+
+
+def product_cache_key(product_id: int) -> str:
+    """Clé du détail d'un produit par ID"""
+    return f"products:id:{product_id}"
+
+
+def product_slug_cache_key(slug: str) -> str:
+    """Clé du détail d'un produit par slug"""
+    return f"products:slug:{slug}"
+
+
+class StockShortage(NamedTuple):
+    """Ligne refusée lors d'une réservation de stock"""
+    product_id: int
+    sku: Optional[str]
+    name: Optional[str]
+    requested: int
+    available: int
+
+
+class ProductQuerySpec:
+    """
+    Spécification composable d'un listing de produits
+    
+    Chaque méthode ajoute un critère et retourne la spécification,
+    ce qui permet de combiner librement les filtres et le tri avant
+    de générer une unique requête SQL.
+    
+    Usage:
+        spec = (
+            ProductQuerySpec()
+            .active()
+            .in_category(3)
+            .price_between(Decimal("10"), None)
+            .sort("price", "asc")
+        )
+    """
+    
+    def __init__(self):
+        self.criteria: list = []
+        self.sort_by: str = "created_at"
+        self.sort_order: str = "desc"
+        self.cursor: Optional[Cursor] = None
+        self.relevance = None
+    
+    @classmethod
+    def from_filters(cls, filters: ProductFilterParams) -> "ProductQuerySpec":
+        """
+        Construit une spécification depuis les paramètres de filtrage
+        
+        Args:
+            filters: Paramètres de filtrage et de tri
+        
+        Returns:
+            Spécification correspondante
+        """
+        spec = cls()
+        
+        if filters.is_active is not None:
+            spec.active(filters.is_active)
+        
+        if filters.search:
+            spec.matching(filters.search)
+        
+        if filters.category_id:
+            spec.in_category(filters.category_id)
+        
+        if filters.min_price is not None or filters.max_price is not None:
+            spec.price_between(filters.min_price, filters.max_price)
+        
+        if filters.in_stock:
+            spec.in_stock()
+        
+        if filters.on_sale:
+            spec.on_sale()
+        
+        sort_by = filters.sort_by
+        if sort_by is None:
+            sort_by = "relevance" if filters.search else "created_at"
+        
+        spec.sort(sort_by, filters.sort_order)
+        
+        return spec
+    
+    def where(self, *criteria) -> "ProductQuerySpec":
+        """Ajoute des critères SQL arbitraires"""
+        self.criteria.extend(criteria)
+        return self
+    
+    def active(self, is_active: bool = True) -> "ProductQuerySpec":
+        """Filtre sur le statut actif"""
+        return self.where(Product.is_active == is_active)
+    
+    def in_category(
+        self,
+        category_id: int,
+        include_descendants: bool = True
+    ) -> "ProductQuerySpec":
+        """
+        Filtre les produits rattachés à une catégorie
+        et, par défaut, à toutes ses sous-catégories (table de fermeture)
+        """
+        if not include_descendants:
+            return self.where(
+                Product.id.in_(
+                    select(product_categories.c.product_id)
+                    .where(product_categories.c.category_id == category_id)
+                )
+            )
+        
+        return self.where(
+            Product.id.in_(
+                select(product_categories.c.product_id)
+                .join(
+                    category_closure,
+                    category_closure.c.descendant_id == product_categories.c.category_id
+                )
+                .where(category_closure.c.ancestor_id == category_id)
+            )
+        )
+    
+    def price_between(
+        self,
+        min_price: Optional[Decimal],
+        max_price: Optional[Decimal]
+    ) -> "ProductQuerySpec":
+        """Filtre sur une fourchette de prix (bornes optionnelles)"""
+        if min_price is not None:
+            self.where(Product.price >= min_price)
+        if max_price is not None:
+            self.where(Product.price <= max_price)
+        return self
+    
+    def in_stock(self) -> "ProductQuerySpec":
+        """Filtre les produits en stock"""
+        return self.where(Product.stock > 0)
+    
+    def on_sale(self) -> "ProductQuerySpec":
+        """Filtre les produits en promotion"""
+        return self.where(
+            Product.sale_price.is_not(None),
+            Product.sale_price > 0
+        )
+    
+    def matching(self, search_term: str) -> "ProductQuerySpec":
+        """
+        Filtre par terme de recherche (nom, description, SKU)
+        
+        Utilise l'index FULLTEXT (mode booléen, préfixes, accents ignorés)
+        et expose un score de pertinence pour le tri "relevance".
+        Si le terme ne contient aucun token indexable (trop court),
+        une recherche par préfixe sur le nom et le SKU est utilisée :
+        LIKE 'terme%' sans LOWER() (collation déjà insensible à la casse)
+        pour rester un parcours d'index, % et _ du terme échappés.
+        """
+        boolean_query = build_boolean_query(search_term)
+        
+        if boolean_query is None:
+            prefix = search_term.strip()
+            return self.where(
+                or_(
+                    Product.name.startswith(prefix, autoescape=True),
+                    Product.sku.startswith(prefix, autoescape=True)
+                )
+            )
+        
+        self.relevance = match(
+            Product.name,
+            Product.description,
+            Product.sku,
+            against=boolean_query
+        ).in_boolean_mode()
+        
+        return self.where(self.relevance)
+    
+    def sort(
+        self,
+        sort_by: Optional[str],
+        sort_order: Optional[str] = "desc"
+    ) -> "ProductQuerySpec":
+        """
+        Définit le tri (champ inconnu => created_at)
+        
+        Args:
+            sort_by: price, name, stock, created_at ou relevance
+            sort_order: asc ou desc
+        """
+        if sort_by == "relevance" or sort_by in PRODUCT_SORT_FIELDS:
+            self.sort_by = sort_by
+        else:
+            self.sort_by = "created_at"
+        self.sort_order = "asc" if (sort_order or "").lower() == "asc" else "desc"
+        return self
+    
+    def after(self, cursor: Optional[Cursor]) -> "ProductQuerySpec":
+        """
+        Reprend le listing après un curseur (pagination keyset)
+        
+        Le curseur porte sur (colonne de tri, id) : il doit provenir
+        d'un listing trié sur la même colonne (voir keyset_field).
+        """
+        self.cursor = cursor
+        return self
+    
+    @property
+    def keyset_field(self) -> Optional[str]:
+        """
+        Colonne du curseur keyset pour le tri courant
+        
+        None pour la pertinence plein texte : le score n'est pas porté
+        par les produits, seule la pagination par offset est possible.
+        """
+        if self.sort_by == "relevance":
+            return None if self.relevance is not None else "created_at"
+        return self.sort_by
+    
+    def to_query(self, with_cursor: bool = True) -> Select:
+        """
+        Génère la requête SELECT filtrée et triée
+        
+        L'identifiant sert de critère secondaire pour garantir
+        un ordre stable entre les pages.
+        
+        Args:
+            with_cursor: Appliquer le curseur keyset s'il est défini
+        
+        Raises:
+            ValueError: Si le curseur ne correspond pas à la colonne de tri
+        """
+        if self.sort_by == "relevance":
+            # Sans recherche plein texte, la pertinence retombe sur la date
+            column = self.relevance if self.relevance is not None else Product.created_at
+            ascending = False
+        else:
+            column = PRODUCT_SORT_FIELDS[self.sort_by]
+            ascending = self.sort_order == "asc"
+        
+        if ascending:
+            order_by = (column.asc(), Product.id.asc())
+        else:
+            order_by = (column.desc(), Product.id.desc())
+        
+        query = select(Product).where(*self.criteria).order_by(*order_by)
+        
+        if with_cursor and self.cursor is not None:
+            if self.cursor.sort != self.keyset_field:
+                raise ValueError(
+                    "Curseur de pagination incompatible avec le tri demandé"
+                )
+            
+            value, id = self.cursor.value, self.cursor.id
+            if ascending:
+                query = query.where(
+                    or_(column > value, and_(column == value, Product.id > id))
+                )
+            else:
+                query = query.where(
+                    or_(column < value, and_(column == value, Product.id < id))
+                )
+        
+        return query
 
 
 class ProductRepository(BaseRepository[Product]):
@@ -21,6 +302,154 @@ class ProductRepository(BaseRepository[Product]):
     def __init__(self, db: AsyncSession):
         super().__init__(Product, db)
     
+    def invalidate_cache(self, *products: Optional[Product], listings: bool = True) -> None:
+        """
+        Invalide le cache des produits modifiés et des listings
+        L'invalidation est appliquée après le commit de la session
+        
+        Args:
+            products: Produits modifiés ou lignes (id, slug) ; None ignorés
+            listings: Invalider aussi les listings (espace de noms entier)
+        """
+        keys = []
+        for product in products:
+            if product is None:
+                continue
+            keys.append(product_cache_key(product.id))
+            keys.append(product_slug_cache_key(product.slug))
+        
+        cache.invalidate_on_commit(
+            self.db,
+            keys=keys,
+            namespaces=[PRODUCT_LIST_CACHE_NAMESPACE] if listings else []
+        )
+    
+    async def create(self, obj_in: dict) -> Product:
+        """Crée un produit et invalide les listings en cache"""
+        product = await super().create(obj_in)
+        self.invalidate_cache(product)
+        return product
+    
+    async def update(self, id: int, obj_in: dict) -> Optional[Product]:
+        """Met à jour un produit et invalide son cache (ancien et nouveau slug)"""
+        previous = await self.db.get(Product, id)
+        previous_slug = previous.slug if previous else None
+        
+        product = await super().update(id, obj_in)
+        
+        self.invalidate_cache(product)
+        if previous_slug:
+            cache.invalidate_on_commit(self.db, keys=[product_slug_cache_key(previous_slug)])
+        
+        return product
+    
+    async def delete(self, id: int) -> bool:
+        """Supprime un produit et invalide son cache"""
+        product = await self.db.get(Product, id)
+        deleted = await super().delete(id)
+        
+        if deleted:
+            self.invalidate_cache(product)
+        
+        return deleted
+    
+    async def load(self, product_id: int) -> Optional[Product]:
+        """
+        Récupère un produit en passant par l'identity map de la session
+        Aucune requête si le produit est déjà chargé dans la requête HTTP
+        
+        Args:
+            product_id: ID du produit
+        
+        Returns:
+            Produit ou None
+        """
+        return await self.db.get(Product, product_id)
+    
+    async def get_many(self, product_ids: Iterable[int]) -> Dict[int, Product]:
+        """
+        Charge plusieurs produits en une seule requête WHERE id IN (...)
+        Les produits déjà présents dans la session ne sont pas rechargés
+        
+        Args:
+            product_ids: IDs des produits
+        
+        Returns:
+            Produits trouvés indexés par ID (les IDs inconnus sont absents)
+        """
+        products: Dict[int, Product] = {}
+        missing = []
+        
+        for product_id in set(product_ids):
+            product = self.db.identity_map.get(identity_key(Product, product_id))
+            if product is not None:
+                products[product_id] = product
+            else:
+                missing.append(product_id)
+        
+        if missing:
+            result = await self.db.execute(
+                select(Product).where(Product.id.in_(missing))
+            )
+            for product in result.scalars().all():
+                products[product.id] = product
+        
+        return products
+    
+    async def bulk_update(
+        self,
+        updates: List[dict],
+        chunk_size: int = BULK_UPDATE_CHUNK_SIZE,
+        refetch: bool = False,
+        skip_none: bool = True
+    ) -> int:
+        """Met à jour plusieurs produits et invalide leur cache (anciens et nouveaux slugs)"""
+        product_ids = [update_data["id"] for update_data in updates if "id" in update_data]
+        
+        # Slugs lus avant l'UPDATE : un slug modifié garde sinon son entrée en cache
+        previous = []
+        if product_ids:
+            result = await self.db.execute(
+                select(Product.id, Product.slug).where(Product.id.in_(product_ids))
+            )
+            previous = result.all()
+        
+        affected = await super().bulk_update(updates, chunk_size, refetch, skip_none)
+        
+        if product_ids:
+            self.invalidate_cache(*previous)
+        new_slugs = [
+            product_slug_cache_key(update_data["slug"])
+            for update_data in updates
+            if update_data.get("slug")
+        ]
+        if new_slugs:
+            cache.invalidate_on_commit(self.db, keys=new_slugs)
+        
+        return affected
+    
+    async def get_detail(self, product_id: int) -> Optional[Product]:
+        """
+        Récupère un produit avec images, catégories et notes agrégées
+        
+        Args:
+            product_id: ID du produit
+        
+        Returns:
+            Produit ou None
+        """
+        query = (
+            select(Product)
+            .where(Product.id == product_id)
+            .options(
+                selectinload(Product.images),
+                selectinload(Product.categories),
+                selectinload(Product.rating_stats)
+            )
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+    
     async def get_by_slug(self, slug: str) -> Optional[Product]:
         """
         Récupère un produit par son slug
@@ -37,7 +466,7 @@ class ProductRepository(BaseRepository[Product]):
             .options(
                 selectinload(Product.images),
                 selectinload(Product.categories),
-                selectinload(Product.reviews)
+                selectinload(Product.rating_stats)
             )
         )
         result = await self.db.execute(query)
@@ -95,37 +524,89 @@ class ProductRepository(BaseRepository[Product]):
         result = await self.db.execute(query)
         return result.scalar_one_or_none() is not None
     
-    async def get_active(
+    # ===== Listings =====
+    
+    async def find(
         self,
+        spec: ProductQuerySpec,
         skip: int = 0,
         limit: int = 100
     ) -> List[Product]:
         """
-        Récupère les produits actifs
+        Récupère les produits correspondant à une spécification
         
         Args:
+            spec: Spécification de filtres et de tri
             skip: Offset
             limit: Limite
         
         Returns:
-            Liste de produits actifs
+            Liste de produits
         """
         query = (
-            select(Product)
-            .where(Product.is_active == True)
+            spec.to_query()
             .options(selectinload(Product.images))
-            .offset(skip)
             .limit(limit)
-            .order_by(Product.created_at.desc())
         )
+        
+        if spec.cursor is None:
+            query = query.offset(skip)
+        
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
+    async def find_with_total(
+        self,
+        spec: ProductQuerySpec,
+        skip: int = 0,
+        limit: int = 100
+    ) -> Tuple[List[Product], int]:
+        """
+        Récupère les produits correspondant à une spécification avec le total
+        
+        Args:
+            spec: Spécification de filtres et de tri
+            skip: Offset
+            limit: Limite
+        
+        Returns:
+            (Liste de produits, Total)
+        
+        Avec un curseur, le total porte sur l'ensemble du listing
+        et non sur les lignes restantes après le curseur.
+        """
+        if spec.cursor is None:
+            query = spec.to_query().options(selectinload(Product.images))
+            return await self.paginate(query, skip, limit)
+        
+        products = await self.find(spec, skip, limit)
+        total = await self.count_query(spec.to_query(with_cursor=False))
+        
+        return products, total
+    
+    async def get_active(
+        self,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Product]:
+        """
+        Récupère les produits actifs
+        
+        Args:
+            skip: Offset
+            limit: Limite
+        
+        Returns:
+            Liste de produits actifs
+        """
+        return await self.find(ProductQuerySpec().active(), skip, limit)
+    
     async def get_by_category(
         self,
         category_id: int,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        include_descendants: bool = True
     ) -> List[Product]:
         """
         Récupère les produits d'une catégorie
@@ -134,22 +615,13 @@ class ProductRepository(BaseRepository[Product]):
             category_id: ID de la catégorie
             skip: Offset
             limit: Limite
+            include_descendants: Inclure les sous-catégories
         
         Returns:
             Liste de produits
         """
-        query = (
-            select(Product)
-            .join(Product.categories)
-            .where(Category.id == category_id)
-            .where(Product.is_active == True)
-            .options(selectinload(Product.images))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Product.created_at.desc())
-        )
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        spec = ProductQuerySpec().active().in_category(category_id, include_descendants)
+        return await self.find(spec, skip, limit)
     
     async def get_in_stock(
         self,
@@ -166,21 +638,7 @@ class ProductRepository(BaseRepository[Product]):
         Returns:
             Liste de produits en stock
         """
-        query = (
-            select(Product)
-            .where(
-                and_(
-                    Product.is_active == True,
-                    Product.stock > 0
-                )
-            )
-            .options(selectinload(Product.images))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Product.created_at.desc())
-        )
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return await self.find(ProductQuerySpec().active().in_stock(), skip, limit)
     
     async def get_on_sale(
         self,
@@ -197,22 +655,7 @@ class ProductRepository(BaseRepository[Product]):
         Returns:
             Liste de produits en promo
         """
-        query = (
-            select(Product)
-            .where(
-                and_(
-                    Product.is_active == True,
-                    Product.sale_price.is_not(None),
-                    Product.sale_price > 0
-                )
-            )
-            .options(selectinload(Product.images))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Product.created_at.desc())
-        )
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return await self.find(ProductQuerySpec().active().on_sale(), skip, limit)
     
     async def get_by_price_range(
         self,
@@ -233,22 +676,13 @@ class ProductRepository(BaseRepository[Product]):
         Returns:
             Liste de produits
         """
-        query = (
-            select(Product)
-            .where(
-                and_(
-                    Product.is_active == True,
-                    Product.price >= min_price,
-                    Product.price <= max_price
-                )
-            )
-            .options(selectinload(Product.images))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Product.price.asc())
+        spec = (
+            ProductQuerySpec()
+            .active()
+            .price_between(min_price, max_price)
+            .sort("price", "asc")
         )
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return await self.find(spec, skip, limit)
     
     async def search(
         self,
@@ -267,26 +701,8 @@ class ProductRepository(BaseRepository[Product]):
         Returns:
             Liste de produits correspondants
         """
-        search_pattern = f"%{search_term}%"
-        query = (
-            select(Product)
-            .where(
-                and_(
-                    Product.is_active == True,
-                    or_(
-                        Product.name.ilike(search_pattern),
-                        Product.description.ilike(search_pattern),
-                        Product.sku.ilike(search_pattern)
-                    )
-                )
-            )
-            .options(selectinload(Product.images))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Product.created_at.desc())
-        )
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        spec = ProductQuerySpec().active().matching(search_term).sort("relevance", "desc")
+        return await self.find(spec, skip, limit)
     
     async def update_stock(self, product_id: int, quantity: int) -> Optional[Product]:
         """
@@ -337,6 +753,132 @@ class ProductRepository(BaseRepository[Product]):
         new_stock = product.stock + quantity
         return await self.update_stock(product_id, new_stock)
     
+    async def reserve_stock(self, quantities: Dict[int, int]) -> List[StockShortage]:
+        """
+        Réserve (décrémente) le stock de plusieurs produits en tout ou rien
+        
+        Les lignes sont verrouillées (SELECT ... FOR UPDATE) dans l'ordre des
+        IDs pour éviter les interblocages entre paniers concurrents, puis
+        décrémentées par un unique UPDATE conditionnel. Deux requêtes au
+        total, quel que soit le nombre de lignes.
+        
+        Seuls les détails des produits sont invalidés ; les listings ne le
+        sont que si un produit passe en rupture (le stock affiché dans un
+        listing peut donc avoir jusqu'à CACHE_TTL de retard).
+        
+        Args:
+            quantities: Quantité demandée par ID de produit
+        
+        Returns:
+            Lignes refusées (produit absent, inactif ou stock insuffisant).
+            Si la liste n'est pas vide, aucun stock n'a été modifié.
+        """
+        if not quantities:
+            return []
+        
+        product_ids = sorted(quantities)
+        
+        query = (
+            select(
+                Product.id,
+                Product.slug,
+                Product.sku,
+                Product.name,
+                Product.stock,
+                Product.is_active
+            )
+            .where(Product.id.in_(product_ids))
+            .order_by(Product.id)
+            .with_for_update()
+        )
+        result = await self.db.execute(query)
+        rows = {row.id: row for row in result.all()}
+        
+        shortages = []
+        for product_id in product_ids:
+            requested = quantities[product_id]
+            row = rows.get(product_id)
+            
+            if row is None or not row.is_active:
+                shortages.append(StockShortage(
+                    product_id,
+                    row.sku if row else None,
+                    row.name if row else None,
+                    requested,
+                    0
+                ))
+            elif row.stock < requested:
+                shortages.append(StockShortage(
+                    product_id, row.sku, row.name, requested, row.stock
+                ))
+        
+        if shortages:
+            return shortages
+        
+        delta = case(quantities, value=Product.id)
+        await self.db.execute(
+            update(Product)
+            .where(Product.id.in_(product_ids))
+            .where(Product.stock >= delta)
+            .values(stock=Product.stock - delta)
+            .execution_options(synchronize_session=False)
+        )
+        
+        self._sync_loaded_stock({
+            product_id: -quantity for product_id, quantity in quantities.items()
+        })
+        self.invalidate_cache(
+            *rows.values(),
+            listings=any(rows[product_id].stock <= quantities[product_id] for product_id in product_ids)
+        )
+        
+        return []
+    
+    async def release_stock(self, quantities: Dict[int, int]) -> None:
+        """
+        Remet en stock plusieurs produits en un seul UPDATE
+        
+        Les listings ne sont invalidés que si un produit en rupture
+        redevient disponible.
+        
+        Args:
+            quantities: Quantité à restituer par ID de produit
+        """
+        if not quantities:
+            return
+        
+        product_ids = sorted(quantities)
+        delta = case(quantities, value=Product.id)
+        
+        await self.db.execute(
+            update(Product)
+            .where(Product.id.in_(product_ids))
+            .values(stock=Product.stock + delta)
+            .execution_options(synchronize_session=False)
+        )
+        
+        self._sync_loaded_stock(quantities)
+        
+        # Slugs nécessaires pour invalider les détails en cache
+        result = await self.db.execute(
+            select(Product.id, Product.slug, Product.stock).where(Product.id.in_(product_ids))
+        )
+        rows = result.all()
+        self.invalidate_cache(
+            *rows,
+            listings=any(row.stock - quantities[row.id] <= 0 for row in rows)
+        )
+    
+    def _sync_loaded_stock(self, deltas: Dict[int, int]) -> None:
+        """
+        Répercute une variation de stock sur les produits déjà chargés
+        dans la session (l'UPDATE groupé ne synchronise pas l'identity map)
+        """
+        for product_id, delta in deltas.items():
+            product = self.db.identity_map.get(identity_key(Product, product_id))
+            if product is not None and "stock" in product.__dict__:
+                set_committed_value(product, "stock", product.stock + delta)
+    
     async def add_to_category(self, product_id: int, category_id: int) -> bool:
         """
         Ajoute un produit à une catégorie
@@ -359,6 +901,7 @@ class ProductRepository(BaseRepository[Product]):
         if category not in product.categories:
             product.categories.append(category)
             await self.db.flush()
+            self.invalidate_cache(product)
         
         return True
     
@@ -384,5 +927,6 @@ class ProductRepository(BaseRepository[Product]):
         if category in product.categories:
             product.categories.remove(category)
             await self.db.flush()
+            self.invalidate_cache(product)
         
         return True
\ No newline at end of file
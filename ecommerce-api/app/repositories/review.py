@@ -4,13 +4,21 @@ Repository pour Review
 Gestion de l'accès aux données des avis clients
 """
 
-from typing import Optional, List, Dict
-from sqlalchemy import select, and_, func
+from typing import Optional, List, Dict, Tuple
+from sqlalchemy import select, update, and_, func, case
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 
-from app.models.review import Review
+from app.models.product import Product
+from app.models.review import Review, ProductRatingStats
 from app.repositories.base import BaseRepository
+from app.repositories.product import ProductRepository
+
+
+# Colonne de distribution par note
+RATING_COLUMNS = {rating: f"rating_{rating}" for rating in range(1, 6)}
 
 
 class ReviewRepository(BaseRepository[Review]):
@@ -19,6 +27,181 @@ class ReviewRepository(BaseRepository[Review]):
     def __init__(self, db: AsyncSession):
         super().__init__(Review, db)
     
+    # ===== Écritures maintenant les agrégats de notes =====
+    
+    async def create(self, obj_in: dict) -> Review:
+        """Crée un avis et met à jour les agrégats s'il est déjà approuvé"""
+        review = await super().create(obj_in)
+        
+        if review.is_approved:
+            await self._apply_rating_delta(review.product_id, review.rating, 1)
+        
+        return review
+    
+    async def update(self, id: int, obj_in: dict) -> Optional[Review]:
+        """
+        Met à jour un avis et répercute le changement sur les agrégats
+        La ligne est verrouillée pour compter chaque transition une seule fois
+        """
+        previous = await self._get_for_update(id)
+        if previous is None:
+            return None
+        
+        before = (previous.is_approved, previous.rating)
+        
+        review = await super().update(id, obj_in)
+        
+        await self._apply_transition(
+            review.product_id,
+            before,
+            (review.is_approved, review.rating)
+        )
+        
+        return review
+    
+    async def delete(self, id: int) -> bool:
+        """Supprime un avis et retire sa note des agrégats s'il était approuvé"""
+        previous = await self._get_for_update(id)
+        if previous is None:
+            return False
+        
+        product_id, was_approved, rating = previous.product_id, previous.is_approved, previous.rating
+        
+        deleted = await super().delete(id)
+        
+        if deleted and was_approved:
+            await self._apply_rating_delta(product_id, rating, -1)
+        
+        return deleted
+    
+    async def _get_for_update(self, review_id: int) -> Optional[Review]:
+        """Charge un avis en verrouillant sa ligne (SELECT ... FOR UPDATE)"""
+        query = (
+            select(Review)
+            .where(Review.id == review_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+    
+    async def _apply_transition(
+        self,
+        product_id: int,
+        before: Tuple[bool, int],
+        after: Tuple[bool, int]
+    ) -> None:
+        """
+        Répercute le passage (approuvé, note) avant -> après sur les agrégats
+        
+        Args:
+            product_id: ID du produit
+            before: (is_approved, rating) avant modification
+            after: (is_approved, rating) après modification
+        """
+        if before == after:
+            return
+        
+        was_approved, old_rating = before
+        is_approved, new_rating = after
+        
+        if was_approved:
+            await self._apply_rating_delta(product_id, old_rating, -1)
+        if is_approved:
+            await self._apply_rating_delta(product_id, new_rating, 1)
+    
+    async def _apply_rating_delta(self, product_id: int, rating: int, sign: int) -> None:
+        """
+        Ajoute (sign=1) ou retire (sign=-1) une note des agrégats du produit
+        Un seul INSERT ... ON DUPLICATE KEY UPDATE, sans lecture préalable
+        
+        Args:
+            product_id: ID du produit
+            rating: Note concernée (1-5)
+            sign: 1 ou -1
+        """
+        rating_column = RATING_COLUMNS[rating]
+        
+        statement = mysql_insert(ProductRatingStats).values(
+            product_id=product_id,
+            review_count=max(sign, 0),
+            rating_sum=max(sign, 0) * rating,
+            **{rating_column: max(sign, 0)}
+        )
+        statement = statement.on_duplicate_key_update(
+            review_count=ProductRatingStats.review_count + sign,
+            rating_sum=ProductRatingStats.rating_sum + sign * rating,
+            updated_at=func.now(),
+            **{rating_column: getattr(ProductRatingStats, rating_column) + sign}
+        )
+        await self.db.execute(statement)
+        
+        # Les agrégats chargés en session et le détail produit en cache sont périmés
+        stats = self.db.identity_map.get(identity_key(ProductRatingStats, product_id))
+        if stats is not None:
+            await self.db.refresh(stats)
+        
+        product = await self.db.get(Product, product_id)
+        ProductRepository(self.db).invalidate_cache(product)
+    
+    async def reconcile_rating_stats(self) -> int:
+        """
+        Recalcule tous les agrégats depuis la table reviews (répare les écarts)
+        
+        Returns:
+            Nombre de produits dont les agrégats ont été réécrits
+        """
+        approved = Review.is_approved == True
+        
+        # Produits n'ayant plus aucun avis approuvé
+        reset = await self.db.execute(
+            update(ProductRatingStats)
+            .where(
+                ProductRatingStats.product_id.not_in(
+                    select(Review.product_id).where(approved).distinct()
+                )
+            )
+            .where(ProductRatingStats.review_count != 0)
+            .values(
+                review_count=0,
+                rating_sum=0,
+                **{column: 0 for column in RATING_COLUMNS.values()}
+            )
+            .execution_options(synchronize_session=False)
+        )
+        
+        aggregates = (
+            select(
+                Review.product_id,
+                func.count(Review.id),
+                func.sum(Review.rating),
+                *[
+                    func.sum(case((Review.rating == rating, 1), else_=0))
+                    for rating in RATING_COLUMNS
+                ]
+            )
+            .where(approved)
+            .group_by(Review.product_id)
+        )
+        
+        statement = mysql_insert(ProductRatingStats).from_select(
+            ["product_id", "review_count", "rating_sum", *RATING_COLUMNS.values()],
+            aggregates
+        )
+        statement = statement.on_duplicate_key_update(
+            review_count=statement.inserted.review_count,
+            rating_sum=statement.inserted.rating_sum,
+            updated_at=func.now(),
+            **{
+                column: getattr(statement.inserted, column)
+                for column in RATING_COLUMNS.values()
+            }
+        )
+        upsert = await self.db.execute(statement)
+        
+        # MySQL compte 1 par insertion et 2 par mise à jour effective
+        return reset.rowcount + upsert.rowcount
+    
     async def get_by_product_id(
         self,
         product_id: int,
@@ -207,9 +390,21 @@ class ReviewRepository(BaseRepository[Review]):
         """
         return await self.update(review_id, {"is_approved": False})
     
+    async def get_rating_stats(self, product_id: int) -> Optional[ProductRatingStats]:
+        """
+        Récupère les agrégats de notes d'un produit
+        
+        Args:
+            product_id: ID du produit
+        
+        Returns:
+            Agrégats ou None si aucun avis approuvé n'a jamais été compté
+        """
+        return await self.db.get(ProductRatingStats, product_id)
+    
     async def get_average_rating(self, product_id: int) -> Optional[float]:
         """
-        Calcule la note moyenne d'un produit
+        Note moyenne d'un produit (depuis les agrégats)
         
         Args:
             product_id: ID du produit
@@ -217,19 +412,8 @@ class ReviewRepository(BaseRepository[Review]):
         Returns:
             Note moyenne ou None
         """
-        query = (
-            select(func.avg(Review.rating))
-            .where(
-                and_(
-                    Review.product_id == product_id,
-                    Review.is_approved == True
-                )
-            )
-        )
-        result = await self.db.execute(query)
-        average = result.scalar_one_or_none()
-        
-        return round(float(average), 2) if average else None
+        stats = await self.get_rating_stats(product_id)
+        return stats.average if stats else None
     
     async def count_by_product(self, product_id: int, approved_only: bool = True) -> int:
         """
@@ -243,7 +427,8 @@ class ReviewRepository(BaseRepository[Review]):
             Nombre d'avis
         """
         if approved_only:
-            return await self.count(product_id=product_id, is_approved=True)
+            stats = await self.get_rating_stats(product_id)
+            return stats.review_count if stats else 0
         return await self.count(product_id=product_id)
     
     async def count_by_user(self, user_id: int) -> int:
@@ -260,7 +445,7 @@ class ReviewRepository(BaseRepository[Review]):
     
     async def get_rating_distribution(self, product_id: int) -> Dict[int, int]:
         """
-        Calcule la distribution des notes pour un produit
+        Distribution des notes d'un produit (depuis les agrégats)
         
         Args:
             product_id: ID du produit
@@ -268,23 +453,12 @@ class ReviewRepository(BaseRepository[Review]):
         Returns:
             Dict avec {note: nombre_avis}
         """
-        query = (
-            select(Review.rating, func.count(Review.id))
-            .where(
-                and_(
-                    Review.product_id == product_id,
-                    Review.is_approved == True
-                )
-            )
-            .group_by(Review.rating)
-        )
-        result = await self.db.execute(query)
+        stats = await self.get_rating_stats(product_id)
         
-        distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        for rating, count in result.all():
-            distribution[rating] = count
+        if stats is None:
+            return {rating: 0 for rating in RATING_COLUMNS}
         
-        return distribution
+        return stats.distribution
     
     async def count_pending(self) -> int:
         """
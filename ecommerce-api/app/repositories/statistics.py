@@ -0,0 +1,319 @@
+"""
+Repository Statistics - Agrégats journaliers (rollup) des commandes et paiements
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from sqlalchemy import select, insert, update, delete, func, literal, union_all, Select, Subquery
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order import Order, OrderStatus
+from app.models.payment import Payment, PaymentStatus
+from app.models.statistics import OrderDailyStats, PaymentDailyStats, OrderStatsDelta, PaymentStatsDelta
+from app.repositories.base import BULK_INSERT_CHUNK_SIZE
+
+
+Source = Union[Type[Order], Type[Payment]]
+Rollup = Union[Type[OrderDailyStats], Type[PaymentDailyStats]]
+Delta = Union[Type[OrderStatsDelta], Type[PaymentStatsDelta]]
+
+# Table source -> (table d'agrégats, journal des deltas, colonne montant)
+ROLLUPS = {
+    Order: (OrderDailyStats, OrderStatsDelta, Order.total_amount),
+    Payment: (PaymentDailyStats, PaymentStatsDelta, Payment.amount),
+}
+
+# Statuts comptés dans le chiffre d'affaires
+ORDER_REVENUE_STATUSES = frozenset({OrderStatus.PAID, OrderStatus.SHIPPED, OrderStatus.DELIVERED})
+
+
+class StatisticsRepository:
+    """
+    Repository des agrégats journaliers
+    
+    Les créations et changements de statut n'écrivent que des deltas
+    (INSERT ... SELECT en ajout seul) : le checkout ne verrouille jamais
+    la ligne (jour, statut) partagée. fold_deltas() reporte les deltas
+    dans les agrégats hors des transactions métier ; les lectures
+    additionnent agrégats et deltas en attente.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _record(self, delta: Delta, aggregates: Select) -> None:
+        """
+        Ajoute des deltas (jour, statut, nombre, montant) au journal
+        
+        Args:
+            delta: Journal des deltas
+            aggregates: SELECT produisant les deltas
+        """
+        await self.db.execute(
+            insert(delta).from_select(["day", "status", "total", "amount"], aggregates)
+        )
+    
+    async def record_created(self, source: Source, ids: Iterable[int]) -> None:
+        """
+        Journalise des lignes nouvellement créées (à appeler après flush)
+        
+        Args:
+            source: Order ou Payment
+            ids: IDs des lignes créées
+        """
+        ids = list(ids)
+        if not ids:
+            return
+        
+        _, delta, amount = ROLLUPS[source]
+        day = func.date(source.created_at)
+        
+        await self._record(
+            delta,
+            select(day, source.status, func.count(), func.sum(amount))
+            .where(source.id.in_(ids))
+            .group_by(day, source.status)
+        )
+    
+    async def record_transition(
+        self,
+        source: Source,
+        ids: Iterable[int],
+        new_status: Union[OrderStatus, PaymentStatus]
+    ) -> None:
+        """
+        Journalise le passage de lignes à un nouveau statut (à appeler AVANT l'UPDATE)
+        
+        Args:
+            source: Order ou Payment
+            ids: IDs des lignes dont le statut change
+            new_status: Nouveau statut
+        """
+        ids = list(ids)
+        if not ids:
+            return
+        
+        _, delta, amount = ROLLUPS[source]
+        day = func.date(source.created_at)
+        moving = source.id.in_(ids) & (source.status != new_status)
+        
+        # Retrait de l'ancien statut
+        await self._record(
+            delta,
+            select(day, source.status, -func.count(), -func.sum(amount))
+            .where(moving)
+            .group_by(day, source.status)
+        )
+        
+        # Ajout au nouveau statut
+        await self._record(
+            delta,
+            select(day, literal(new_status, source.__table__.c.status.type), func.count(), func.sum(amount))
+            .where(moving)
+            .group_by(day)
+        )
+    
+    async def fold_deltas(self, source: Source) -> int:
+        """
+        Reporte les deltas en attente dans les agrégats puis les supprime
+        
+        La lecture des deltas est verrouillante : un delta inséré par une
+        transaction encore ouverte est attendu, jamais supprimé sans avoir
+        été compté, et une réconciliation en cours (FOR SHARE) est attendue.
+        
+        Args:
+            source: Order ou Payment
+        
+        Returns:
+            Nombre de deltas reportés
+        """
+        rollup, delta, _ = ROLLUPS[source]
+        
+        last_id = (await self.db.execute(select(func.max(delta.id)))).scalar_one()
+        if last_id is None:
+            return 0
+        
+        result = await self.db.execute(
+            select(delta.day, delta.status, func.sum(delta.total), func.sum(delta.amount))
+            .where(delta.id <= last_id)
+            .group_by(delta.day, delta.status)
+            .with_for_update()
+        )
+        rows = [
+            {"day": day, "status": row_status, "total": total, "amount": amount}
+            for day, row_status, total, amount in result.all()
+        ]
+        
+        if rows:
+            statement = mysql_insert(rollup).values(rows)
+            statement = statement.on_duplicate_key_update(
+                total=rollup.total + statement.inserted.total,
+                amount=rollup.amount + statement.inserted.amount,
+                updated_at=func.now()
+            )
+            await self.db.execute(statement)
+        
+        folded = await self.db.execute(
+            delete(delta)
+            .where(delta.id <= last_id)
+            .execution_options(synchronize_session=False)
+        )
+        return folded.rowcount
+    
+    def _combined(
+        self,
+        source: Source,
+        date_from: Optional[date],
+        date_to: Optional[date]
+    ) -> Subquery:
+        """Agrégats et deltas en attente d'une période (day, status, total, amount)"""
+        rollup, delta, _ = ROLLUPS[source]
+        
+        return union_all(
+            self._filter_days(
+                select(rollup.day, rollup.status, rollup.total, rollup.amount),
+                rollup, date_from, date_to
+            ),
+            self._filter_days(
+                select(delta.day, delta.status, delta.total, delta.amount),
+                delta, date_from, date_to
+            )
+        ).subquery()
+    
+    async def get_totals(
+        self,
+        source: Source,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Dict[Union[OrderStatus, PaymentStatus], Tuple[int, Decimal]]:
+        """
+        Nombre et montant par statut (une seule requête groupée sur les agrégats)
+        
+        Args:
+            source: Order ou Payment
+            date_from: Premier jour inclus (optionnel)
+            date_to: Dernier jour inclus (optionnel)
+        
+        Returns:
+            Dictionnaire {statut: (nombre, montant)}
+        """
+        combined = self._combined(source, date_from, date_to)
+        
+        result = await self.db.execute(
+            select(combined.c.status, func.sum(combined.c.total), func.sum(combined.c.amount))
+            .group_by(combined.c.status)
+        )
+        return {
+            row_status: (int(total or 0), amount or Decimal("0"))
+            for row_status, total, amount in result.all()
+        }
+    
+    async def get_daily(
+        self,
+        source: Source,
+        date_from: date,
+        date_to: date
+    ) -> List[Tuple[date, Union[OrderStatus, PaymentStatus], int, Decimal]]:
+        """
+        Agrégats jour par jour d'une période
+        
+        Args:
+            source: Order ou Payment
+            date_from: Premier jour inclus
+            date_to: Dernier jour inclus
+        
+        Returns:
+            Lignes (jour, statut, nombre, montant) triées par jour
+        """
+        combined = self._combined(source, date_from, date_to)
+        total = func.sum(combined.c.total)
+        
+        result = await self.db.execute(
+            select(combined.c.day, combined.c.status, total, func.sum(combined.c.amount))
+            .group_by(combined.c.day, combined.c.status)
+            .having(total != 0)
+            .order_by(combined.c.day, combined.c.status)
+        )
+        return [(day, row_status, int(count), amount) for day, row_status, count, amount in result.all()]
+    
+    @staticmethod
+    def _filter_days(
+        query: Select,
+        table: Union[Rollup, Delta],
+        date_from: Optional[date],
+        date_to: Optional[date]
+    ) -> Select:
+        if date_from:
+            query = query.where(table.day >= date_from)
+        if date_to:
+            query = query.where(table.day <= date_to)
+        return query
+    
+    async def reconcile(self, source: Source) -> int:
+        """
+        Recalcule tous les agrégats depuis la table source (répare les écarts)
+        
+        Les deltas en attente sont conservés : chaque agrégat reçoit
+        source - deltas, de sorte que agrégat + deltas = source. Les deltas
+        sont lus en premier en mode partagé (FOR SHARE) : ceux d'une
+        transaction ouverte sont attendus, et tout nouveau delta attend la
+        fin de la réconciliation, sa ligne source (non validée) étant donc
+        aussi absente de la lecture cohérente de la table source qui suit.
+        fold_deltas verrouille les mêmes lignes : les deux sont sérialisés.
+        
+        Args:
+            source: Order ou Payment
+        
+        Returns:
+            Nombre de lignes d'agrégats réécrites
+        """
+        rollup, delta, amount = ROLLUPS[source]
+        day = func.date(source.created_at)
+        
+        pending = await self.db.execute(
+            select(delta.day, delta.status, func.sum(delta.total), func.sum(delta.amount))
+            .group_by(delta.day, delta.status)
+            .with_for_update(read=True)
+        )
+        expected: Dict[tuple, List] = {
+            (row_day, row_status): [-int(total), -(row_amount or 0)]
+            for row_day, row_status, total, row_amount in pending.all()
+        }
+        
+        result = await self.db.execute(
+            select(day, source.status, func.count(), func.sum(amount))
+            .group_by(day, source.status)
+        )
+        for row_day, row_status, total, row_amount in result.all():
+            counts = expected.setdefault((row_day, row_status), [0, Decimal("0")])
+            counts[0] += total
+            counts[1] += row_amount or 0
+        
+        # Remise à zéro : les couples (jour, statut) disparus restent à 0
+        reset = await self.db.execute(
+            update(rollup)
+            .where(rollup.total != 0)
+            .values(total=0, amount=0)
+            .execution_options(synchronize_session=False)
+        )
+        rewritten = reset.rowcount
+        
+        rows = [
+            {"day": row_day, "status": row_status, "total": total, "amount": row_amount}
+            for (row_day, row_status), (total, row_amount) in expected.items()
+        ]
+        for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            statement = mysql_insert(rollup).values(rows[start:start + BULK_INSERT_CHUNK_SIZE])
+            statement = statement.on_duplicate_key_update(
+                total=statement.inserted.total,
+                amount=statement.inserted.amount,
+                updated_at=func.now()
+            )
+            upsert = await self.db.execute(statement)
+            rewritten += upsert.rowcount
+        
+        # MySQL compte 1 par insertion et 2 par mise à jour effective
+        return rewritten
@@ -4,13 +4,16 @@ Repository pour User
 Gestion de l'accès aux données utilisateurs
 """
 
-from typing import Optional, List
-from sqlalchemy import select, or_
+from typing import Any, Dict, Iterable, Optional, List, Tuple
+from sqlalchemy import select, or_, func, Select
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
+from app.core.cache import cache
+from app.core.security import principal_cache_key
 from app.models.user import User, UserRole
 from app.repositories.base import BaseRepository
+from app.utils.pagination import Cursor
 
 
 class UserRepository(BaseRepository[User]):
@@ -19,6 +22,28 @@ class UserRepository(BaseRepository[User]):
     def __init__(self, db: AsyncSession):
         super().__init__(User, db)
     
+    def invalidate_principal(self, user_id: int) -> None:
+        """Invalide le principal en cache (après commit)"""
+        cache.invalidate_on_commit(self.db, keys=[principal_cache_key(user_id)])
+    
+    async def update(self, id: int, obj_in: dict) -> Optional[User]:
+        """Met à jour un utilisateur et invalide son principal en cache"""
+        user = await super().update(id, obj_in)
+        
+        if user is not None:
+            self.invalidate_principal(id)
+        
+        return user
+    
+    async def delete(self, id: int) -> bool:
+        """Supprime un utilisateur et invalide son principal en cache"""
+        deleted = await super().delete(id)
+        
+        if deleted:
+            self.invalidate_principal(id)
+        
+        return deleted
+    
     async def get_by_email(self, email: str) -> Optional[User]:
         """
         Récupère un utilisateur par son email
@@ -50,6 +75,25 @@ class UserRepository(BaseRepository[User]):
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
     
+    async def get_contacts(self, user_ids: Iterable[int]) -> Dict[int, Any]:
+        """
+        Charge les coordonnées (id, email, prénom) de plusieurs utilisateurs
+        Une seule requête, sans charger les objets User
+        
+        Args:
+            user_ids: IDs des utilisateurs
+        
+        Returns:
+            Lignes (id, email, first_name) par ID
+        """
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return {}
+        
+        query = select(User.id, User.email, User.first_name).where(User.id.in_(user_ids))
+        result = await self.db.execute(query)
+        return {row.id: row for row in result.all()}
+    
     async def email_exists(self, email: str, exclude_id: Optional[int] = None) -> bool:
         """
         Vérifie si un email existe déjà
@@ -136,7 +180,8 @@ class UserRepository(BaseRepository[User]):
     async def get_all_active(
         self,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[Cursor] = None
     ) -> List[User]:
         """
         Récupère tous les utilisateurs actifs
@@ -144,6 +189,7 @@ class UserRepository(BaseRepository[User]):
         Args:
             skip: Offset
             limit: Limite
+            after: Curseur keyset (remplace skip)
         
         Returns:
             Liste d'utilisateurs actifs
@@ -151,10 +197,8 @@ class UserRepository(BaseRepository[User]):
         query = (
             select(User)
             .where(User.is_active == True)
-            .offset(skip)
-            .limit(limit)
-            .order_by(User.created_at.desc())
         )
+        query = self.keyset_page(query, skip, limit, after)
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
@@ -162,7 +206,8 @@ class UserRepository(BaseRepository[User]):
         self,
         role: UserRole,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[Cursor] = None
     ) -> List[User]:
         """
         Récupère les utilisateurs par rôle
@@ -171,6 +216,7 @@ class UserRepository(BaseRepository[User]):
             role: Rôle recherché
             skip: Offset
             limit: Limite
+            after: Curseur keyset (remplace skip)
         
         Returns:
             Liste d'utilisateurs
@@ -178,10 +224,8 @@ class UserRepository(BaseRepository[User]):
         query = (
             select(User)
             .where(User.role == role)
-            .offset(skip)
-            .limit(limit)
-            .order_by(User.created_at.desc())
         )
+        query = self.keyset_page(query, skip, limit, after)
         result = await self.db.execute(query)
         return list(result.scalars().all())
     
@@ -189,7 +233,8 @@ class UserRepository(BaseRepository[User]):
         self,
         search_term: str,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[Cursor] = None
     ) -> List[User]:
         """
         Recherche d'utilisateurs par nom ou email
@@ -198,26 +243,37 @@ class UserRepository(BaseRepository[User]):
             search_term: Terme de recherche
             skip: Offset
             limit: Limite
+            after: Curseur keyset (remplace skip)
         
         Returns:
             Liste d'utilisateurs correspondants
         """
+        query = self.keyset_page(self._search_query(search_term), skip, limit, after)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+    
+    async def count_search(self, search_term: str) -> int:
+        """
+        Compte les utilisateurs correspondant à une recherche
+        
+        Args:
+            search_term: Terme de recherche
+        
+        Returns:
+            Nombre d'utilisateurs correspondants
+        """
+        return await self.count_query(self._search_query(search_term))
+    
+    def _search_query(self, search_term: str) -> Select:
+        """Requête de recherche par nom ou email (sans tri ni pagination)"""
         search_pattern = f"%{search_term}%"
-        query = (
-            select(User)
-            .where(
-                or_(
-                    User.email.ilike(search_pattern),
-                    User.first_name.ilike(search_pattern),
-                    User.last_name.ilike(search_pattern)
-                )
+        return select(User).where(
+            or_(
+                User.email.ilike(search_pattern),
+                User.first_name.ilike(search_pattern),
+                User.last_name.ilike(search_pattern)
             )
-            .offset(skip)
-            .limit(limit)
-            .order_by(User.created_at.desc())
         )
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
     
     async def count_by_role(self, role: UserRole) -> int:
         """
@@ -238,4 +294,17 @@ class UserRepository(BaseRepository[User]):
         Returns:
             Nombre d'utilisateurs actifs
         """
-        return await self.count(is_active=True)
\ No newline at end of file
+        return await self.count(is_active=True)
+    
+    async def count_by_role_and_activity(self) -> Dict[Tuple[UserRole, bool], int]:
+        """
+        Compte les utilisateurs par rôle et état (une seule requête groupée)
+        
+        Returns:
+            Dictionnaire {(rôle, actif): nombre}
+        """
+        result = await self.db.execute(
+            select(User.role, User.is_active, func.count())
+            .group_by(User.role, User.is_active)
+        )
+        return {(role, bool(is_active)): count for role, is_active, count in result.all()}
\ No newline at end of file
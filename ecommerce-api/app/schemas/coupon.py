@@ -69,6 +69,7 @@ class CouponResponse(CouponBase):
 class CouponDetailResponse(CouponResponse):
     """Schema de réponse détaillé"""
     usage_count: int = Field(default=0, description="Nombre d'utilisations")
+    total_discount: Decimal = Field(default=Decimal("0"), description="Total des réductions accordées")
     is_expired: bool = Field(..., description="Coupon expiré")
     is_valid: bool = Field(..., description="Coupon valide")
     
@@ -77,6 +77,12 @@ class OrderUpdateStatus(BaseModel):
     status: OrderStatus = Field(..., description="Nouveau statut")
 
 
+class OrderBulkStatusUpdate(BaseModel):
+    """Schema pour changer le statut de plusieurs commandes (admin)"""
+    order_ids: List[int] = Field(..., min_length=1, max_length=10000, description="IDs des commandes")
+    status: OrderStatus = Field(..., description="Nouveau statut")
+
+
 class OrderCancel(BaseModel):
     """Schema pour annuler une commande"""
     reason: Optional[str] = Field(None, description="Raison de l'annulation")
@@ -89,6 +95,7 @@ class OrderResponse(BaseModel):
     user_id: int
     status: OrderStatus
     total_amount: Decimal
+    discount_amount: Decimal = Decimal("0")
     billing_address_id: Optional[int] = None
     shipping_address_id: Optional[int] = None
     created_at: datetime
@@ -169,6 +176,20 @@ class OrderCreatedResponse(BaseModel):
     payment_required: bool = True
 
 
+class OrderStatusRejection(BaseModel):
+    """Commande exclue d'un changement de statut groupé"""
+    order_id: int
+    reason: str
+
+
+class OrderBulkStatusResponse(BaseModel):
+    """Réponse après changement de statut groupé"""
+    status: OrderStatus
+    updated: int = 0
+    notifications_queued: int = 0
+    rejected: List[OrderStatusRejection] = []
+
+
 class OrderCancelledResponse(BaseModel):
     """Réponse après annulation"""
     message: str = "Commande annulée"
@@ -166,10 +166,28 @@ class ProductFilterParams(BaseModel):
     on_sale: Optional[bool] = Field(None, description="En promotion uniquement")
     is_active: Optional[bool] = Field(True, description="Produits actifs")
     search: Optional[str] = Field(None, description="Recherche par nom/description")
-    sort_by: Optional[str] = Field("created_at", description="Trier par (price, name, created_at)")
+    sort_by: Optional[str] = Field(None, description="Trier par (price, name, stock, created_at, relevance)")
     sort_order: Optional[str] = Field("desc", description="Ordre (asc, desc)")
 
 
+# ===== Schemas pour import en masse =====
+class ProductImportError(BaseModel):
+    """Ligne rejetée lors d'un import"""
+    line: int = Field(..., description="Numéro de ligne dans le fichier")
+    message: str = Field(..., description="Raison du rejet")
+
+
+class ProductImportReport(BaseModel):
+    """Résultat d'un import de catalogue"""
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ProductImportError] = Field(
+        default=[],
+        description="Lignes rejetées (liste tronquée au-delà de 1000)"
+    )
+
+
 # Import pour résoudre les références forward
 from app.schemas.category import CategoryResponse
 
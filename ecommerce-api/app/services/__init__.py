@@ -12,6 +12,9 @@ from app.services.order import OrderService
 from app.services.payment import PaymentService
 from app.services.coupon import CouponService
 from app.services.email import EmailService
+from app.services.email_dispatcher import EmailDispatcher
+from app.services.catalog import CatalogService
+from app.services.coupon_index import CouponIndex
 
 
 __all__ = [
@@ -23,4 +26,7 @@ __all__ = [
     "PaymentService",
     "CouponService",
     "EmailService",
+    "EmailDispatcher",
+    "CatalogService",
+    "CouponIndex",
 ]
\ No newline at end of file
@@ -10,8 +10,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
+    verify_and_update_password,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -52,7 +53,7 @@ class AuthService:
             )
         
         # Hasher le mot de passe
-        password_hash = hash_password(user_data.password)
+        password_hash = await hash_password_async(user_data.password)
         
         # Créer l'utilisateur
         user_dict = user_data.model_dump(exclude={"password"})
@@ -86,13 +87,18 @@ class AuthService:
                 detail="Email ou mot de passe incorrect"
             )
         
-        # Vérifier le mot de passe
-        if not verify_password(password, user.password_hash):
+        # Vérifier le mot de passe (hash recalculé si son coût est obsolète)
+        is_valid, new_hash = await verify_and_update_password(password, user.password_hash)
+        
+        if not is_valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Email ou mot de passe incorrect"
             )
         
+        if new_hash:
+            await self.user_repo.update_password(user.id, new_hash)
+        
         # Vérifier si le compte est actif
         if not user.is_active:
             raise HTTPException(
@@ -286,7 +292,7 @@ class AuthService:
                 )
             
             # Hasher le nouveau mot de passe
-            new_password_hash = hash_password(new_password)
+            new_password_hash = await hash_password_async(new_password)
             
             # Mettre à jour
             updated_user = await self.user_repo.update_password(
@@ -331,14 +337,14 @@ class AuthService:
             )
         
         # Vérifier le mot de passe actuel
-        if not verify_password(current_password, user.password_hash):
+        if not await verify_password_async(current_password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Mot de passe actuel incorrect"
             )
         
         # Hasher le nouveau mot de passe
-        new_password_hash = hash_password(new_password)
+        new_password_hash = await hash_password_async(new_password)
         
         # Mettre à jour
         updated_user = await self.user_repo.update_password(
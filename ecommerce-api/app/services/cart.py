@@ -78,7 +78,7 @@ class CartService:
             HTTPException: Si produit non disponible
         """
         # Vérifier que le produit existe et est disponible
-        product = await self.product_repo.get_by_id(item_data.product_id)
+        product = await self.product_repo.load(item_data.product_id)
         
         if not product:
             raise HTTPException(
@@ -148,8 +148,8 @@ class CartService:
                 detail="Cet article ne vous appartient pas"
             )
         
-        # Vérifier le stock
-        product = await self.product_repo.get_by_id(cart_item.product_id)
+        # Vérifier le stock (produit déjà chargé avec l'article)
+        product = await self.product_repo.load(cart_item.product_id)
         if product.stock < item_update.quantity:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -258,9 +258,13 @@ class CartService:
             errors.append("Le panier est vide")
             return False, errors
         
-        # Vérifier chaque article
+        # Vérifier chaque article (produits chargés en une seule fois)
+        products = await self.product_repo.get_many(
+            item.product_id for item in cart.items
+        )
+        
         for item in cart.items:
-            product = await self.product_repo.get_by_id(item.product_id)
+            product = products.get(item.product_id)
             
             if not product:
                 errors.append(f"Produit {item.product_id} non trouvé")
@@ -0,0 +1,433 @@
+"""
+Service d'import / export du catalogue
+Traitement par lots des fichiers CSV et NDJSON
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+from typing import IO, Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from slugify import slugify
+from sqlalchemy import select, insert, delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache
+from app.core.database import async_session_maker
+from app.models.category import Category
+from app.models.product import Product, product_categories
+from app.repositories.product import ProductRepository
+from app.schemas.product import ProductCreate, ProductImportError, ProductImportReport
+
+
+# Lignes validées et écrites par transaction
+IMPORT_BATCH_SIZE = 500
+
+# Produits lus par requête lors de l'export
+EXPORT_BATCH_SIZE = 1000
+
+# Nombre maximal d'erreurs détaillées dans le rapport
+MAX_REPORTED_ERRORS = 1000
+
+# Colonnes du format d'échange (import et export)
+CATALOG_FIELDS = [
+    "sku", "slug", "name", "description", "price",
+    "sale_price", "stock", "is_active", "category_ids"
+]
+
+# Colonnes qu'une cellule CSV vide remet à NULL (ailleurs : colonne non fournie)
+NULLABLE_FIELDS = {"description", "sale_price"}
+
+# Séparateur des IDs de catégories en CSV (ex: "3|12")
+CATEGORY_SEPARATOR = "|"
+
+CATALOG_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+ImportRow = Tuple[int, Optional[Dict[str, Any]]]
+
+
+# ===== Lecture des fichiers =====
+def resolve_format(filename: Optional[str], format: Optional[str]) -> str:
+    """
+    Détermine le format d'un fichier (paramètre explicite ou extension)
+    
+    Raises:
+        HTTPException: Si le format n'est pas supporté
+    """
+    if format is None and filename:
+        extension = filename.rsplit(".", 1)[-1].lower()
+        format = {"csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson"}.get(extension)
+    
+    if format not in CATALOG_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Format non supporté (csv ou ndjson)"
+        )
+    
+    return format
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[ImportRow]:
+    """
+    Lit un CSV ligne à ligne
+    
+    Une cellule vide vaut NULL pour les colonnes de NULLABLE_FIELDS ;
+    ailleurs, comme une colonne absente, elle laisse la valeur inchangée.
+    
+    Yields:
+        (Numéro de ligne, Données)
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    
+    for row in reader:
+        data = {}
+        for key, value in row.items():
+            if not key or value is None:
+                continue
+            if value != "":
+                data[key] = value
+            elif key in NULLABLE_FIELDS:
+                data[key] = None
+        
+        if "category_ids" in data:
+            data["category_ids"] = [
+                category_id for category_id in data["category_ids"].split(CATEGORY_SEPARATOR)
+                if category_id.strip()
+            ]
+        
+        yield reader.line_num, data
+
+
+def iter_ndjson_rows(stream: IO[bytes]) -> Iterator[ImportRow]:
+    """
+    Lit un fichier NDJSON ligne à ligne
+    
+    Yields:
+        (Numéro de ligne, Données ou None si ligne illisible)
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            data = None
+        
+        yield line_number, data if isinstance(data, dict) else None
+
+
+def iter_rows(stream: IO[bytes], format: str) -> Iterator[ImportRow]:
+    """Lit un fichier d'import selon son format"""
+    if format == "csv":
+        return iter_csv_rows(stream)
+    return iter_ndjson_rows(stream)
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Résume une erreur Pydantic sur une ligne"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+class CatalogService:
+    """Service d'import / export du catalogue produits"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.product_repo = ProductRepository(db)
+    
+    async def import_products(
+        self,
+        rows: Iterator[ImportRow],
+        batch_size: int = IMPORT_BATCH_SIZE
+    ) -> ProductImportReport:
+        """
+        Importe (crée ou met à jour) des produits par lots
+        
+        - Validation de chaque ligne avec ProductCreate
+        - Rapprochement par SKU, puis par slug (une requête par lot)
+        - Insertions et mises à jour groupées, liens catégories remplacés
+          quand la colonne category_ids est fournie
+        - Une mise à jour n'écrit que les colonnes présentes dans la ligne
+        - Chaque lot est commité séparément
+        - Lecture et décodage du fichier dans le pool de threads : la
+          boucle d'événements n'est pas bloquée par le parsing
+        
+        Args:
+            rows: Lignes (numéro, données) lues de façon incrémentale
+            batch_size: Nombre de lignes par lot
+        
+        Returns:
+            Rapport d'import
+        """
+        report = ProductImportReport()
+        
+        while True:
+            batch: List[ImportRow] = await run_in_threadpool(lambda: list(islice(rows, batch_size)))
+            if not batch:
+                break
+            
+            await self._import_batch(batch, report)
+        
+        return report
+    
+    async def _import_batch(self, batch: List[ImportRow], report: ProductImportReport) -> None:
+        """
+        Valide et écrit un lot de lignes
+        
+        Args:
+            batch: Lignes du lot
+            report: Rapport mis à jour
+        """
+        # Validation (la dernière occurrence d'un même produit l'emporte)
+        valid: Dict[str, Tuple[int, ProductCreate, bool, bool]] = {}
+        
+        for line, raw in batch:
+            if raw is None:
+                self._reject(report, line, "Ligne illisible")
+                continue
+            
+            try:
+                data = ProductCreate.model_validate(raw)
+            except ValidationError as e:
+                self._reject(report, line, _format_validation_error(e))
+                continue
+            
+            slug_given = bool(data.slug)
+            if not slug_given:
+                data.slug = slugify(data.name)
+            
+            valid[data.sku or data.slug] = (line, data, "category_ids" in raw, slug_given)
+        
+        if not valid:
+            return
+        
+        known_categories = await self._existing_category_ids(
+            category_id
+            for _, data, _, _ in valid.values()
+            for category_id in data.category_ids
+        )
+        
+        # Produits existants : une seule requête pour tous les SKU et slugs
+        skus = [data.sku for _, data, _, _ in valid.values() if data.sku]
+        slugs = [data.slug for _, data, _, _ in valid.values()]
+        
+        result = await self.db.execute(
+            select(Product.id, Product.slug, Product.sku)
+            .where(or_(Product.sku.in_(skus), Product.slug.in_(slugs)))
+        )
+        existing_rows = result.all()
+        by_sku = {row.sku: row for row in existing_rows if row.sku}
+        by_slug = {row.slug: row for row in existing_rows}
+        
+        inserts: List[dict] = []
+        updates: List[dict] = []
+        links: Dict[str, List[int]] = {}
+        claimed_slugs = set()
+        
+        for line, data, has_categories, slug_given in valid.values():
+            unknown = [c for c in data.category_ids if c not in known_categories]
+            if unknown:
+                self._reject(
+                    report,
+                    line,
+                    f"Catégories inconnues : {', '.join(str(c) for c in unknown)}"
+                )
+                continue
+            
+            existing = by_sku.get(data.sku) if data.sku else None
+            if existing is not None and not slug_given:
+                # Slug absent de la ligne : celui du produit est conservé
+                data.slug = existing.slug
+            slug_owner = by_slug.get(data.slug)
+            
+            if existing is None and slug_owner is not None:
+                if data.sku and slug_owner.sku and slug_owner.sku != data.sku:
+                    self._reject(report, line, f"Slug déjà utilisé par le SKU {slug_owner.sku}")
+                    continue
+                existing = slug_owner
+            elif existing is not None and slug_owner is not None and slug_owner.id != existing.id:
+                self._reject(report, line, "Slug déjà utilisé par un autre produit")
+                continue
+            
+            if data.slug in claimed_slugs:
+                self._reject(report, line, "Slug en double dans le fichier")
+                continue
+            claimed_slugs.add(data.slug)
+            
+            if existing is not None:
+                # Seules les colonnes fournies sont écrites (None explicite = NULL)
+                fields = data.model_dump(exclude={"category_ids"}, exclude_unset=True)
+                updates.append({"id": existing.id, **fields})
+            else:
+                inserts.append(data.model_dump(exclude={"category_ids"}))
+            
+            if has_categories:
+                links[data.slug] = data.category_ids
+        
+        if inserts:
+            await self.product_repo.bulk_create(inserts, hydrate=False)
+            self.product_repo.invalidate_cache()
+        
+        if updates:
+            await self.product_repo.bulk_update(updates, skip_none=False)
+        
+        if links:
+            await self._replace_category_links(links)
+        
+        report.created += len(inserts)
+        report.updated += len(updates)
+        
+        await self.db.commit()
+        await cache.flush_pending(self.db)
+    
+    async def _existing_category_ids(self, category_ids) -> set:
+        """Retourne les IDs de catégories existants parmi ceux demandés"""
+        requested = set(category_ids)
+        if not requested:
+            return set()
+        
+        result = await self.db.execute(
+            select(Category.id).where(Category.id.in_(requested))
+        )
+        return set(result.scalars().all())
+    
+    async def _replace_category_links(self, links: Dict[str, List[int]]) -> None:
+        """
+        Remplace les liens produit-catégorie d'un lot
+        
+        Args:
+            links: IDs de catégories par slug de produit
+        """
+        result = await self.db.execute(
+            select(Product.id, Product.slug).where(Product.slug.in_(list(links)))
+        )
+        product_ids = {row.slug: row.id for row in result.all()}
+        
+        await self.db.execute(
+            delete(product_categories)
+            .where(product_categories.c.product_id.in_(list(product_ids.values())))
+        )
+        
+        pairs = [
+            {"product_id": product_ids[slug], "category_id": category_id}
+            for slug, category_ids in links.items()
+            if slug in product_ids
+            for category_id in set(category_ids)
+        ]
+        
+        if pairs:
+            await self.db.execute(insert(product_categories), pairs)
+    
+    @staticmethod
+    def _reject(report: ProductImportReport, line: int, message: str) -> None:
+        """Enregistre une ligne rejetée"""
+        report.failed += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(ProductImportError(line=line, message=message))
+    
+    @staticmethod
+    async def export_products(
+        format: str,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[str]:
+        """
+        Exporte le catalogue en flux, par lots parcourus par ID
+        
+        Utilise sa propre session : le flux est consommé après la fin
+        de la requête qui l'a créé.
+        
+        Args:
+            format: csv ou ndjson
+            batch_size: Produits lus par requête
+        
+        Yields:
+            Morceaux du fichier
+        """
+        async with async_session_maker() as session:
+            if format == "csv":
+                yield ",".join(CATALOG_FIELDS) + "\r\n"
+            
+            last_id = 0
+            
+            while True:
+                result = await session.execute(
+                    select(
+                        Product.id,
+                        Product.sku,
+                        Product.slug,
+                        Product.name,
+                        Product.description,
+                        Product.price,
+                        Product.sale_price,
+                        Product.stock,
+                        Product.is_active
+                    )
+                    .where(Product.id > last_id)
+                    .order_by(Product.id)
+                    .limit(batch_size)
+                )
+                rows = result.all()
+                
+                if not rows:
+                    break
+                
+                last_id = rows[-1].id
+                
+                links = await session.execute(
+                    select(product_categories.c.product_id, product_categories.c.category_id)
+                    .where(product_categories.c.product_id.in_([row.id for row in rows]))
+                    .order_by(product_categories.c.product_id, product_categories.c.category_id)
+                )
+                categories: Dict[int, List[int]] = {}
+                for product_id, category_id in links.all():
+                    categories.setdefault(product_id, []).append(category_id)
+                
+                yield _format_export_batch(rows, categories, format)
+
+
+def _format_export_batch(rows, categories: Dict[int, List[int]], format: str) -> str:
+    """Sérialise un lot de produits en CSV ou NDJSON"""
+    buffer = io.StringIO()
+    
+    if format == "csv":
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                row.sku or "",
+                row.slug,
+                row.name,
+                row.description or "",
+                str(row.price),
+                "" if row.sale_price is None else str(row.sale_price),
+                row.stock,
+                "true" if row.is_active else "false",
+                CATEGORY_SEPARATOR.join(str(c) for c in categories.get(row.id, [])),
+            ])
+    else:
+        for row in rows:
+            buffer.write(json.dumps({
+                "sku": row.sku,
+                "slug": row.slug,
+                "name": row.name,
+                "description": row.description,
+                "price": str(row.price),
+                "sale_price": None if row.sale_price is None else str(row.sale_price),
+                "stock": row.stock,
+                "is_active": row.is_active,
+                "category_ids": categories.get(row.id, []),
+            }, ensure_ascii=False))
+            buffer.write("\n")
+    
+    return buffer.getvalue()
@@ -11,6 +11,7 @@ from decimal import Decimal
 
 from app.models.coupon import Coupon
 from app.repositories.coupon import CouponRepository
+from app.services.coupon_index import coupon_index, CouponRule
 from app.schemas.coupon import CouponCreate, CouponUpdate, CouponValidateRequest
 
 
@@ -149,10 +150,12 @@ class CouponService:
         self,
         code: str,
         order_amount: Decimal
-    ) -> tuple[bool, Optional[Coupon], Optional[str], Decimal, Decimal]:
+    ) -> tuple[bool, Optional[CouponRule], Optional[str], Decimal, Decimal]:
         """
         Valide un coupon pour un montant de commande
         
+        Servi par l'index des coupons en mémoire (aucune requête SQL)
+        
         Args:
             code: Code promo
             order_amount: Montant de la commande
@@ -161,7 +164,7 @@ class CouponService:
             (is_valid, coupon, error_message, discount_amount, final_amount)
         """
         # Valider le code
-        is_valid, coupon, error = await self.coupon_repo.validate_code(code)
+        is_valid, coupon, error = await coupon_index.validate(code)
         
         if not is_valid:
             return False, coupon, error, Decimal("0"), order_amount
@@ -175,7 +178,7 @@ class CouponService:
             return False, coupon, error_msg, Decimal("0"), order_amount
         
         # Calculer la réduction
-        discount_amount = Decimal(str(coupon.calculate_discount(float(order_amount))))
+        discount_amount = coupon.calculate_discount(order_amount)
         final_amount = order_amount - discount_amount
         
         return True, coupon, None, discount_amount, final_amount
@@ -264,19 +267,14 @@ class CouponService:
         """
         coupon = await self.get_coupon_by_id(coupon_id)
         
-        usage_count = await self.coupon_repo.get_usage_count(coupon_id)
-        
-        # Calculer le total des réductions données
-        total_discount = Decimal("0")
-        if coupon.orders:
-            for order in coupon.orders:
-                discount = Decimal(str(coupon.calculate_discount(float(order.total_amount))))
-                total_discount += discount
+        # COUNT/SUM sur order_coupons x orders (réductions persistées par commande)
+        usage_count, total_discount, average_amount = await self.coupon_repo.get_usage_stats(coupon_id)
         
         return {
             "coupon_code": coupon.code,
             "usage_count": usage_count,
             "total_discount_given": float(total_discount),
+            "average_order_amount": float(average_amount),
             "is_active": coupon.is_active,
             "is_valid": coupon.is_valid
         }
@@ -288,13 +286,13 @@ class CouponService:
         Returns:
             Dictionnaire de statistiques
         """
-        total = await self.coupon_repo.count()
-        active = await self.coupon_repo.count_active()
-        valid = await self.coupon_repo.count_valid()
+        total, active, valid, total_uses, total_discount = await self.coupon_repo.get_global_stats()
         
         return {
             "total_coupons": total,
             "active": active,
             "valid": valid,
-            "inactive": total - active
+            "inactive": total - active,
+            "total_uses": total_uses,
+            "total_discount_given": float(total_discount)
         }
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Index des coupons en mémoire
+Validation des codes promo sans accès à la base (panier, checkout, ventes flash)
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.coupon import Coupon, compile_discount
+from app.repositories.coupon import CouponRepository, COUPON_CACHE_NAMESPACE
+
+
+logger = logging.getLogger(__name__)
+
+# Intervalle minimal entre deux lectures de la version partagée (secondes)
+VERSION_CHECK_INTERVAL = 1.0
+
+
+class CouponRule:
+    """
+    Coupon compilé
+    
+    Valeurs converties en Decimal et fonction de réduction précalculées
+    au chargement. Expose les attributs de Coupon utilisés par les appelants.
+    """
+    
+    __slots__ = (
+        "id",
+        "code",
+        "discount_type",
+        "discount_value",
+        "min_order_amount",
+        "expires_at",
+        "is_active",
+        "_discount"
+    )
+    
+    def __init__(self, coupon: Coupon):
+        self.id = coupon.id
+        self.code = coupon.code
+        self.discount_type = coupon.discount_type
+        self.discount_value = Decimal(coupon.discount_value)
+        self.min_order_amount = Decimal(coupon.min_order_amount) if coupon.min_order_amount else None
+        self.expires_at = coupon.expires_at
+        self.is_active = coupon.is_active
+        self._discount = compile_discount(
+            self.discount_type,
+            self.discount_value,
+            self.min_order_amount
+        )
+    
+    def check(self, now: datetime) -> Optional[str]:
+        """
+        Vérifie que le coupon est utilisable
+        
+        Args:
+            now: Date courante (UTC)
+        
+        Returns:
+            Message d'erreur, ou None si le coupon est valide
+        """
+        if not self.is_active:
+            return "Ce code promo n'est plus actif"
+        
+        if self.expires_at is not None and self.expires_at < now:
+            return "Ce code promo a expiré"
+        
+        return None
+    
+    def calculate_discount(self, order_amount: Decimal) -> Decimal:
+        """
+        Calcule la réduction pour un montant (Decimal exact, arrondi au centime)
+        
+        Args:
+            order_amount: Montant de la commande
+        
+        Returns:
+            Montant de la réduction (0 sous le minimum de commande)
+        """
+        return self._discount(order_amount)
+    
+    def __repr__(self) -> str:
+        return f"<CouponRule(id={self.id}, code='{self.code}')>"
+
+
+class CouponIndex:
+    """
+    Index des coupons par code (majuscules)
+    
+    - Chargé au démarrage, rechargé à l'expiration du TTL
+    - Rechargé dès qu'un coupon est modifié : les écritures incrémentent la
+      version de l'espace de noms "coupons" du cache, lue au plus une fois
+      par seconde (partagée entre workers avec Redis)
+    - Une erreur de rechargement conserve l'index précédent
+    """
+    
+    def __init__(
+        self,
+        ttl: int,
+        session_maker: async_sessionmaker = async_session_maker
+    ):
+        self.ttl = ttl
+        self.session_maker = session_maker
+        self._rules: Dict[str, CouponRule] = {}
+        self._version: Optional[str] = None
+        self._loaded_at: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def load(self) -> int:
+        """
+        Charge (ou recharge) tous les coupons
+        
+        Returns:
+            Nombre de coupons indexés
+        """
+        # Version lue avant la base : une écriture concurrente déclenchera
+        # un nouveau rechargement
+        version = await cache.namespace(COUPON_CACHE_NAMESPACE)
+        
+        async with self.session_maker() as session:
+            coupons = await CouponRepository(session).get_all_for_index()
+            rules = {coupon.code.upper(): CouponRule(coupon) for coupon in coupons}
+        
+        self._rules = rules
+        self._version = version
+        self._loaded_at = self._checked_at = time.monotonic()
+        return len(rules)
+    
+    async def _ensure_fresh(self) -> None:
+        """Recharge l'index si le TTL est écoulé ou si un coupon a changé"""
+        now = time.monotonic()
+        
+        if self._loaded_at is not None:
+            if now - self._checked_at < VERSION_CHECK_INTERVAL:
+                return
+            self._checked_at = now
+            
+            if now - self._loaded_at < self.ttl and await cache.namespace(COUPON_CACHE_NAMESPACE) == self._version:
+                return
+        
+        async with self._lock:
+            # Rechargé par une autre requête pendant l'attente du verrou
+            if self._loaded_at is not None and self._loaded_at >= now:
+                return
+            
+            try:
+                await self.load()
+            except Exception:
+                if self._loaded_at is None:
+                    raise
+                logger.warning("Rechargement de l'index des coupons impossible", exc_info=True)
+    
+    def invalidate(self) -> None:
+        """Force le rechargement à la prochaine lecture (tests, admin)"""
+        self._version = None
+        self._checked_at = 0.0
+    
+    async def get(self, code: str) -> Optional[CouponRule]:
+        """
+        Retourne le coupon compilé d'un code
+        
+        Args:
+            code: Code promo (casse indifférente)
+        
+        Returns:
+            Coupon compilé ou None
+        """
+        await self._ensure_fresh()
+        return self._rules.get(code.strip().upper())
+    
+    async def validate(self, code: str) -> Tuple[bool, Optional[CouponRule], Optional[str]]:
+        """
+        Valide un code promo (actif, non expiré)
+        
+        Args:
+            code: Code à valider
+        
+        Returns:
+            (is_valid, coupon, error_message)
+        """
+        rule = await self.get(code)
+        
+        if rule is None:
+            return False, None, "Code promo invalide"
+        
+        error = rule.check(datetime.utcnow())
+        return error is None, rule, error
+
+
+# Instance globale de l'index des coupons
+coupon_index = CouponIndex(settings.COUPON_INDEX_TTL)
@@ -4,28 +4,71 @@ Service d'envoi d'emails
 Gestion des notifications par email
 """
 
-import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional, List
-from jinja2 import Template
+from typing import Any, Optional, List, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.templates import email_templates
 from app.models.user import User
-from app.models.order import Order
+from app.models.order import Order, OrderStatus
+from app.models.email_outbox import EmailOutbox
+from app.repositories.email_outbox import EmailOutboxRepository
+
+
+# Notifications de changement de statut : (template, sujet)
+ORDER_STATUS_EMAILS = {
+    OrderStatus.SHIPPED: ("order_shipped", "Votre commande #{order_id} a été expédiée"),
+    OrderStatus.DELIVERED: ("order_delivered", "Votre commande #{order_id} a été livrée"),
+    OrderStatus.CANCELLED: ("order_cancelled", "Votre commande #{order_id} a été annulée"),
+}
+
+
+def build_message(
+    to_email: str,
+    subject: str,
+    html_content: str,
+    text_content: Optional[str] = None
+) -> MIMEMultipart:
+    """
+    Construit le message MIME d'un email
+    
+    Args:
+        to_email: Email destinataire
+        subject: Sujet
+        html_content: Contenu HTML
+        text_content: Contenu texte (optionnel)
+    
+    Returns:
+        Message prêt à envoyer
+    """
+    message = MIMEMultipart("alternative")
+    message["Subject"] = subject
+    message["From"] = f"{settings.MAIL_FROM_NAME} <{settings.MAIL_FROM}>"
+    message["To"] = to_email
+    
+    # Ajouter le contenu texte si fourni
+    if text_content:
+        message.attach(MIMEText(text_content, "plain"))
+    
+    # Ajouter le contenu HTML
+    message.attach(MIMEText(html_content, "html"))
+    
+    return message
 
 
 class EmailService:
-    """Service d'envoi d'emails"""
+    """
+    Service d'envoi d'emails
+    
+    Les emails sont mis en file (table email_outbox) dans la transaction
+    de la requête ; l'envoi SMTP est fait par le dispatcher d'emails.
+    """
     
-    def __init__(self):
-        self.smtp_host = settings.MAIL_SERVER
-        self.smtp_port = settings.MAIL_PORT
-        self.smtp_username = settings.MAIL_USERNAME
-        self.smtp_password = settings.MAIL_PASSWORD
-        self.from_email = settings.MAIL_FROM
-        self.from_name = settings.MAIL_FROM_NAME
-        self.use_tls = settings.MAIL_TLS
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.outbox_repo = EmailOutboxRepository(db)
     
     async def send_email(
         self,
@@ -33,9 +76,9 @@ class EmailService:
         subject: str,
         html_content: str,
         text_content: Optional[str] = None
-    ) -> bool:
+    ) -> EmailOutbox:
         """
-        Envoie un email
+        Met un email en file d'envoi
         
         Args:
             to_email: Email destinataire
@@ -44,41 +87,11 @@ class EmailService:
             text_content: Contenu texte (optionnel)
         
         Returns:
-            True si envoyé avec succès
+            Email en file
         """
-        try:
-            # Créer le message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = f"{self.from_name} <{self.from_email}>"
-            message["To"] = to_email
-            
-            # Ajouter le contenu texte si fourni
-            if text_content:
-                part_text = MIMEText(text_content, "plain")
-                message.attach(part_text)
-            
-            # Ajouter le contenu HTML
-            part_html = MIMEText(html_content, "html")
-            message.attach(part_html)
-            
-            # Envoyer l'email
-            await aiosmtplib.send(
-                message,
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                username=self.smtp_username,
-                password=self.smtp_password,
-                use_tls=self.use_tls
-            )
-            
-            return True
-        
-        except Exception as e:
-            print(f"Erreur lors de l'envoi de l'email: {e}")
-            return False
+        return await self.outbox_repo.enqueue(to_email, subject, html_content, text_content)
     
-    async def send_welcome_email(self, user: User) -> bool:
+    async def send_welcome_email(self, user: User) -> EmailOutbox:
         """
         Envoie un email de bienvenue
         
@@ -86,22 +99,11 @@ class EmailService:
             user: Utilisateur
         
         Returns:
-            True si envoyé
+            Email en file
         """
         subject = f"Bienvenue sur {settings.APP_NAME} !"
         
-        html_content = f"""
-        <html>
-            <body>
-                <h1>Bienvenue {user.first_name} !</h1>
-                <p>Merci de vous être inscrit sur {settings.APP_NAME}.</p>
-                <p>Nous sommes ravis de vous compter parmi nous.</p>
-                <br>
-                <p>Cordialement,</p>
-                <p>L'équipe {settings.APP_NAME}</p>
-            </body>
-        </html>
-        """
+        html_content = email_templates.render("welcome", user=user)
         
         return await self.send_email(user.email, subject, html_content)
     
@@ -109,7 +111,7 @@ class EmailService:
         self,
         user: User,
         verification_token: str
-    ) -> bool:
+    ) -> EmailOutbox:
         """
         Envoie un email de vérification
         
@@ -118,29 +120,11 @@ class EmailService:
             verification_token: Token de vérification
         
         Returns:
-            True si envoyé
+            Email en file
         """
-        verification_url = f"{settings.FRONTEND_URL}/verify-email?token={verification_token}"
-        
         subject = "Vérifiez votre email"
         
-        html_content = f"""
-        <html>
-            <body>
-                <h1>Vérification de votre email</h1>
-                <p>Bonjour {user.first_name},</p>
-                <p>Merci de vous être inscrit sur {settings.APP_NAME}.</p>
-                <p>Pour activer votre compte, veuillez cliquer sur le lien ci-dessous :</p>
-                <p><a href="{verification_url}">Vérifier mon email</a></p>
-                <p>Ce lien est valide pendant 24 heures.</p>
-                <br>
-                <p>Si vous n'avez pas créé de compte, ignorez cet email.</p>
-                <br>
-                <p>Cordialement,</p>
-                <p>L'équipe {settings.APP_NAME}</p>
-            </body>
-        </html>
-        """
+        html_content = email_templates.render("email_verification", user=user, token=verification_token)
         
         return await self.send_email(user.email, subject, html_content)
     
@@ -148,7 +132,7 @@ class EmailService:
         self,
         user: User,
         reset_token: str
-    ) -> bool:
+    ) -> EmailOutbox:
         """
         Envoie un email de réinitialisation de mot de passe
         
@@ -157,29 +141,11 @@ class EmailService:
             reset_token: Token de réinitialisation
         
         Returns:
-            True si envoyé
+            Email en file
         """
-        reset_url = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
-        
         subject = "Réinitialisation de votre mot de passe"
         
-        html_content = f"""
-        <html>
-            <body>
-                <h1>Réinitialisation de mot de passe</h1>
-                <p>Bonjour {user.first_name},</p>
-                <p>Vous avez demandé à réinitialiser votre mot de passe.</p>
-                <p>Cliquez sur le lien ci-dessous pour créer un nouveau mot de passe :</p>
-                <p><a href="{reset_url}">Réinitialiser mon mot de passe</a></p>
-                <p>Ce lien est valide pendant 1 heure.</p>
-                <br>
-                <p>Si vous n'avez pas demandé cette réinitialisation, ignorez cet email.</p>
-                <br>
-                <p>Cordialement,</p>
-                <p>L'équipe {settings.APP_NAME}</p>
-            </body>
-        </html>
-        """
+        html_content = email_templates.render("password_reset", user=user, token=reset_token)
         
         return await self.send_email(user.email, subject, html_content)
     
@@ -187,7 +153,7 @@ class EmailService:
         self,
         user: User,
         order: Order
-    ) -> bool:
+    ) -> EmailOutbox:
         """
         Envoie une confirmation de commande
         
@@ -196,56 +162,11 @@ class EmailService:
             order: Commande
         
         Returns:
-            True si envoyé
+            Email en file
         """
         subject = f"Confirmation de commande #{order.id}"
         
-        # Créer la liste des articles
-        items_html = ""
-        for item in order.items:
-            items_html += f"""
-                <tr>
-                    <td>{item.product.name}</td>
-                    <td>{item.quantity}</td>
-                    <td>{item.unit_price}€</td>
-                    <td>{item.subtotal}€</td>
-                </tr>
-            """
-        
-        html_content = f"""
-        <html>
-            <body>
-                <h1>Confirmation de commande</h1>
-                <p>Bonjour {user.first_name},</p>
-                <p>Merci pour votre commande !</p>
-                <br>
-                <h2>Commande #{order.id}</h2>
-                <p>Date: {order.created_at.strftime('%d/%m/%Y %H:%M')}</p>
-                <br>
-                <h3>Articles commandés :</h3>
-                <table border="1" cellpadding="10">
-                    <thead>
-                        <tr>
-                            <th>Produit</th>
-                            <th>Quantité</th>
-                            <th>Prix unitaire</th>
-                            <th>Sous-total</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {items_html}
-                    </tbody>
-                </table>
-                <br>
-                <h3>Total: {order.total_amount}€</h3>
-                <br>
-                <p>Nous vous tiendrons informé de l'avancement de votre commande.</p>
-                <br>
-                <p>Cordialement,</p>
-                <p>L'équipe {settings.APP_NAME}</p>
-            </body>
-        </html>
-        """
+        html_content = email_templates.render("order_confirmation", user=user, order=order)
         
         return await self.send_email(user.email, subject, html_content)
     
@@ -254,7 +175,7 @@ class EmailService:
         user: User,
         order: Order,
         tracking_number: Optional[str] = None
-    ) -> bool:
+    ) -> EmailOutbox:
         """
         Envoie une notification d'expédition
         
@@ -264,28 +185,16 @@ class EmailService:
             tracking_number: Numéro de suivi (optionnel)
         
         Returns:
-            True si envoyé
+            Email en file
         """
         subject = f"Votre commande #{order.id} a été expédiée"
         
-        tracking_info = ""
-        if tracking_number:
-            tracking_info = f"<p>Numéro de suivi: <strong>{tracking_number}</strong></p>"
-        
-        html_content = f"""
-        <html>
-            <body>
-                <h1>Commande expédiée !</h1>
-                <p>Bonjour {user.first_name},</p>
-                <p>Bonne nouvelle ! Votre commande #{order.id} a été expédiée.</p>
-                {tracking_info}
-                <p>Vous devriez la recevoir dans les prochains jours.</p>
-                <br>
-                <p>Cordialement,</p>
-                <p>L'équipe {settings.APP_NAME}</p>
-            </body>
-        </html>
-        """
+        html_content = email_templates.render(
+            "order_shipped",
+            user=user,
+            order=order,
+            tracking_number=tracking_number
+        )
         
         return await self.send_email(user.email, subject, html_content)
     
@@ -293,7 +202,7 @@ class EmailService:
         self,
         user: User,
         order: Order
-    ) -> bool:
+    ) -> EmailOutbox:
         """
         Envoie une notification de livraison
         
@@ -302,24 +211,11 @@ class EmailService:
             order: Commande
         
         Returns:
-            True si envoyé
+            Email en file
         """
         subject = f"Votre commande #{order.id} a été livrée"
         
-        html_content = f"""
-        <html>
-            <body>
-                <h1>Commande livrée !</h1>
-                <p>Bonjour {user.first_name},</p>
-                <p>Votre commande #{order.id} a été livrée avec succès.</p>
-                <p>Nous espérons que vous êtes satisfait de votre achat.</p>
-                <p>N'hésitez pas à laisser un avis sur les produits commandés.</p>
-                <br>
-                <p>Cordialement,</p>
-                <p>L'équipe {settings.APP_NAME}</p>
-            </body>
-        </html>
-        """
+        html_content = email_templates.render("order_delivered", user=user, order=order)
         
         return await self.send_email(user.email, subject, html_content)
     
@@ -328,7 +224,7 @@ class EmailService:
         user: User,
         order: Order,
         reason: Optional[str] = None
-    ) -> bool:
+    ) -> EmailOutbox:
         """
         Envoie une notification d'annulation
         
@@ -338,27 +234,46 @@ class EmailService:
             reason: Raison de l'annulation (optionnel)
         
         Returns:
-            True si envoyé
+            Email en file
         """
         subject = f"Votre commande #{order.id} a été annulée"
         
-        reason_text = ""
-        if reason:
-            reason_text = f"<p>Raison: {reason}</p>"
-        
-        html_content = f"""
-        <html>
-            <body>
-                <h1>Commande annulée</h1>
-                <p>Bonjour {user.first_name},</p>
-                <p>Votre commande #{order.id} a été annulée.</p>
-                {reason_text}
-                <p>Si vous avez des questions, n'hésitez pas à nous contacter.</p>
-                <br>
-                <p>Cordialement,</p>
-                <p>L'équipe {settings.APP_NAME}</p>
-            </body>
-        </html>
+        html_content = email_templates.render("order_cancelled", user=user, order=order, reason=reason)
+        
+        return await self.send_email(user.email, subject, html_content)
+    
+    async def send_order_status_notifications(
+        self,
+        status: OrderStatus,
+        recipients: Sequence[Tuple[Any, Any]]
+    ) -> int:
         """
+        Met en file les notifications d'un changement de statut groupé
+        Un seul INSERT multi-lignes pour toutes les commandes
+        
+        Args:
+            status: Nouveau statut des commandes
+            recipients: Couples (utilisateur, commande) ; seuls les attributs
+                email, first_name et id sont utilisés
+        
+        Returns:
+            Nombre d'emails mis en file (0 si le statut n'a pas de notification)
+        """
+        if status not in ORDER_STATUS_EMAILS or not recipients:
+            return 0
+        
+        template = email_templates.get(ORDER_STATUS_EMAILS[status][0])
+        subject = ORDER_STATUS_EMAILS[status][1]
+        
+        messages = [
+            {
+                "to_email": user.email,
+                "subject": subject.format(order_id=order.id),
+                "html_content": "".join(template.generate(user=user, order=order)),
+            }
+            for user, order in recipients
+        ]
+        
+        await self.outbox_repo.enqueue_many(messages)
         
-        return await self.send_email(user.email, subject, html_content)
\ No newline at end of file
+        return len(messages)
@@ -0,0 +1,307 @@
+"""
+Dispatcher d'emails
+Envoie en arrière-plan les emails de la table email_outbox
+via un pool de connexions SMTP authentifiées
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from typing import Dict, List, Optional, Tuple
+
+import aiosmtplib
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.repositories.email_outbox import EmailOutboxRepository
+from app.services.email import build_message
+
+
+logger = logging.getLogger(__name__)
+
+# Délai avant qu'un envoi interrompu (crash du dispatcher) soit repris
+SENDING_LEASE = timedelta(minutes=5)
+
+# Backoff exponentiel entre deux tentatives
+RETRY_BASE_DELAY = 30  # secondes
+RETRY_MAX_DELAY = 3600  # secondes
+
+OutgoingMessage = Tuple[int, MIMEMultipart]
+
+
+class SMTPConnectionPool:
+    """
+    Pool de connexions SMTP (TCP + STARTTLS + AUTH faits une seule fois)
+    
+    - Au plus `size` connexions ouvertes simultanément
+    - Une connexion inactive est vérifiée (NOOP) avant réutilisation
+    - Une connexion en erreur est fermée et remplacée au lot suivant
+    """
+    
+    def __init__(
+        self,
+        size: int,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = False,
+        start_tls: Optional[bool] = None,
+        timeout: float = 30
+    ):
+        self.size = size
+        self.hostname = hostname
+        self.port = port
+        self.username = username or None
+        self.password = password or None
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[aiosmtplib.SMTP] = []
+    
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout
+        )
+        await client.connect()
+        return client
+    
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        """Réutilise une connexion inactive encore valide, sinon en ouvre une"""
+        while self._idle:
+            client = self._idle.pop()
+            if not client.is_connected:
+                continue
+            try:
+                await client.noop()
+                return client
+            except aiosmtplib.SMTPException:
+                await self._discard(client)
+        
+        return await self._connect()
+    
+    @staticmethod
+    async def _discard(client: aiosmtplib.SMTP) -> None:
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+    
+    async def send_batch(self, messages: List[OutgoingMessage]) -> Dict[int, Optional[str]]:
+        """
+        Envoie un lot de messages sur une seule connexion
+        
+        Args:
+            messages: (ID outbox, message MIME)
+        
+        Returns:
+            Erreur par ID (None si envoyé)
+        """
+        results: Dict[int, Optional[str]] = {}
+        
+        async with self._slots:
+            client: Optional[aiosmtplib.SMTP] = None
+            try:
+                client = await self._acquire()
+                
+                for message_id, message in messages:
+                    try:
+                        await client.send_message(message)
+                        results[message_id] = None
+                    except (aiosmtplib.SMTPRecipientsRefused, aiosmtplib.SMTPResponseException) as e:
+                        # Refus propre à ce message : la connexion reste utilisable
+                        results[message_id] = str(e)
+            except Exception as e:
+                # Connexion perdue : les messages restants du lot échouent
+                if client is not None:
+                    client.close()
+                    client = None
+                for message_id, _ in messages:
+                    results.setdefault(message_id, str(e) or e.__class__.__name__)
+            finally:
+                if client is not None:
+                    self._idle.append(client)
+        
+        return results
+    
+    async def close(self) -> None:
+        """Ferme les connexions inactives"""
+        while self._idle:
+            await self._discard(self._idle.pop())
+
+
+class EmailDispatcher:
+    """
+    Envoie les emails en file par lots
+    
+    - Réserve un lot (SKIP LOCKED, plusieurs dispatchers possibles)
+    - Répartit le lot entre les connexions du pool
+    - Succès marqués "sent", échecs replanifiés avec backoff exponentiel
+      puis marqués "failed" après EMAIL_MAX_ATTEMPTS tentatives
+    """
+    
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        batch_size: int = settings.EMAIL_BATCH_SIZE,
+        max_attempts: int = settings.EMAIL_MAX_ATTEMPTS,
+        poll_interval: float = settings.EMAIL_POLL_INTERVAL,
+        session_maker=async_session_maker
+    ):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.session_maker = session_maker
+        self.sent = 0
+        self.failed = 0
+        self._task: Optional[asyncio.Task] = None
+    
+    @staticmethod
+    def retry_delay(attempts: int) -> timedelta:
+        """Délai avant la tentative suivante (30s, 60s, 120s... plafonné à 1h)"""
+        return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY))
+    
+    async def dispatch_once(self) -> int:
+        """
+        Envoie un lot d'emails
+        
+        Returns:
+            Nombre d'emails traités
+        """
+        # Réservation courte : les verrous sont relâchés avant les envois SMTP
+        async with self.session_maker() as session:
+            messages = await EmailOutboxRepository(session).claim_batch(
+                self.batch_size,
+                SENDING_LEASE
+            )
+            outgoing = [
+                (
+                    message.id,
+                    message.attempts + 1,
+                    build_message(
+                        message.to_email,
+                        message.subject,
+                        message.html_content,
+                        message.text_content
+                    )
+                )
+                for message in messages
+            ]
+            await session.commit()
+        
+        if not outgoing:
+            return 0
+        
+        attempts = {message_id: attempt for message_id, attempt, _ in outgoing}
+        
+        # Un sous-lot par connexion du pool
+        chunk_count = max(1, min(self.pool.size, len(outgoing)))
+        chunks = [
+            [(message_id, message) for message_id, _, message in outgoing[i::chunk_count]]
+            for i in range(chunk_count)
+        ]
+        results: Dict[int, Optional[str]] = {}
+        for chunk_results in await asyncio.gather(*(self.pool.send_batch(chunk) for chunk in chunks)):
+            results.update(chunk_results)
+        
+        async with self.session_maker() as session:
+            repo = EmailOutboxRepository(session)
+            
+            await repo.mark_sent(
+                message_id for message_id, error in results.items() if error is None
+            )
+            
+            now = datetime.utcnow()
+            for message_id, error in results.items():
+                if error is None:
+                    continue
+                
+                attempt = attempts[message_id]
+                retry_at = None
+                if attempt < self.max_attempts:
+                    retry_at = now + self.retry_delay(attempt)
+                else:
+                    logger.error("Email %s abandonné après %s tentatives: %s", message_id, attempt, error)
+                
+                await repo.mark_failed(message_id, error, retry_at)
+            
+            await session.commit()
+        
+        failures = sum(1 for error in results.values() if error is not None)
+        self.sent += len(results) - failures
+        self.failed += failures
+        
+        return len(results)
+    
+    async def run_forever(self) -> None:
+        """Boucle d'envoi ; attend poll_interval quand la file est vide"""
+        while True:
+            try:
+                processed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erreur du dispatcher d'emails")
+                processed = 0
+            
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+    
+    def start(self) -> None:
+        """Démarre la boucle d'envoi en tâche de fond"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+    
+    async def stop(self) -> None:
+        """Arrête la boucle d'envoi et ferme les connexions SMTP"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        await self.pool.close()
+    
+    async def queue_depth(self) -> int:
+        """Nombre d'emails en attente ou en cours d'envoi"""
+        async with self.session_maker() as session:
+            return await EmailOutboxRepository(session).count_pending()
+    
+    async def stats(self) -> Dict[str, int]:
+        """Profondeur de la file et compteurs du processus"""
+        return {
+            "queue_depth": await self.queue_depth(),
+            "sent": self.sent,
+            "failed": self.failed,
+        }
+
+
+def create_email_dispatcher() -> EmailDispatcher:
+    """
+    Crée le dispatcher selon la configuration SMTP
+    """
+    pool = SMTPConnectionPool(
+        size=settings.SMTP_POOL_SIZE,
+        hostname=settings.MAIL_SERVER,
+        port=settings.MAIL_PORT,
+        username=settings.MAIL_USERNAME,
+        password=settings.MAIL_PASSWORD,
+        use_tls=settings.MAIL_SSL,
+        start_tls=settings.MAIL_TLS
+    )
+    return EmailDispatcher(pool)
+
+
+# Instance globale du dispatcher
+email_dispatcher: EmailDispatcher = create_email_dispatcher()
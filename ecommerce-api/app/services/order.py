@@ -4,17 +4,32 @@ Service de gestion des commandes
 Création et gestion des commandes
 """
 
-from typing import Optional, List, Tuple
+from typing import Any, Dict, Optional, List, Tuple
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
+from datetime import date
 
-from app.models.order import Order, OrderStatus
+from app.core.metrics import STOCK_RESERVATION_DURATION
+from app.models.order import Order, OrderStatus, ORDER_STATUS_TRANSITIONS
 from app.repositories.order import OrderRepository, OrderItemRepository
 from app.repositories.cart import CartRepository, CartItemRepository
 from app.repositories.product import ProductRepository
 from app.repositories.coupon import CouponRepository
-from app.schemas.order import OrderCreate, OrderFromCart
+from app.services.coupon_index import coupon_index
+from app.repositories.user import UserRepository
+from app.repositories.statistics import StatisticsRepository, ORDER_REVENUE_STATUSES
+from app.schemas.order import (
+    OrderCreate,
+    OrderFromCart,
+    OrderBulkStatusResponse,
+    OrderStatusRejection
+)
+from app.utils.pagination import Cursor
+
+
+# Durée maximale d'un rapport jour par jour
+MAX_REPORT_DAYS = 366
 
 
 class OrderService:
@@ -28,6 +43,7 @@ class OrderService:
         self.cart_item_repo = CartItemRepository(db)
         self.product_repo = ProductRepository(db)
         self.coupon_repo = CouponRepository(db)
+        self.stats_repo = StatisticsRepository(db)
     
     async def create_order_from_cart(
         self,
@@ -56,31 +72,14 @@ class OrderService:
                 detail="Le panier est vide"
             )
         
-        # Valider la disponibilité des produits
-        for cart_item in cart.items:
-            product = await self.product_repo.get_by_id(cart_item.product_id)
-            
-            if not product or not product.is_active:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Le produit {cart_item.product_id} n'est plus disponible"
-                )
-            
-            if product.stock < cart_item.quantity:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Stock insuffisant pour {product.name}"
-                )
-        
         # Calculer le total
         total_amount = Decimal(str(cart.subtotal))
         
         # Appliquer le coupon si fourni
         discount_amount = Decimal("0")
+        coupon = None
         if order_data.coupon_code:
-            is_valid, coupon, error = await self.coupon_repo.validate_code(
-                order_data.coupon_code
-            )
+            is_valid, coupon, error = await coupon_index.validate(order_data.coupon_code)
             
             if not is_valid:
                 raise HTTPException(
@@ -88,14 +87,31 @@ class OrderService:
                     detail=error or "Code promo invalide"
                 )
             
-            discount_amount = Decimal(str(coupon.calculate_discount(float(total_amount))))
+            discount_amount = coupon.calculate_discount(total_amount)
             total_amount -= discount_amount
         
+        # Réserver le stock de toutes les lignes (tout ou rien)
+        with STOCK_RESERVATION_DURATION.timer():
+            shortages = await self.product_repo.reserve_stock(
+                self._cart_quantities(cart)
+            )
+        
+        if shortages:
+            references = ", ".join(
+                shortage.sku or shortage.name or str(shortage.product_id)
+                for shortage in shortages
+            )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Stock insuffisant ou produit indisponible : {references}"
+            )
+        
         # Créer la commande
         order_dict = {
             "user_id": user_id,
             "status": OrderStatus.PENDING,
             "total_amount": total_amount,
+            "discount_amount": discount_amount,
             "billing_address_id": order_data.billing_address_id,
             "shipping_address_id": order_data.shipping_address_id
         }
@@ -111,23 +127,35 @@ class OrderService:
                 "unit_price": cart_item.price
             })
         
-        await self.order_item_repo.bulk_create_items(order.id, order_items_data)
-        
-        # Diminuer le stock des produits
-        for cart_item in cart.items:
-            await self.product_repo.decrease_stock(
-                cart_item.product_id,
-                cart_item.quantity
-            )
+        # La commande est rechargée avec ses articles juste après
+        await self.order_item_repo.bulk_create_items(
+            order.id,
+            order_items_data,
+            hydrate=False
+        )
         
         # Vider le panier
         await self.cart_repo.clear(cart.id)
         
+        # Lier le coupon en dernier : la ligne du coupon reste verrouillée jusqu'au commit
+        if coupon is not None:
+            await self.coupon_repo.record_usage(coupon.id, order.id, discount_amount)
+        
         # Recharger la commande avec les détails
         order_with_details = await self.order_repo.get_by_id_with_details(order.id)
         
         return order_with_details
     
+    @staticmethod
+    def _cart_quantities(cart) -> Dict[int, int]:
+        """Quantités demandées par produit (lignes d'un même produit cumulées)"""
+        quantities: Dict[int, int] = {}
+        for cart_item in cart.items:
+            quantities[cart_item.product_id] = (
+                quantities.get(cart_item.product_id, 0) + cart_item.quantity
+            )
+        return quantities
+    
     async def get_order_by_id(
         self,
         order_id: int,
@@ -167,8 +195,10 @@ class OrderService:
         self,
         user_id: int,
         skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[List[Order], int]:
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+        include_total: bool = True
+    ) -> Tuple[List[Order], Optional[int]]:
         """
         Récupère les commandes d'un utilisateur
         
@@ -176,12 +206,14 @@ class OrderService:
             user_id: ID de l'utilisateur
             skip: Offset
             limit: Limite
+            after: Curseur keyset (remplace skip)
+            include_total: Calculer le total (sinon None)
         
         Returns:
             (Liste de commandes, Total)
         """
-        orders = await self.order_repo.get_by_user_id(user_id, skip, limit)
-        total = await self.order_repo.count_by_user(user_id)
+        orders = await self.order_repo.get_by_user_id(user_id, skip, limit, after)
+        total = await self.order_repo.count_by_user(user_id) if include_total else None
         
         return orders, total
     
@@ -189,8 +221,10 @@ class OrderService:
         self,
         skip: int = 0,
         limit: int = 100,
-        status: Optional[OrderStatus] = None
-    ) -> Tuple[List[Order], int]:
+        status: Optional[OrderStatus] = None,
+        after: Optional[Cursor] = None,
+        include_total: bool = True
+    ) -> Tuple[List[Order], Optional[int]]:
         """
         Récupère toutes les commandes (admin)
         
@@ -198,16 +232,22 @@ class OrderService:
             skip: Offset
             limit: Limite
             status: Filtrer par statut
+            after: Curseur keyset (remplace skip)
+            include_total: Calculer le total (sinon None)
         
         Returns:
             (Liste de commandes, Total)
         """
+        total = None
+        
         if status:
-            orders = await self.order_repo.get_by_status(status, skip, limit)
-            total = await self.order_repo.count_by_status(status)
+            orders = await self.order_repo.get_by_status(status, skip, limit, after)
+            if include_total:
+                total = await self.order_repo.count_by_status(status)
         else:
-            orders = await self.order_repo.get_all(skip, limit)
-            total = await self.order_repo.count()
+            orders = await self.order_repo.get_all(skip, limit, after=after)
+            if include_total:
+                total = await self.order_repo.count()
         
         return orders, total
     
@@ -235,6 +275,59 @@ class OrderService:
         
         return updated_order
     
+    async def bulk_update_order_status(
+        self,
+        order_ids: List[int],
+        new_status: OrderStatus
+    ) -> Tuple[OrderBulkStatusResponse, List[Tuple[Any, Any]]]:
+        """
+        Change le statut de plusieurs commandes (admin)
+        
+        - Statuts lus et verrouillés en une requête, transitions validées
+          en mémoire (ORDER_STATUS_TRANSITIONS)
+        - Un seul UPDATE pour toutes les commandes acceptées
+        - Annulation : stock restauré en une seule mise à jour
+        - Coordonnées des clients chargées en une requête pour les notifications
+        
+        Args:
+            order_ids: IDs des commandes
+            new_status: Nouveau statut
+        
+        Returns:
+            (Rapport, Couples (client, commande) à notifier)
+        """
+        requested = list(dict.fromkeys(order_ids))
+        rows = {row.id: row for row in await self.order_repo.lock_statuses(requested)}
+        
+        report = OrderBulkStatusResponse(status=new_status)
+        accepted = []
+        
+        for order_id in requested:
+            row = rows.get(order_id)
+            
+            if row is None:
+                reason = "Commande non trouvée"
+            elif new_status not in ORDER_STATUS_TRANSITIONS[row.status]:
+                reason = f"Transition {row.status.value} -> {new_status.value} non autorisée"
+            else:
+                accepted.append(row)
+                continue
+            
+            report.rejected.append(OrderStatusRejection(order_id=order_id, reason=reason))
+        
+        accepted_ids = [row.id for row in accepted]
+        
+        if new_status == OrderStatus.CANCELLED and accepted_ids:
+            quantities = await self.order_item_repo.sum_quantities_by_product(accepted_ids)
+            await self.product_repo.release_stock(quantities)
+        
+        report.updated = await self.order_repo.bulk_update_status(accepted_ids, new_status)
+        
+        users = await UserRepository(self.db).get_contacts(row.user_id for row in accepted)
+        recipients = [(users[row.user_id], row) for row in accepted if row.user_id in users]
+        
+        return report, recipients
+    
     async def cancel_order(
         self,
         order_id: int,
@@ -262,11 +355,11 @@ class OrderService:
             )
         
         # Restaurer le stock
+        quantities: Dict[int, int] = {}
         for item in order.items:
-            await self.product_repo.increase_stock(
-                item.product_id,
-                item.quantity
-            )
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        
+        await self.product_repo.release_stock(quantities)
         
         # Mettre à jour le statut
         cancelled_order = await self.order_repo.update_status(
@@ -276,25 +369,79 @@ class OrderService:
         
         return cancelled_order
     
-    async def get_order_statistics(self) -> dict:
+    async def get_order_statistics(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> dict:
         """
         Récupère les statistiques des commandes (admin)
         
+        Lues dans les agrégats journaliers (une requête groupée)
+        
+        Args:
+            date_from: Premier jour de création inclus (optionnel)
+            date_to: Dernier jour de création inclus (optionnel)
+        
         Returns:
-            Dictionnaire de statistiques
+            Dictionnaire de statistiques (nombre par statut, chiffre d'affaires)
         """
-        total = await self.order_repo.count()
-        pending = await self.order_repo.count_by_status(OrderStatus.PENDING)
-        paid = await self.order_repo.count_by_status(OrderStatus.PAID)
-        shipped = await self.order_repo.count_by_status(OrderStatus.SHIPPED)
-        delivered = await self.order_repo.count_by_status(OrderStatus.DELIVERED)
-        cancelled = await self.order_repo.count_by_status(OrderStatus.CANCELLED)
+        totals = await self.stats_repo.get_totals(Order, date_from, date_to)
+        counts = {
+            order_status.value: totals.get(order_status, (0, Decimal("0")))[0]
+            for order_status in OrderStatus
+        }
+        revenue = sum(
+            (totals[order_status][1] for order_status in ORDER_REVENUE_STATUSES if order_status in totals),
+            Decimal("0")
+        )
         
         return {
-            "total": total,
-            "pending": pending,
-            "paid": paid,
-            "shipped": shipped,
-            "delivered": delivered,
-            "cancelled": cancelled
-        }   
\ No newline at end of file
+            "total": sum(counts.values()),
+            **counts,
+            "revenue": float(revenue)
+        }
+    
+    async def get_daily_revenue(self, date_from: date, date_to: date) -> List[dict]:
+        """
+        Rapport jour par jour : commandes créées et chiffre d'affaires
+        
+        Args:
+            date_from: Premier jour inclus
+            date_to: Dernier jour inclus
+        
+        Returns:
+            Une entrée par jour ayant des commandes
+        
+        Raises:
+            HTTPException: Si la période est invalide ou trop longue
+        """
+        if date_from > date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_from doit précéder date_to"
+            )
+        
+        if (date_to - date_from).days >= MAX_REPORT_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Période limitée à {MAX_REPORT_DAYS} jours"
+            )
+        
+        days: Dict[date, dict] = {}
+        for day, order_status, total, amount in await self.stats_repo.get_daily(Order, date_from, date_to):
+            entry = days.setdefault(day, {
+                "date": day.isoformat(),
+                "orders": 0,
+                "revenue": Decimal("0"),
+                "by_status": {}
+            })
+            entry["orders"] += total
+            entry["by_status"][order_status.value] = total
+            if order_status in ORDER_REVENUE_STATUSES:
+                entry["revenue"] += amount
+        
+        return [
+            {**entry, "revenue": float(entry["revenue"])}
+            for entry in days.values()
+        ]   
\ No newline at end of file
@@ -7,14 +7,17 @@ Intégration avec Stripe, PayPal, etc.
 from typing import Optional, List, Tuple
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 
 from app.core.config import settings
 from app.models.payment import Payment, PaymentStatus, PaymentMethod
 from app.models.order import OrderStatus
 from app.repositories.payment import PaymentRepository
 from app.repositories.order import OrderRepository
+from app.repositories.statistics import StatisticsRepository
 from app.schemas.payment import PaymentCreate, PaymentInitiate
+from app.utils.pagination import Cursor
 
 
 class PaymentService:
@@ -24,6 +27,7 @@ class PaymentService:
         self.db = db
         self.payment_repo = PaymentRepository(db)
         self.order_repo = OrderRepository(db)
+        self.stats_repo = StatisticsRepository(db)
     
     async def initiate_payment(
         self,
@@ -223,8 +227,10 @@ class PaymentService:
         skip: int = 0,
         limit: int = 100,
         status: Optional[PaymentStatus] = None,
-        method: Optional[PaymentMethod] = None
-    ) -> Tuple[List[Payment], int]:
+        method: Optional[PaymentMethod] = None,
+        after: Optional[Cursor] = None,
+        include_total: bool = True
+    ) -> Tuple[List[Payment], Optional[int]]:
         """
         Récupère tous les paiements avec filtres (admin)
         
@@ -233,19 +239,26 @@ class PaymentService:
             limit: Limite
             status: Filtrer par statut
             method: Filtrer par méthode
+            after: Curseur keyset (remplace skip)
+            include_total: Calculer le total (sinon None)
         
         Returns:
             (Liste de paiements, Total)
         """
+        total = None
+        
         if status:
-            payments = await self.payment_repo.get_by_status(status, skip, limit)
-            total = await self.payment_repo.count_by_status(status)
+            payments = await self.payment_repo.get_by_status(status, skip, limit, after)
+            if include_total:
+                total = await self.payment_repo.count_by_status(status)
         elif method:
-            payments = await self.payment_repo.get_by_method(method, skip, limit)
-            total = await self.payment_repo.count_by_method(method)
+            payments = await self.payment_repo.get_by_method(method, skip, limit, after)
+            if include_total:
+                total = await self.payment_repo.count_by_method(method)
         else:
-            payments = await self.payment_repo.get_all(skip, limit)
-            total = await self.payment_repo.count()
+            payments = await self.payment_repo.get_all(skip, limit, after=after)
+            if include_total:
+                total = await self.payment_repo.count()
         
         return payments, total
     
@@ -318,28 +331,35 @@ class PaymentService:
         
         return None
     
-    async def get_payment_statistics(self) -> dict:
+    async def get_payment_statistics(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> dict:
         """
         Récupère les statistiques des paiements (admin)
         
+        Lues dans les agrégats journaliers (une requête groupée)
+        
+        Args:
+            date_from: Premier jour de création inclus (optionnel)
+            date_to: Dernier jour de création inclus (optionnel)
+        
         Returns:
             Dictionnaire de statistiques
         """
-        total = await self.payment_repo.count()
-        successful = await self.payment_repo.count_by_status(PaymentStatus.SUCCESS)
-        pending = await self.payment_repo.count_by_status(PaymentStatus.PENDING)
-        failed = await self.payment_repo.count_by_status(PaymentStatus.FAILED)
-        refunded = await self.payment_repo.count_by_status(PaymentStatus.REFUNDED)
-        
-        total_amount = await self.payment_repo.get_total_amount_by_status(
-            PaymentStatus.SUCCESS
-        )
+        totals = await self.stats_repo.get_totals(Payment, date_from, date_to)
+        counts = {
+            payment_status: totals.get(payment_status, (0, Decimal("0")))[0]
+            for payment_status in PaymentStatus
+        }
+        revenue = totals.get(PaymentStatus.SUCCESS, (0, Decimal("0")))[1]
         
         return {
-            "total_payments": total,
-            "successful": successful,
-            "pending": pending,
-            "failed": failed,
-            "refunded": refunded,
-            "total_revenue": total_amount
+            "total_payments": sum(counts.values()),
+            "successful": counts[PaymentStatus.SUCCESS],
+            "pending": counts[PaymentStatus.PENDING],
+            "failed": counts[PaymentStatus.FAILED],
+            "refunded": counts[PaymentStatus.REFUNDED],
+            "total_revenue": float(revenue)
         }
\ No newline at end of file
@@ -4,15 +4,29 @@ Service de gestion des produits
 CRUD et opérations sur les produits
 """
 
-from typing import Optional, List, Tuple
+from typing import Any, Dict, Optional, List, Tuple
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
 
+from app.core.cache import cache, hash_key
 from app.models.product import Product
-from app.repositories.product import ProductRepository
+from app.repositories.product import (
+    ProductRepository,
+    ProductQuerySpec,
+    PRODUCT_LIST_CACHE_NAMESPACE,
+    product_cache_key,
+    product_slug_cache_key
+)
 from app.repositories.category import CategoryRepository
-from app.schemas.product import ProductCreate, ProductUpdate, ProductFilterParams
+from app.schemas.product import (
+    ProductCreate,
+    ProductUpdate,
+    ProductFilterParams,
+    ProductResponse,
+    ProductDetailResponse
+)
+from app.utils.pagination import Cursor
 
 
 class ProductService:
@@ -69,6 +83,65 @@ class ProductService:
         
         return product
     
+    async def get_product_detail(self, product_id: int) -> ProductDetailResponse:
+        """
+        Détails d'un produit, servis depuis le cache
+        
+        Args:
+            product_id: ID du produit
+        
+        Returns:
+            Détails du produit (images, catégories, notes)
+        
+        Raises:
+            HTTPException: Si produit non trouvé
+        """
+        async def load() -> Optional[Dict[str, Any]]:
+            product = await self.product_repo.get_detail(product_id)
+            return self._serialize_detail(product)
+        
+        payload = await cache.get_or_load(product_cache_key(product_id), load)
+        
+        return self._detail_or_404(payload)
+    
+    async def get_product_detail_by_slug(self, slug: str) -> ProductDetailResponse:
+        """
+        Détails d'un produit par slug, servis depuis le cache
+        
+        Args:
+            slug: Slug du produit
+        
+        Returns:
+            Détails du produit (images, catégories, notes)
+        
+        Raises:
+            HTTPException: Si produit non trouvé
+        """
+        async def load() -> Optional[Dict[str, Any]]:
+            product = await self.product_repo.get_by_slug(slug)
+            return self._serialize_detail(product)
+        
+        payload = await cache.get_or_load(product_slug_cache_key(slug), load)
+        
+        return self._detail_or_404(payload)
+    
+    @staticmethod
+    def _serialize_detail(product: Optional[Product]) -> Optional[Dict[str, Any]]:
+        """Sérialise un produit pour le cache (None si absent)"""
+        if product is None:
+            return None
+        return ProductDetailResponse.model_validate(product).model_dump(mode="json")
+    
+    @staticmethod
+    def _detail_or_404(payload: Optional[Dict[str, Any]]) -> ProductDetailResponse:
+        """Reconstruit la réponse depuis le cache ou lève 404"""
+        if payload is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Produit non trouvé"
+            )
+        return ProductDetailResponse.model_validate(payload)
+    
     async def create_product(self, product_data: ProductCreate) -> Product:
         """
         Crée un nouveau produit
@@ -191,62 +264,105 @@ class ProductService:
         self,
         filters: ProductFilterParams,
         skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[List[Product], int]:
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+        include_total: bool = True
+    ) -> Tuple[List[Product], Optional[int]]:
         """
         Récupère les produits avec filtres et pagination
+        Tous les filtres et le tri sont combinés en une seule requête
         
         Args:
-            filters: Paramètres de filtrage
+            filters: Paramètres de filtrage et de tri
             skip: Offset
             limit: Limite
+            after: Curseur keyset (remplace skip)
+            include_total: Calculer le total (sinon None)
         
         Returns:
             (Liste de produits, Total)
+        
+        Raises:
+            HTTPException: Si le curseur est incompatible avec le tri
         """
-        # Recherche textuelle
-        if filters.search:
-            products = await self.product_repo.search(filters.search, skip, limit)
-            all_results = await self.product_repo.search(filters.search, 0, 10000)
-            return products, len(all_results)
-        
-        # Filtrer par catégorie
-        if filters.category_id:
-            products = await self.product_repo.get_by_category(
-                filters.category_id, skip, limit
-            )
-            all_results = await self.product_repo.get_by_category(
-                filters.category_id, 0, 10000
-            )
-            return products, len(all_results)
+        spec = ProductQuerySpec.from_filters(filters).after(after)
         
-        # Filtrer par fourchette de prix
-        if filters.min_price is not None and filters.max_price is not None:
-            products = await self.product_repo.get_by_price_range(
-                filters.min_price, filters.max_price, skip, limit
-            )
-            all_results = await self.product_repo.get_by_price_range(
-                filters.min_price, filters.max_price, 0, 10000
+        try:
+            if include_total:
+                return await self.product_repo.find_with_total(spec, skip, limit)
+            
+            return await self.product_repo.find(spec, skip, limit), None
+        
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
             )
-            return products, len(all_results)
+    
+    @staticmethod
+    def cursor_field(filters: ProductFilterParams) -> Optional[str]:
+        """
+        Colonne portée par le curseur de la page suivante
+        
+        Args:
+            filters: Paramètres de filtrage et de tri
         
-        # Produits en stock
-        if filters.in_stock:
-            products = await self.product_repo.get_in_stock(skip, limit)
-            all_results = await self.product_repo.get_in_stock(0, 10000)
-            return products, len(all_results)
+        Returns:
+            Colonne de tri, ou None si le tri n'admet pas de curseur
+            (pertinence plein texte)
+        """
+        return ProductQuerySpec.from_filters(filters).keyset_field
+    
+    async def get_product_page(
+        self,
+        filters: ProductFilterParams,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+        include_total: bool = True
+    ) -> Tuple[List[ProductResponse], Optional[int]]:
+        """
+        Page de listing produits, servie depuis le cache
+        La clé dépend des filtres, du tri et de la position dans le listing
         
-        # Produits en promotion
-        if filters.on_sale:
-            products = await self.product_repo.get_on_sale(skip, limit)
-            all_results = await self.product_repo.get_on_sale(0, 10000)
-            return products, len(all_results)
+        Args:
+            filters: Paramètres de filtrage et de tri
+            skip: Offset
+            limit: Limite
+            after: Curseur keyset (remplace skip)
+            include_total: Calculer le total (sinon None)
         
-        # Tous les produits actifs
-        products = await self.product_repo.get_active(skip, limit)
-        total = await self.product_repo.count(is_active=True)
+        Returns:
+            (Liste de produits, Total)
         
-        return products, total
+        Raises:
+            HTTPException: Si le curseur est incompatible avec le tri
+        """
+        namespace = await cache.namespace(PRODUCT_LIST_CACHE_NAMESPACE)
+        key = hash_key({
+            "filters": filters.model_dump(mode="json"),
+            "skip": skip,
+            "limit": limit,
+            "after": after.encode() if after else None,
+            "include_total": include_total,
+        })
+        
+        async def load() -> Dict[str, Any]:
+            products, total = await self.get_products(
+                filters, skip, limit, after=after, include_total=include_total
+            )
+            return {
+                "items": [
+                    ProductResponse.model_validate(p).model_dump(mode="json")
+                    for p in products
+                ],
+                "total": total,
+            }
+        
+        page = await cache.get_or_load(f"{namespace}:{key}", load)
+        
+        items = [ProductResponse.model_validate(item) for item in page["items"]]
+        return items, page["total"]
     
     async def update_stock(
         self,
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User, UserRole
 from app.repositories.user import UserRepository
 from app.schemas.user import UserUpdate, UserUpdateRole
+from app.utils.pagination import Cursor
 
 
 class UserService:
@@ -70,8 +71,10 @@ class UserService:
         self,
         skip: int = 0,
         limit: int = 100,
-        active_only: bool = False
-    ) -> Tuple[List[User], int]:
+        active_only: bool = False,
+        after: Optional[Cursor] = None,
+        include_total: bool = True
+    ) -> Tuple[List[User], Optional[int]]:
         """
         Récupère tous les utilisateurs avec pagination
         
@@ -79,16 +82,22 @@ class UserService:
             skip: Offset
             limit: Limite
             active_only: Utilisateurs actifs uniquement
+            after: Curseur keyset (remplace skip)
+            include_total: Calculer le total (sinon None)
         
         Returns:
             (Liste d'utilisateurs, Total)
         """
+        total = None
+        
         if active_only:
-            users = await self.user_repo.get_all_active(skip, limit)
-            total = await self.user_repo.count_active()
+            users = await self.user_repo.get_all_active(skip, limit, after)
+            if include_total:
+                total = await self.user_repo.count_active()
         else:
-            users = await self.user_repo.get_all(skip, limit, order_by="created_at")
-            total = await self.user_repo.count()
+            users = await self.user_repo.get_all(skip, limit, after=after)
+            if include_total:
+                total = await self.user_repo.count()
         
         return users, total
     
@@ -230,8 +239,10 @@ class UserService:
         self,
         search_term: str,
         skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[List[User], int]:
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+        include_total: bool = True
+    ) -> Tuple[List[User], Optional[int]]:
         """
         Recherche d'utilisateurs
         
@@ -239,15 +250,14 @@ class UserService:
             search_term: Terme de recherche
             skip: Offset
             limit: Limite
+            after: Curseur keyset (remplace skip)
+            include_total: Calculer le total (sinon None)
         
         Returns:
             (Liste d'utilisateurs, Total)
         """
-        users = await self.user_repo.search(search_term, skip, limit)
-        
-        # Pour le total, on refait une recherche sans pagination
-        all_results = await self.user_repo.search(search_term, 0, 10000)
-        total = len(all_results)
+        users = await self.user_repo.search(search_term, skip, limit, after)
+        total = await self.user_repo.count_search(search_term) if include_total else None
         
         return users, total
     
@@ -255,8 +265,10 @@ class UserService:
         self,
         role: UserRole,
         skip: int = 0,
-        limit: int = 100
-    ) -> Tuple[List[User], int]:
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+        include_total: bool = True
+    ) -> Tuple[List[User], Optional[int]]:
         """
         Récupère les utilisateurs par rôle
         
@@ -264,12 +276,14 @@ class UserService:
             role: Rôle recherché
             skip: Offset
             limit: Limite
+            after: Curseur keyset (remplace skip)
+            include_total: Calculer le total (sinon None)
         
         Returns:
             (Liste d'utilisateurs, Total)
         """
-        users = await self.user_repo.get_by_role(role, skip, limit)
-        total = await self.user_repo.count_by_role(role)
+        users = await self.user_repo.get_by_role(role, skip, limit, after)
+        total = await self.user_repo.count_by_role(role) if include_total else None
         
         return users, total
     
@@ -280,17 +294,19 @@ class UserService:
         Returns:
             Dictionnaire de statistiques
         """
-        total = await self.user_repo.count()
-        active = await self.user_repo.count_active()
-        customers = await self.user_repo.count_by_role(UserRole.CUSTOMER)
-        admins = await self.user_repo.count_by_role(UserRole.ADMIN)
-        managers = await self.user_repo.count_by_role(UserRole.MANAGER)
+        counts = await self.user_repo.count_by_role_and_activity()
+        
+        total = sum(counts.values())
+        active = sum(count for (_, is_active), count in counts.items() if is_active)
+        by_role = {role: 0 for role in UserRole}
+        for (role, _), count in counts.items():
+            by_role[role] += count
         
         return {
             "total": total,
             "active": active,
             "inactive": total - active,
-            "customers": customers,
-            "admins": admins,
-            "managers": managers
+            "customers": by_role[UserRole.CUSTOMER],
+            "admins": by_role[UserRole.ADMIN],
+            "managers": by_role[UserRole.MANAGER]
         }
\ No newline at end of file
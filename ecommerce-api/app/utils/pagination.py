@@ -1 +1,98 @@
+"""
+Utilitaires de pagination
+Curseurs opaques pour la pagination par clé (keyset)
+"""
 
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, NamedTuple, Optional
+
+
+# Types non JSON portés par les curseurs (valeur de tri)
+_VALUE_LOADERS = {
+    "datetime": datetime.fromisoformat,
+    "decimal": Decimal,
+}
+
+
+def _dump_value(value: Any) -> list:
+    if isinstance(value, datetime):
+        return ["datetime", value.isoformat()]
+    if isinstance(value, Decimal):
+        return ["decimal", str(value)]
+    return [None, value]
+
+
+def _load_value(kind: Optional[str], value: Any) -> Any:
+    if kind is None:
+        return value
+    return _VALUE_LOADERS[kind](value)
+
+
+class Cursor(NamedTuple):
+    """
+    Position dans un listing trié par (colonne de tri, id)
+    
+    Le curseur désigne le dernier élément de la page précédente :
+    la page suivante commence strictement après lui. Il mémorise la
+    colonne de tri pour être refusé si le tri demandé a changé.
+    """
+    value: Any
+    id: int
+    sort: str = "created_at"
+    
+    def encode(self) -> str:
+        """
+        Encode le curseur en chaîne opaque (base64 URL-safe)
+        
+        Returns:
+            Curseur encodé
+        """
+        payload = json.dumps(
+            [self.sort, *_dump_value(self.value), self.id],
+            separators=(",", ":")
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+    
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        """
+        Décode un curseur opaque
+        
+        Args:
+            value: Curseur encodé
+        
+        Returns:
+            Curseur
+        
+        Raises:
+            ValueError: Si le curseur est invalide
+        """
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            sort, kind, raw, id = json.loads(base64.urlsafe_b64decode(padded))
+            return cls(_load_value(kind, raw), int(id), str(sort))
+        except (ValueError, TypeError, KeyError, ArithmeticError) as e:
+            raise ValueError("Curseur de pagination invalide") from e
+    
+    @classmethod
+    def from_item(cls, item: Any, sort: str = "created_at") -> Optional["Cursor"]:
+        """
+        Construit le curseur pointant sur un élément (modèle ou schema)
+        
+        Args:
+            item: Objet exposant la colonne de tri et id
+            sort: Colonne de tri du listing
+        
+        Returns:
+            Curseur ou None si l'objet n'est pas positionnable
+        """
+        value = getattr(item, sort, None)
+        id = getattr(item, "id", None)
+        
+        if value is None or id is None:
+            return None
+        
+        return cls(value, id, sort)
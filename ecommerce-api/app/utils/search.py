@@ -0,0 +1,79 @@
+"""
+Utilitaires de recherche plein texte
+Normalisation des termes et construction des requêtes MATCH ... AGAINST
+"""
+
+import re
+import unicodedata
+from typing import List, Optional
+
+
+# Taille minimale des tokens indexés par InnoDB (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+# Mots vides ignorés (français + anglais courant)
+STOPWORDS = frozenset({
+    "les", "des", "une", "aux", "pour", "par", "sur", "dans", "avec",
+    "sans", "est", "son", "ses", "leur", "qui", "que", "quoi", "and",
+    "the", "for", "with", "from", "are", "was",
+})
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def fold_accents(text: str) -> str:
+    """
+    Supprime les accents et met en minuscules
+    
+    Example:
+        "Écran Télé" -> "ecran tele"
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return stripped.lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Découpe un texte en tokens recherchables
+    
+    - Accents supprimés, minuscules
+    - Élisions françaises séparées (l'écran -> l, ecran)
+    - Tokens trop courts et mots vides retirés
+    - Doublons retirés (ordre conservé)
+    
+    Args:
+        text: Texte saisi par l'utilisateur
+    
+    Returns:
+        Liste de tokens
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(fold_accents(text)):
+        if len(token) < FULLTEXT_MIN_TOKEN_SIZE or token in STOPWORDS:
+            continue
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def build_boolean_query(text: str) -> Optional[str]:
+    """
+    Construit une requête MySQL FULLTEXT en mode booléen
+    
+    Chaque token est obligatoire (+) et recherché par préfixe (*),
+    ce qui permet la recherche au fil de la frappe.
+    
+    Example:
+        "écran 4K Samsung" -> "+ecran* +samsung*"
+    
+    Args:
+        text: Texte saisi par l'utilisateur
+    
+    Returns:
+        Requête booléenne ou None si aucun token exploitable
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+    return " ".join(f"+{token}*" for token in tokens)
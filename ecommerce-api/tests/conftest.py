@@ -1 +1,104 @@
+"""
+Fixtures de test
+Base SQLite en mémoire (aiosqlite) et cache en mémoire ; les tests qui
+dépendent des verrous InnoDB (FOR UPDATE, SKIP LOCKED) utilisent la base
+MySQL de TEST_DATABASE_URL et sont ignorés si elle n'est pas définie
+"""
 
+import os
+
+# Configuration minimale avant l'import de l'application
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-at-least-32-characters")
+os.environ.setdefault("SESSION_SECRET_KEY", "test-session-key-with-at-least-32-characters")
+os.environ.setdefault("MAIL_USERNAME", "")
+os.environ.setdefault("MAIL_PASSWORD", "")
+os.environ.setdefault("MAIL_FROM", "shop@example.com")
+os.environ.setdefault("ADMIN_EMAIL", "admin@example.com")
+os.environ.setdefault("ADMIN_PASSWORD", "admin-password")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("EMAIL_DISPATCHER_ENABLED", "false")
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+from app.core.cache import cache, MemoryCacheBackend
+from app.core.config import settings
+from app.core.database import Base, create_session_maker
+import app.models  # noqa: F401 - enregistre toutes les tables
+
+
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+@compiles(BigInteger, "sqlite")
+def _bigint_as_integer(type_, compiler, **kw):
+    """SQLite n'auto-incrémente que les clés INTEGER PRIMARY KEY"""
+    return "INTEGER"
+
+
+@pytest_asyncio.fixture
+async def engine():
+    """Moteur SQLite en mémoire partagé par toutes les sessions du test"""
+    engine = create_async_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    yield engine
+    
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_maker(engine):
+    """Fabrique de sessions (mêmes options que l'application)"""
+    return create_session_maker(engine)
+
+
+@pytest_asyncio.fixture
+async def db(session_maker):
+    """Session de test"""
+    async with session_maker() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def mysql_engine():
+    """Moteur MySQL de test (TEST_DATABASE_URL), schéma recréé pour le test"""
+    url = settings.TEST_DATABASE_URL
+    if not url or not url.startswith("mysql"):
+        pytest.skip("TEST_DATABASE_URL (MySQL) non défini")
+    
+    engine = create_async_engine(url, pool_size=20)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    
+    yield engine
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def mysql_session_maker(mysql_engine):
+    """Fabrique de sessions sur la base MySQL de test"""
+    return create_session_maker(mysql_engine)
+
+
+@pytest.fixture(autouse=True)
+def memory_cache():
+    """Cache mémoire vide pour chaque test"""
+    backend = MemoryCacheBackend()
+    cache.use_backend(backend)
+    return backend
@@ -1 +1,98 @@
+"""
+Tests de l'authentification (décodage des tokens JWT)
+"""
 
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.security import PasswordHashPool, create_access_token, decode_token
+
+
+def test_decode_token_returns_payload():
+    token = create_access_token({"sub": "1", "role": "customer"})
+    
+    payload = decode_token(token)
+    
+    assert payload["sub"] == "1"
+    assert payload["type"] == "access"
+
+
+def test_cached_payload_is_not_shared_between_callers():
+    token = create_access_token({"sub": "1", "role": "customer"})
+    
+    first = decode_token(token)
+    first.pop("sub")
+    first["role"] = "admin"
+    
+    # Décodage servi par le cache : intact malgré la modification précédente
+    second = decode_token(token)
+    assert second["sub"] == "1"
+    assert second["role"] == "customer"
+    
+    second["role"] = "admin"
+    assert decode_token(token)["role"] == "customer"
+
+
+def test_invalid_token_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        decode_token("not-a-token")
+    
+    assert error.value.status_code == 401
+
+
+# ===== Pool bcrypt =====
+@pytest.mark.asyncio
+async def test_hash_pool_counts_failures_separately():
+    pool = PasswordHashPool(workers=1, max_pending=4)
+    
+    def broken(value):
+        raise ValueError(value)
+    
+    assert await pool.run(str.upper, "ok") == "OK"
+    with pytest.raises(ValueError):
+        await pool.run(broken, "bad hash")
+    
+    stats = pool.stats()
+    assert stats["completed"] == 1
+    assert stats["failed"] == 1
+    assert stats["pending"] == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_pool_keeps_slot_until_cancelled_job_finishes():
+    pool = PasswordHashPool(workers=1, max_pending=1)
+    started = threading.Event()
+    release = threading.Event()
+    
+    def slow(value):
+        started.set()
+        release.wait(5)
+        return value
+    
+    task = asyncio.create_task(pool.run(slow, "hash"))
+    await asyncio.to_thread(started.wait, 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    
+    # Appelant parti, calcul toujours en cours : la place reste occupée
+    assert pool.stats()["pending"] == 1
+    with pytest.raises(HTTPException) as error:
+        await pool.run(str.upper, "ok")
+    assert error.value.status_code == 429
+    
+    release.set()
+    for _ in range(100):
+        if pool.stats()["pending"] == 0:
+            break
+        await asyncio.sleep(0.01)
+    
+    stats = pool.stats()
+    assert stats["pending"] == 0
+    assert stats["completed"] == 1
+    assert await pool.run(str.upper, "ok") == "OK"
+    pool.shutdown()
@@ -0,0 +1,201 @@
+"""
+Tests du repository de base (pagination, opérations en masse)
+"""
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, select, text
+
+from app.models.product import Product
+from app.repositories.base import BaseRepository
+
+
+def _rows(count: int, prefix: str = "produit") -> list:
+    return [
+        {"name": f"Produit {i}", "slug": f"{prefix}-{i}", "price": Decimal("10.00") + i, "stock": i}
+        for i in range(count)
+    ]
+
+
+def _statements(engine) -> list:
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    return statements
+
+
+# ===== paginate =====
+@pytest.mark.asyncio
+async def test_paginate_returns_page_and_total_in_one_query(db, engine):
+    repo = BaseRepository(Product, db)
+    await repo.bulk_create(_rows(7), hydrate=False)
+    query = select(Product).order_by(Product.id)
+    statements = _statements(engine)
+    
+    products, total = await repo.paginate(query, skip=3, limit=3)
+    
+    assert [product.slug for product in products] == ["produit-3", "produit-4", "produit-5"]
+    assert total == 7
+    assert len(statements) == 1
+    assert "OVER ()" in statements[0]
+    
+    # Dernière page incomplète : le total reste celui du listing
+    products, total = await repo.paginate(query, skip=6, limit=3)
+    assert [product.slug for product in products] == ["produit-6"]
+    assert total == 7
+
+
+@pytest.mark.asyncio
+async def test_paginate_total_follows_filters(db):
+    repo = BaseRepository(Product, db)
+    await repo.bulk_create(_rows(7), hydrate=False)
+    
+    products, total = await repo.paginate(
+        select(Product).where(Product.stock >= 4).order_by(Product.id),
+        limit=2
+    )
+    
+    assert [product.stock for product in products] == [4, 5]
+    assert total == 3
+
+
+@pytest.mark.asyncio
+async def test_paginate_counts_separately_past_the_last_page(db, engine):
+    repo = BaseRepository(Product, db)
+    await repo.bulk_create(_rows(7), hydrate=False)
+    statements = _statements(engine)
+    
+    assert await repo.paginate(select(Product).order_by(Product.id), skip=10, limit=3) == ([], 7)
+    assert len(statements) == 2
+    
+    # Première page vide : aucun enregistrement, pas de COUNT
+    statements.clear()
+    assert await repo.paginate(select(Product).where(Product.stock > 100), limit=3) == ([], 0)
+    assert len(statements) == 1
+
+
+# ===== bulk_create =====
+@pytest.mark.asyncio
+async def test_bulk_create_returns_rows_in_order(db):
+    repo = BaseRepository(Product, db)
+    
+    products = await repo.bulk_create(_rows(7), chunk_size=3)
+    
+    assert [product.slug for product in products] == [f"produit-{i}" for i in range(7)]
+    assert len({product.id for product in products}) == 7
+    assert await repo.count() == 7
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_without_hydrate_returns_nothing(db):
+    repo = BaseRepository(Product, db)
+    
+    assert await repo.bulk_create(_rows(3), hydrate=False) == []
+    assert await repo.count() == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_follows_auto_increment_step(mysql_session_maker):
+    async with mysql_session_maker() as session:
+        # Galera / multi-primaire : IDs espacés
+        await session.execute(text("SET SESSION auto_increment_increment = 3"))
+        repo = BaseRepository(Product, session)
+        
+        products = await repo.bulk_create(_rows(5))
+        
+        assert [product.slug for product in products] == [f"produit-{i}" for i in range(5)]
+        ids = [product.id for product in products]
+        assert [b - a for a, b in zip(ids, ids[1:])] == [3] * 4
+        await session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_raises_when_ids_are_not_found(monkeypatch, mysql_session_maker):
+    async with mysql_session_maker() as session:
+        await session.execute(text("SET SESSION auto_increment_increment = 2"))
+        repo = BaseRepository(Product, session)
+        
+        async def wrong_step():
+            return 1
+        
+        monkeypatch.setattr(repo, "_auto_increment_step", wrong_step)
+        
+        with pytest.raises(RuntimeError):
+            await repo.bulk_create(_rows(4))
+        await session.rollback()
+
+
+# ===== bulk_update =====
+@pytest.mark.asyncio
+async def test_bulk_update_groups_by_columns_and_chunks(db, engine):
+    repo = BaseRepository(Product, db)
+    products = await repo.bulk_create(_rows(7))
+    ids = [product.id for product in products]
+    statements = _statements(engine)
+    
+    updates = [{"id": id, "price": Decimal("1.00")} for id in ids[:5]]
+    updates += [{"id": id, "price": Decimal("2.00"), "stock": 50} for id in ids[5:]]
+    
+    assert await repo.bulk_update(updates, chunk_size=2) == 7
+    
+    # Groupe "price" : 3 lots de 2 au plus ; groupe "price, stock" : 1 lot
+    assert sum(1 for statement in statements if statement.startswith("UPDATE products")) == 4
+    result = await db.execute(select(Product.price, Product.stock).order_by(Product.id))
+    assert result.all() == [(Decimal("1.00"), i) for i in range(5)] + [(Decimal("2.00"), 50)] * 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_returns_rows_found(db):
+    repo = BaseRepository(Product, db)
+    first, second = await repo.bulk_create(_rows(2))
+    
+    affected = await repo.bulk_update([
+        {"id": first.id, "stock": 3},
+        {"id": first.id, "stock": 4},
+        {"id": second.id, "stock": 5},
+        {"id": 999999, "stock": 6},
+        {"stock": 7},
+    ])
+    
+    # Ligne répétée : dernière valeur ; ID inconnu ou absent : ignoré
+    assert affected == 2
+    result = await db.execute(select(Product.stock).order_by(Product.id))
+    assert result.scalars().all() == [4, 5]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_skip_none(db, engine):
+    repo = BaseRepository(Product, db)
+    first, second = await repo.bulk_create([
+        {**row, "description": "Description"} for row in _rows(2)
+    ])
+    statements = _statements(engine)
+    
+    # Valeurs None ignorées : une ligne sans autre valeur n'est pas écrite
+    assert await repo.bulk_update([
+        {"id": first.id, "description": None, "stock": 9},
+        {"id": second.id, "description": None},
+    ]) == 1
+    assert sum(1 for statement in statements if statement.startswith("UPDATE products")) == 1
+    
+    # skip_none=False : None remet la colonne à NULL
+    assert await repo.bulk_update([{"id": second.id, "description": None}], skip_none=False) == 1
+    
+    result = await db.execute(select(Product.description, Product.stock).order_by(Product.id))
+    assert result.all() == [("Description", 9), (None, 1)]
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_refetch_syncs_loaded_objects(db):
+    repo = BaseRepository(Product, db)
+    first, second = await repo.bulk_create(_rows(2))
+    
+    await repo.bulk_update([{"id": first.id, "stock": 40}])
+    assert first.stock == 0
+    
+    await repo.bulk_update([{"id": first.id, "stock": 41}, {"id": second.id, "stock": 42}], refetch=True)
+    assert (first.stock, second.stock) == (41, 42)
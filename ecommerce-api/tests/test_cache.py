@@ -0,0 +1,247 @@
+"""
+Tests du cache read-through (backend Redis simulé par fakeredis)
+"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from fakeredis import aioredis as fakeredis
+from sqlalchemy import update
+
+from app.api.v1.products import router as products_router
+from app.core.cache import cache, CacheBackend, RedisCacheBackend
+from app.core.database import get_db, get_read_db
+from app.models.product import Product
+from app.repositories.product import (
+    ProductRepository,
+    PRODUCT_LIST_CACHE_NAMESPACE,
+    product_cache_key,
+    product_slug_cache_key
+)
+from app.services.product import ProductService
+
+
+@pytest_asyncio.fixture
+async def redis_backend():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    backend = RedisCacheBackend(client)
+    cache.use_backend(backend)
+    
+    yield backend
+    
+    await client.flushall()
+    await client.aclose()
+
+
+class FailingBackend(CacheBackend):
+    """Backend toujours en panne"""
+    
+    async def get(self, key):
+        raise ConnectionError("redis down")
+    
+    async def set(self, key, value, ttl):
+        raise ConnectionError("redis down")
+    
+    async def delete(self, *keys):
+        raise ConnectionError("redis down")
+    
+    async def incr(self, key):
+        raise ConnectionError("redis down")
+
+
+async def _cached(backend: RedisCacheBackend, key: str) -> bool:
+    return await backend.get(cache._key(key)) is not None
+
+
+# ===== Cache =====
+@pytest.mark.asyncio
+async def test_get_or_load_reads_through(redis_backend):
+    calls = []
+    
+    async def load():
+        calls.append(1)
+        return {"value": 42}
+    
+    assert await cache.get_or_load("answer", load) == {"value": 42}
+    assert await cache.get_or_load("answer", load) == {"value": 42}
+    assert len(calls) == 1
+    assert await _cached(redis_backend, "answer")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_load_once(redis_backend):
+    calls = []
+    
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return [1, 2, 3]
+    
+    results = await asyncio.gather(*(cache.get_or_load("slow", load) for _ in range(10)))
+    
+    assert results == [[1, 2, 3]] * 10
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_none_is_not_cached(redis_backend):
+    async def load():
+        return None
+    
+    assert await cache.get_or_load("missing", load) is None
+    assert not await _cached(redis_backend, "missing")
+
+
+@pytest.mark.asyncio
+async def test_namespace_invalidation_changes_version(redis_backend):
+    before = await cache.namespace("products:list")
+    
+    await cache.invalidate(namespaces=["products:list"])
+    
+    assert await cache.namespace("products:list") != before
+
+
+@pytest.mark.asyncio
+async def test_invalidation_waits_for_commit(redis_backend, db):
+    async def load():
+        return "v1"
+    
+    await cache.get_or_load("key", load)
+    
+    cache.invalidate_on_commit(db, keys=["key"])
+    assert await _cached(redis_backend, "key")
+    
+    await cache.flush_pending(db)
+    assert not await _cached(redis_backend, "key")
+
+
+@pytest.mark.asyncio
+async def test_rollback_discards_invalidation(redis_backend, db):
+    async def load():
+        return "v1"
+    
+    await cache.get_or_load("key", load)
+    
+    cache.invalidate_on_commit(db, keys=["key"])
+    cache.discard_pending(db)
+    await cache.flush_pending(db)
+    
+    assert await _cached(redis_backend, "key")
+
+
+@pytest.mark.asyncio
+async def test_backend_outage_falls_back_to_loader():
+    cache.use_backend(FailingBackend())
+    
+    async def load():
+        return "fresh"
+    
+    assert await cache.get_or_load("key", load) == "fresh"
+    await cache.invalidate(keys=["key"], namespaces=["products:list"])
+
+
+# ===== Produits =====
+@pytest_asyncio.fixture
+async def products(db):
+    rows = [
+        Product(name="Lampe", slug="lampe", price=Decimal("20.00"), stock=5),
+        Product(name="Chaise", slug="chaise", price=Decimal("40.00"), stock=2),
+    ]
+    db.add_all(rows)
+    await db.commit()
+    return rows
+
+
+@pytest.mark.asyncio
+async def test_product_detail_is_served_from_cache(redis_backend, db, products):
+    lamp = products[0]
+    service = ProductService(db)
+    
+    assert (await service.get_product_detail(lamp.id)).name == "Lampe"
+    
+    # Modification hors repository : le cache n'est pas invalidé
+    await db.execute(update(Product).where(Product.id == lamp.id).values(name="Lampe LED"))
+    await db.commit()
+    assert (await service.get_product_detail(lamp.id)).name == "Lampe"
+    
+    # Modification par le repository : invalidée après commit
+    await ProductRepository(db).update(lamp.id, {"name": "Lampe LED"})
+    await db.commit()
+    await cache.flush_pending(db)
+    assert (await service.get_product_detail(lamp.id)).name == "Lampe LED"
+
+
+@pytest.mark.asyncio
+async def test_reservation_keeps_listings_while_in_stock(redis_backend, db, products):
+    lamp, _ = products
+    repo = ProductRepository(db)
+    listings = await cache.namespace(PRODUCT_LIST_CACHE_NAMESPACE)
+    await redis_backend.set(cache._key(product_cache_key(lamp.id)), "{}", 60)
+    await redis_backend.set(cache._key(product_slug_cache_key(lamp.slug)), "{}", 60)
+    
+    assert await repo.reserve_stock({lamp.id: 1}) == []
+    await db.commit()
+    await cache.flush_pending(db)
+    
+    assert not await _cached(redis_backend, product_cache_key(lamp.id))
+    assert not await _cached(redis_backend, product_slug_cache_key(lamp.slug))
+    assert await cache.namespace(PRODUCT_LIST_CACHE_NAMESPACE) == listings
+
+
+@pytest.mark.asyncio
+async def test_stock_out_and_restock_invalidate_listings(redis_backend, db, products):
+    _, chair = products
+    repo = ProductRepository(db)
+    
+    listings = await cache.namespace(PRODUCT_LIST_CACHE_NAMESPACE)
+    assert await repo.reserve_stock({chair.id: 2}) == []
+    await db.commit()
+    await cache.flush_pending(db)
+    
+    out_of_stock = await cache.namespace(PRODUCT_LIST_CACHE_NAMESPACE)
+    assert out_of_stock != listings
+    
+    await repo.release_stock({chair.id: 1})
+    await db.commit()
+    await cache.flush_pending(db)
+    
+    restocked = await cache.namespace(PRODUCT_LIST_CACHE_NAMESPACE)
+    assert restocked != out_of_stock
+    
+    # Déjà en stock : les listings sont conservés
+    await repo.release_stock({chair.id: 1})
+    await db.commit()
+    await cache.flush_pending(db)
+    
+    assert await cache.namespace(PRODUCT_LIST_CACHE_NAMESPACE) == restocked
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_invalidates_previous_slug(redis_backend, db, products):
+    lamp, _ = products
+    for key in (product_cache_key(lamp.id), product_slug_cache_key("lampe")):
+        await redis_backend.set(cache._key(key), "{}", 60)
+    
+    await ProductRepository(db).bulk_update([{"id": lamp.id, "slug": "lampe-led"}])
+    await db.commit()
+    await cache.flush_pending(db)
+    
+    assert not await _cached(redis_backend, product_cache_key(lamp.id))
+    assert not await _cached(redis_backend, product_slug_cache_key("lampe"))
+
+
+def test_cached_product_routes_load_from_primary():
+    # Un réplica en retard remettrait en cache les données d'avant l'invalidation
+    cached_paths = {"/products", "/products/{product_id}", "/products/slug/{slug}"}
+    routes = [
+        route for route in products_router.routes
+        if route.path in cached_paths and "GET" in route.methods
+    ]
+    
+    assert len(routes) == len(cached_paths)
+    for route in routes:
+        calls = {dependency.call for dependency in route.dependant.dependencies}
+        assert get_db in calls
+        assert get_read_db not in calls
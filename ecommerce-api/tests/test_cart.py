@@ -1 +1,110 @@
+"""
+Tests de la validation du panier (chargement groupé des produits)
+"""
 
+from decimal import Decimal
+from typing import List
+
+import pytest
+from sqlalchemy import event
+
+from app.models.cart import Cart, CartItem
+from app.models.product import Product
+from app.models.user import User
+from app.repositories.product import ProductRepository
+from app.services.cart import CartService
+
+
+async def _seed(session_maker, stocks: List[int], quantity: int = 1) -> tuple:
+    """
+    Crée un client dont le panier contient un article par produit
+    
+    Returns:
+        (ID du client, IDs des produits)
+    """
+    async with session_maker() as session:
+        products = [
+            Product(name=f"Produit {i}", slug=f"produit-{i}", price=Decimal("10.00"), stock=stock)
+            for i, stock in enumerate(stocks)
+        ]
+        user = User(first_name="Client", last_name="Test", email="client@example.com", password_hash="x")
+        session.add_all([*products, user])
+        await session.flush()
+        
+        cart = Cart(user_id=user.id)
+        session.add(cart)
+        await session.flush()
+        
+        session.add_all([
+            CartItem(cart_id=cart.id, product_id=product.id, quantity=quantity, price=product.price)
+            for product in products
+        ])
+        await session.commit()
+        return user.id, [product.id for product in products]
+
+
+def _statements(engine) -> list:
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    return statements
+
+
+def _product_queries(statements: list) -> list:
+    return [statement for statement in statements if "FROM products" in statement]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("items", [1, 8])
+async def test_validate_cart_loads_products_once(engine, session_maker, items):
+    user_id, _ = await _seed(session_maker, [5] * items)
+    statements = _statements(engine)
+    
+    async with session_maker() as session:
+        assert await CartService(session).validate_cart(user_id) == (True, [])
+    
+    # Panier, articles, produits : nombre de requêtes indépendant du nombre d'articles
+    assert len(statements) == 3
+    assert len(_product_queries(statements)) == 1
+    assert " IN (" in _product_queries(statements)[0]
+
+
+@pytest.mark.asyncio
+async def test_validate_cart_reports_unavailable_products(session_maker):
+    user_id, product_ids = await _seed(session_maker, [5, 1, 5], quantity=2)
+    
+    async with session_maker() as session:
+        product = await session.get(Product, product_ids[2])
+        product.is_active = False
+        await session.commit()
+    
+    async with session_maker() as session:
+        is_valid, errors = await CartService(session).validate_cart(user_id)
+    
+    assert not is_valid
+    assert sorted(errors) == [
+        "Produit 2 n'est plus disponible",
+        "Stock insuffisant pour Produit 1. Disponible: 1, Demandé: 2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_many_skips_products_already_in_session(engine, session_maker):
+    _, product_ids = await _seed(session_maker, [1, 2, 3, 4])
+    statements = _statements(engine)
+    
+    async with session_maker() as session:
+        repo = ProductRepository(session)
+        
+        products = await repo.get_many(product_ids + [999999])
+        assert sorted(products) == sorted(product_ids)
+        assert len(statements) == 1
+        assert " IN (" in statements[0]
+        
+        # Déjà chargés : ni get_many ni load ne requêtent
+        assert (await repo.get_many(product_ids[:2])).keys() == set(product_ids[:2])
+        assert await repo.load(product_ids[0]) is products[product_ids[0]]
+        assert len(statements) == 1
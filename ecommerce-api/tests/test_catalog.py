@@ -0,0 +1,116 @@
+"""
+Tests de l'import du catalogue (mises à jour partielles)
+"""
+
+import io
+import threading
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+
+from app.models.product import Product
+from app.services.catalog import CatalogService, iter_csv_rows, iter_ndjson_rows
+
+
+@pytest_asyncio.fixture
+async def lamp(db):
+    product = Product(
+        name="Lampe",
+        slug="lampe",
+        sku="LMP-1",
+        description="Lampe de bureau",
+        price=Decimal("20.00"),
+        sale_price=Decimal("15.00"),
+        stock=7,
+        is_active=False
+    )
+    db.add(product)
+    await db.commit()
+    return product
+
+
+async def _reload(db, product_id: int) -> Product:
+    db.expunge_all()
+    return await db.get(Product, product_id)
+
+
+@pytest.mark.asyncio
+async def test_partial_csv_row_keeps_other_columns(db, lamp):
+    rows = iter_csv_rows(io.BytesIO(b"sku,name,price\nLMP-1,Lampe LED,25.00\n"))
+    
+    report = await CatalogService(db).import_products(rows)
+    
+    assert (report.created, report.updated, report.failed) == (0, 1, 0)
+    product = await _reload(db, lamp.id)
+    assert product.name == "Lampe LED"
+    assert product.price == Decimal("25.00")
+    assert product.slug == "lampe"
+    assert product.stock == 7
+    assert product.is_active is False
+    assert product.description == "Lampe de bureau"
+    assert product.sale_price == Decimal("15.00")
+
+
+@pytest.mark.asyncio
+async def test_partial_ndjson_row_keeps_other_columns(db, lamp):
+    rows = iter_ndjson_rows(io.BytesIO(b'{"sku": "LMP-1", "name": "Lampe", "price": "20.00", "stock": 3}\n'))
+    
+    report = await CatalogService(db).import_products(rows)
+    
+    assert report.updated == 1
+    product = await _reload(db, lamp.id)
+    assert product.stock == 3
+    assert product.is_active is False
+    assert product.sale_price == Decimal("15.00")
+
+
+@pytest.mark.asyncio
+async def test_empty_csv_cell_clears_nullable_column(db, lamp):
+    rows = iter_csv_rows(io.BytesIO(b"sku,name,price,description,stock\nLMP-1,Lampe,20.00,,\n"))
+    
+    report = await CatalogService(db).import_products(rows)
+    
+    assert report.updated == 1
+    product = await _reload(db, lamp.id)
+    assert product.description is None
+    assert product.stock == 7
+
+
+@pytest.mark.asyncio
+async def test_explicit_null_clears_nullable_column(db, lamp):
+    rows = iter_ndjson_rows(io.BytesIO(b'{"sku": "LMP-1", "name": "Lampe", "price": "20.00", "sale_price": null}\n'))
+    
+    await CatalogService(db).import_products(rows)
+    
+    product = await _reload(db, lamp.id)
+    assert product.sale_price is None
+    assert product.description == "Lampe de bureau"
+
+
+@pytest.mark.asyncio
+async def test_new_product_gets_schema_defaults(db):
+    rows = iter_csv_rows(io.BytesIO(b"sku,name,price\nLMP-2,Applique,30.00\n"))
+    
+    report = await CatalogService(db).import_products(rows)
+    
+    assert report.created == 1
+    db.expunge_all()
+    product = await CatalogService(db).product_repo.get_by_sku("LMP-2")
+    assert product.stock == 0
+    assert product.is_active is True
+
+
+@pytest.mark.asyncio
+async def test_file_is_parsed_outside_event_loop_thread(db):
+    threads = set()
+    
+    def rows():
+        for row in iter_csv_rows(io.BytesIO(b"sku,name,price\nLMP-2,Applique,30.00\nLMP-3,Spot,12.00\n")):
+            threads.add(threading.get_ident())
+            yield row
+    
+    report = await CatalogService(db).import_products(rows(), batch_size=1)
+    
+    assert report.created == 2
+    assert threads and threading.get_ident() not in threads
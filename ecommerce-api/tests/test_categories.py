@@ -0,0 +1,61 @@
+"""
+Tests de l'arbre des catégories (table de fermeture)
+"""
+
+import pytest
+
+from app.repositories.category import CategoryRepository
+from app.schemas.category import CategoryUpdate
+
+
+async def _tree(db) -> tuple:
+    repo = CategoryRepository(db)
+    maison = await repo.create({"name": "Maison", "slug": "maison"})
+    salon = await repo.create({"name": "Salon", "slug": "salon", "parent_id": maison.id})
+    canapes = await repo.create({"name": "Canapés", "slug": "canapes", "parent_id": salon.id})
+    await db.commit()
+    return repo, maison, salon, canapes
+
+
+async def _path(repo: CategoryRepository, category_id: int) -> list:
+    return [category.slug for category in await repo.get_breadcrumbs(category_id)]
+
+
+@pytest.mark.asyncio
+async def test_update_without_parent_keeps_position(db):
+    repo, maison, salon, canapes = await _tree(db)
+    
+    payload = CategoryUpdate(name="Séjour").model_dump(exclude_unset=True)
+    category = await repo.update(salon.id, payload)
+    await db.commit()
+    
+    assert category.name == "Séjour"
+    assert category.parent_id == maison.id
+    assert await _path(repo, canapes.id) == ["maison", "salon", "canapes"]
+
+
+@pytest.mark.asyncio
+async def test_update_moves_subtree_under_new_parent(db):
+    repo, maison, salon, canapes = await _tree(db)
+    jardin = await repo.create({"name": "Jardin", "slug": "jardin"})
+    
+    payload = CategoryUpdate(parent_id=jardin.id).model_dump(exclude_unset=True)
+    await repo.update(salon.id, payload)
+    await db.commit()
+    
+    assert await _path(repo, canapes.id) == ["jardin", "salon", "canapes"]
+    assert await repo.get_descendant_ids(maison.id) == [maison.id]
+
+
+@pytest.mark.asyncio
+async def test_update_with_null_parent_moves_to_root(db):
+    repo, maison, salon, canapes = await _tree(db)
+    
+    payload = CategoryUpdate(parent_id=None).model_dump(exclude_unset=True)
+    category = await repo.update(salon.id, payload)
+    await db.commit()
+    
+    assert category.parent_id is None
+    assert await _path(repo, salon.id) == ["salon"]
+    assert await _path(repo, canapes.id) == ["salon", "canapes"]
+    assert await repo.get_descendant_ids(maison.id) == [maison.id]
@@ -0,0 +1,227 @@
+"""
+Tests des coupons : calcul des réductions, index en mémoire,
+compteurs d'utilisation et statistiques
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.cache import cache
+from app.models.coupon import Coupon, DiscountType, compile_discount
+from app.models.order import Order, order_coupons
+from app.models.user import User
+from app.repositories.coupon import CouponRepository
+from app.services import coupon_index as coupon_index_module
+from app.services.coupon_index import CouponIndex
+
+
+async def _coupons(db) -> tuple:
+    """Coupon valide, coupon expiré et coupon désactivé"""
+    now = datetime.utcnow()
+    coupons = (
+        Coupon(code="NOEL", discount_type=DiscountType.PERCENTAGE, discount_value=Decimal("10")),
+        Coupon(
+            code="ETE",
+            discount_type=DiscountType.FIXED,
+            discount_value=Decimal("5"),
+            expires_at=now - timedelta(days=1)
+        ),
+        Coupon(code="OFF", discount_type=DiscountType.FIXED, discount_value=Decimal("5"), is_active=False),
+    )
+    db.add_all(coupons)
+    await db.flush()
+    return coupons
+
+
+async def _orders(db, *amounts: tuple) -> list:
+    """Crée des commandes (montant, réduction)"""
+    user = User(first_name="Client", last_name="Test", email="client@example.com", password_hash="x")
+    db.add(user)
+    await db.flush()
+    
+    orders = [
+        Order(user_id=user.id, total_amount=Decimal(total), discount_amount=Decimal(discount))
+        for total, discount in amounts
+    ]
+    db.add_all(orders)
+    await db.flush()
+    return orders
+
+
+# ===== Calcul des réductions =====
+def test_percentage_discount_rounds_half_up_to_the_cent():
+    discount = compile_discount(DiscountType.PERCENTAGE, Decimal("10"))
+    
+    # 0.045 : arrondi bancaire donnerait 0.04
+    assert discount(Decimal("0.45")) == Decimal("0.05")
+    assert discount(Decimal("12.34")) == Decimal("1.23")
+    assert discount(Decimal("12.35")) == Decimal("1.24")
+    
+    # Jamais plus que le montant
+    assert compile_discount(DiscountType.PERCENTAGE, Decimal("150"))(Decimal("10.00")) == Decimal("10.00")
+
+
+def test_fixed_discount_is_capped_at_order_amount():
+    discount = compile_discount(DiscountType.FIXED, Decimal("20.00"))
+    
+    assert discount(Decimal("50.00")) == Decimal("20.00")
+    assert discount(Decimal("15.00")) == Decimal("15.00")
+
+
+def test_no_discount_below_minimum_order_amount():
+    percentage = compile_discount(DiscountType.PERCENTAGE, Decimal("10"), Decimal("30.00"))
+    fixed = compile_discount(DiscountType.FIXED, Decimal("5.00"), Decimal("30.00"))
+    
+    assert percentage(Decimal("29.99")) == Decimal("0")
+    assert fixed(Decimal("29.99")) == Decimal("0")
+    assert percentage(Decimal("30.00")) == Decimal("3.00")
+    assert fixed(Decimal("30.00")) == Decimal("5.00")
+
+
+def test_invalid_coupon_gives_no_discount():
+    coupon = Coupon(
+        code="OFF",
+        discount_type=DiscountType.FIXED,
+        discount_value=Decimal("5.00"),
+        is_active=False
+    )
+    
+    assert coupon.calculate_discount(Decimal("50.00")) == Decimal("0")
+
+
+# ===== Index en mémoire =====
+async def _index_coupon(db) -> Coupon:
+    coupon = await CouponRepository(db).create({
+        "code": "NOEL",
+        "discount_type": DiscountType.PERCENTAGE,
+        "discount_value": Decimal("10")
+    })
+    await db.commit()
+    await cache.flush_pending(db)
+    return coupon
+
+
+@pytest.mark.asyncio
+async def test_index_reloads_when_namespace_version_changes(db, session_maker, monkeypatch):
+    monkeypatch.setattr(coupon_index_module, "VERSION_CHECK_INTERVAL", 0)
+    coupon = await _index_coupon(db)
+    index = CouponIndex(ttl=300, session_maker=session_maker)
+    
+    rule = await index.get(" noel ")
+    assert rule.id == coupon.id
+    assert rule.calculate_discount(Decimal("50.00")) == Decimal("5.00")
+    
+    # Écriture par le repository : version de l'espace "coupons" incrémentée
+    await CouponRepository(db).update(coupon.id, {"discount_value": Decimal("20")})
+    await db.commit()
+    await cache.flush_pending(db)
+    
+    rule = await index.get("NOEL")
+    assert rule.calculate_discount(Decimal("50.00")) == Decimal("10.00")
+
+
+@pytest.mark.asyncio
+async def test_index_reloads_when_ttl_expires(db, session_maker, monkeypatch):
+    monkeypatch.setattr(coupon_index_module, "VERSION_CHECK_INTERVAL", 0)
+    coupon = await _index_coupon(db)
+    index = CouponIndex(ttl=300, session_maker=session_maker)
+    assert await index.load() == 1
+    
+    # Écriture hors repository : version inchangée, l'index reste en place
+    await db.execute(update(Coupon).where(Coupon.id == coupon.id).values(is_active=False))
+    await db.commit()
+    
+    assert (await index.validate("NOEL"))[0] is True
+    
+    index.ttl = 0
+    is_valid, rule, error = await index.validate("NOEL")
+    assert not is_valid
+    assert rule.id == coupon.id
+    assert error == "Ce code promo n'est plus actif"
+
+
+# ===== Compteurs d'utilisation =====
+@pytest.mark.asyncio
+async def test_record_usage_links_order_and_updates_counters(db):
+    noel, _, _ = await _coupons(db)
+    first, second = await _orders(db, ("50.00", "5.00"), ("25.00", "2.50"))
+    repo = CouponRepository(db)
+    
+    await repo.record_usage(noel.id, first.id, Decimal("5.00"))
+    await repo.record_usage(noel.id, second.id, Decimal("2.50"))
+    await db.commit()
+    
+    links = await db.execute(
+        select(order_coupons.c.order_id).where(order_coupons.c.coupon_id == noel.id)
+    )
+    assert sorted(links.scalars().all()) == sorted([first.id, second.id])
+    
+    await db.refresh(noel)
+    assert noel.usage_count == 2
+    assert noel.total_discount == Decimal("7.50")
+
+
+@pytest.mark.asyncio
+async def test_usage_stats_aggregate_linked_orders(db):
+    noel, ete, _ = await _coupons(db)
+    orders = await _orders(db, ("50.00", "5.00"), ("25.00", "2.50"), ("10.00", "1.00"))
+    repo = CouponRepository(db)
+    
+    for order in orders:
+        await repo.record_usage(noel.id, order.id, order.discount_amount)
+    await db.commit()
+    
+    # Moyenne 85 / 3 arrondie au centime
+    assert await repo.get_usage_stats(noel.id) == (3, Decimal("8.50"), Decimal("28.33"))
+    assert await repo.get_usage_stats(ete.id) == (0, Decimal("0"), Decimal("0.00"))
+
+
+@pytest.mark.asyncio
+async def test_global_stats_count_active_and_valid_coupons(db):
+    noel, ete, _ = await _coupons(db)
+    first, second = await _orders(db, ("50.00", "5.00"), ("25.00", "2.50"))
+    repo = CouponRepository(db)
+    
+    await repo.record_usage(noel.id, first.id, Decimal("5.00"))
+    await repo.record_usage(ete.id, second.id, Decimal("2.50"))
+    await db.commit()
+    
+    # Total, actifs (NOEL, ETE), valides (NOEL), utilisations, réductions
+    assert await repo.get_global_stats() == (3, 2, 1, 2, Decimal("7.50"))
+
+
+@pytest.mark.asyncio
+async def test_reconcile_rewrites_only_drifted_coupons(db):
+    noel, ete, off = await _coupons(db)
+    first, second = await _orders(db, ("50.00", "5.00"), ("25.00", "2.50"))
+    repo = CouponRepository(db)
+    
+    await repo.record_usage(noel.id, first.id, Decimal("5.00"))
+    await repo.record_usage(ete.id, second.id, Decimal("2.50"))
+    await db.commit()
+    
+    # Compteurs déjà justes : rien à réécrire
+    assert await repo.reconcile_usage_counters() == 0
+    
+    # Écart injecté sur deux coupons
+    await db.execute(
+        update(Coupon)
+        .where(Coupon.id.in_([noel.id, off.id]))
+        .values(usage_count=Coupon.usage_count + 4, total_discount=Decimal("99.00"))
+    )
+    await db.commit()
+    
+    assert await repo.reconcile_usage_counters() == 2
+    await db.commit()
+    
+    result = await db.execute(
+        select(Coupon.code, Coupon.usage_count, Coupon.total_discount).order_by(Coupon.code)
+    )
+    assert result.all() == [
+        ("ETE", 1, Decimal("2.50")),
+        ("NOEL", 1, Decimal("5.00")),
+        ("OFF", 0, Decimal("0.00")),
+    ]
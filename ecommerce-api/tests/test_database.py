@@ -0,0 +1,273 @@
+"""
+Tests du routage des lectures vers les réplicas et de la libération
+des sessions par DatabaseRoute
+Bases SQLite en mémoire distinctes pour le primaire et le réplica
+"""
+
+import pytest
+import pytest_asyncio
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel, field_validator
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+from app.api.dependencies import DatabaseDep, DatabaseRoute, ReadDatabaseDep
+from app.core import database
+from app.core.cache import cache, MemoryCacheBackend
+from app.core.database import (
+    ReplicaRouter,
+    SESSION_RELEASED_KEY,
+    create_session_maker,
+    get_read_db,
+    release_session,
+    _track_session
+)
+
+
+def _request(authorization: str = None, host: str = "10.0.0.1") -> Request:
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": headers,
+        "client": (host, 1234),
+    })
+
+
+def _sqlite_engine(url: str = "sqlite+aiosqlite:///:memory:"):
+    return create_async_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+def _count_checkouts(engine) -> list:
+    checkouts = []
+    event.listen(engine.sync_engine, "checkout", lambda *args: checkouts.append(1))
+    return checkouts
+
+
+@pytest_asyncio.fixture
+async def replica_engines():
+    engines = [_sqlite_engine(), _sqlite_engine()]
+    
+    yield engines
+    
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.fixture
+def router(session_maker, replica_engines):
+    return ReplicaRouter(
+        session_maker,
+        [create_session_maker(engine) for engine in replica_engines],
+        sticky_seconds=5,
+        retry_seconds=30
+    )
+
+
+@pytest.mark.asyncio
+async def test_read_session_connects_on_first_query(router, replica_engines):
+    checkouts = _count_checkouts(replica_engines[0])
+    
+    session, replica = await router.open_read_session(_request())
+    
+    assert replica == 0
+    assert session.bind is replica_engines[0]
+    assert checkouts == []
+    
+    await session.execute(text("SELECT 1"))
+    assert checkouts == [1]
+    
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_round_robin_between_replicas(router):
+    replicas = []
+    for _ in range(3):
+        session, replica = await router.open_read_session(_request())
+        replicas.append(replica)
+        await session.close()
+    
+    assert replicas == [0, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_without_replicas_reads_from_primary(session_maker, engine):
+    router = ReplicaRouter(session_maker, [])
+    
+    session, replica = await router.open_read_session(_request())
+    
+    assert replica is None
+    assert session.bind is engine
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_client_reads_primary_after_write(router):
+    writer = _request(authorization="Bearer writer")
+    await router.mark_write(writer)
+    
+    session, replica = await router.open_read_session(writer)
+    assert replica is None
+    await session.close()
+    
+    session, replica = await router.open_read_session(_request(authorization="Bearer other"))
+    assert replica is not None
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_sticky_marker_follows_cache_backend(router):
+    request = _request(authorization="Bearer writer")
+    
+    backend = MemoryCacheBackend()
+    cache.use_backend(backend)
+    await router.mark_write(request)
+    
+    assert any(key.startswith(router.prefix) for key in backend._store)
+    assert await router.is_sticky(request)
+    
+    # Nouveau backend : la marque précédente n'y existe pas
+    cache.use_backend(MemoryCacheBackend())
+    assert not await router.is_sticky(request)
+
+
+@pytest.mark.asyncio
+async def test_replica_down_falls_back_to_primary(session_maker, replica_engines):
+    router = ReplicaRouter(session_maker, [create_session_maker(replica_engines[0])], retry_seconds=30)
+    router.mark_down(0)
+    
+    session, replica = await router.open_read_session(_request())
+    assert replica is None
+    await session.close()
+    
+    # Délai de réessai écoulé : le réplica est de nouveau utilisé
+    router.retry_seconds = 0
+    router.mark_down(0)
+    session, replica = await router.open_read_session(_request())
+    assert replica == 0
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_is_marked_down(monkeypatch, session_maker):
+    dead_engine = _sqlite_engine("sqlite+aiosqlite:////nonexistent-directory/replica.db")
+    router = ReplicaRouter(session_maker, [create_session_maker(dead_engine)])
+    monkeypatch.setattr(database, "replica_router", router)
+    
+    dependency = get_read_db(_request())
+    session = await dependency.__anext__()
+    
+    with pytest.raises(OperationalError) as error:
+        await session.execute(text("SELECT 1"))
+    with pytest.raises(OperationalError):
+        await dependency.athrow(error.value)
+    
+    session, replica = await router.open_read_session(_request())
+    assert replica is None
+    await session.close()
+    await dead_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_released_write_session_makes_reads_sticky(monkeypatch, router, session_maker):
+    monkeypatch.setattr(database, "replica_router", router)
+    request = _request(authorization="Bearer writer")
+    
+    session = session_maker()
+    _track_session(session, request)
+    await session.execute(text("UPDATE products SET stock = stock"))
+    await release_session(session)
+    
+    read_session, replica = await router.open_read_session(request)
+    assert replica is None
+    await read_session.close()
+
+
+# ===== DatabaseRoute =====
+class SessionState(BaseModel):
+    """Réponse dont la validation relève l'état de la session de la requête"""
+    released: bool
+    
+    @field_validator("released", mode="before")
+    @classmethod
+    def _released_at_serialization(cls, session):
+        return bool(session.info.get(SESSION_RELEASED_KEY))
+
+
+@pytest_asyncio.fixture
+async def route_client(monkeypatch, session_maker):
+    monkeypatch.setattr(database, "async_session_maker", session_maker)
+    monkeypatch.setattr(database, "replica_router", ReplicaRouter(session_maker, []))
+    
+    router = APIRouter(route_class=DatabaseRoute)
+    
+    @router.get("/write", response_model=SessionState)
+    async def write(db: DatabaseDep):
+        await db.execute(text("UPDATE products SET stock = stock"))
+        return {"released": db}
+    
+    @router.get("/read", response_model=SessionState)
+    async def read(db: DatabaseDep):
+        await db.execute(text("SELECT 1"))
+        return {"released": db}
+    
+    @router.get("/replica", response_model=SessionState)
+    async def replica(db: ReadDatabaseDep):
+        await db.execute(text("SELECT 1"))
+        return {"released": db}
+    
+    app = FastAPI()
+    app.include_router(router)
+    
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def _count_commits(engine) -> list:
+    commits = []
+    event.listen(engine.sync_engine, "commit", lambda *args: commits.append(1))
+    return commits
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/write", "/read", "/replica"])
+async def test_sessions_are_released_before_serialization(route_client, path):
+    response = await route_client.get(path)
+    
+    assert response.status_code == 200
+    assert response.json() == {"released": True}
+
+
+@pytest.mark.asyncio
+async def test_only_sessions_that_wrote_are_committed(route_client, engine):
+    commits = _count_commits(engine)
+    
+    await route_client.get("/replica")
+    await route_client.get("/read")
+    assert commits == []
+    
+    await route_client.get("/write")
+    assert commits == [1]
+
+
+def test_database_route_wraps_coroutine_endpoints_once():
+    router = APIRouter(route_class=DatabaseRoute)
+    
+    @router.get("/")
+    async def endpoint():
+        return {}
+    
+    route = router.routes[0]
+    assert route.endpoint.releases_sessions
+    assert route.endpoint.__wrapped__ is endpoint
+    
+    # Route réenregistrée (include_router) : pas de double enveloppe
+    parent = APIRouter(route_class=DatabaseRoute)
+    parent.include_router(router)
+    assert parent.routes[0].endpoint.__wrapped__ is endpoint
@@ -0,0 +1,285 @@
+"""
+Tests de la file d'emails et du dispatcher
+Serveur SMTP local (aiosmtpd) à la place du relais SMTP réel
+"""
+
+import asyncio
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from aiosmtpd.controller import Controller
+from sqlalchemy import update
+
+from app.models.email_outbox import EmailOutbox, EmailStatus
+from app.repositories.email_outbox import EmailOutboxRepository
+from app.services.email_dispatcher import (
+    EmailDispatcher,
+    SMTPConnectionPool,
+    SENDING_LEASE,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY
+)
+
+
+class RecordingHandler:
+    """Serveur SMTP de test : enregistre les messages, refuse certains destinataires"""
+    
+    def __init__(self):
+        self.messages = []
+        self.refused = set()
+    
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refused:
+            return "550 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+    
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    
+    yield controller
+    
+    controller.stop()
+
+
+def _pool(port: int) -> SMTPConnectionPool:
+    return SMTPConnectionPool(size=2, hostname="127.0.0.1", port=port, start_tls=False, timeout=5)
+
+
+@pytest_asyncio.fixture
+async def dispatcher(smtp_server, session_maker):
+    dispatcher = EmailDispatcher(
+        _pool(smtp_server.port),
+        batch_size=10,
+        max_attempts=3,
+        poll_interval=0.01,
+        session_maker=session_maker
+    )
+    
+    yield dispatcher
+    
+    await dispatcher.stop()
+
+
+async def _enqueue(session_maker, *recipients: str) -> list:
+    async with session_maker() as session:
+        repo = EmailOutboxRepository(session)
+        ids = [
+            (await repo.enqueue(recipient, "Commande confirmée", "<p>Merci</p>", "Merci")).id
+            for recipient in recipients
+        ]
+        await session.commit()
+    return ids
+
+
+async def _load(session_maker, message_id: int) -> EmailOutbox:
+    async with session_maker() as session:
+        return await session.get(EmailOutbox, message_id)
+
+
+async def _make_due(session_maker, message_id: int) -> None:
+    async with session_maker() as session:
+        await session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == message_id)
+            .values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        await session.commit()
+
+
+# ===== Envoi =====
+@pytest.mark.asyncio
+async def test_dispatch_sends_queued_emails(dispatcher, smtp_server, session_maker):
+    ids = await _enqueue(session_maker, "a@example.com", "b@example.com", "c@example.com")
+    
+    assert await dispatcher.dispatch_once() == 3
+    
+    assert sorted(envelope.rcpt_tos[0] for envelope in smtp_server.handler.messages) == [
+        "a@example.com", "b@example.com", "c@example.com"
+    ]
+    for message_id in ids:
+        message = await _load(session_maker, message_id)
+        assert message.status == EmailStatus.SENT
+        assert message.attempts == 1
+        assert message.sent_at is not None
+    
+    assert await dispatcher.queue_depth() == 0
+    assert dispatcher.sent == 3
+
+
+@pytest.mark.asyncio
+async def test_new_email_is_claimable_immediately(session_maker):
+    [message_id] = await _enqueue(session_maker, "a@example.com")
+    
+    async with session_maker() as session:
+        claimed = await EmailOutboxRepository(session).claim_batch(10, SENDING_LEASE)
+    
+    assert [message.id for message in claimed] == [message_id]
+
+
+# ===== Retry / backoff =====
+def test_retry_delay_is_exponential_and_capped():
+    assert EmailDispatcher.retry_delay(1) == timedelta(seconds=RETRY_BASE_DELAY)
+    assert EmailDispatcher.retry_delay(2) == timedelta(seconds=RETRY_BASE_DELAY * 2)
+    assert EmailDispatcher.retry_delay(3) == timedelta(seconds=RETRY_BASE_DELAY * 4)
+    assert EmailDispatcher.retry_delay(30) == timedelta(seconds=RETRY_MAX_DELAY)
+
+
+@pytest.mark.asyncio
+async def test_refused_recipient_is_retried_with_backoff(dispatcher, smtp_server, session_maker):
+    smtp_server.handler.refused.add("bad@example.com")
+    good_id, bad_id = await _enqueue(session_maker, "good@example.com", "bad@example.com")
+    
+    before = datetime.utcnow()
+    await dispatcher.dispatch_once()
+    
+    assert (await _load(session_maker, good_id)).status == EmailStatus.SENT
+    
+    message = await _load(session_maker, bad_id)
+    assert message.status == EmailStatus.PENDING
+    assert message.attempts == 1
+    assert message.last_error
+    assert message.next_attempt_at >= before + timedelta(seconds=RETRY_BASE_DELAY)
+    
+    # Pas encore dû : rien n'est repris
+    assert await dispatcher.dispatch_once() == 0
+    
+    await _make_due(session_maker, bad_id)
+    before = datetime.utcnow()
+    assert await dispatcher.dispatch_once() == 1
+    
+    message = await _load(session_maker, bad_id)
+    assert message.attempts == 2
+    assert message.next_attempt_at >= before + timedelta(seconds=RETRY_BASE_DELAY * 2)
+
+
+@pytest.mark.asyncio
+async def test_email_fails_after_max_attempts(dispatcher, smtp_server, session_maker):
+    smtp_server.handler.refused.add("bad@example.com")
+    [message_id] = await _enqueue(session_maker, "bad@example.com")
+    
+    for _ in range(dispatcher.max_attempts):
+        await _make_due(session_maker, message_id)
+        await dispatcher.dispatch_once()
+    
+    message = await _load(session_maker, message_id)
+    assert message.status == EmailStatus.FAILED
+    assert message.attempts == dispatcher.max_attempts
+    assert dispatcher.failed == dispatcher.max_attempts
+    assert await dispatcher.queue_depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_smtp_outage_reschedules_whole_batch(session_maker):
+    dispatcher = EmailDispatcher(
+        _pool(_free_port()),
+        batch_size=10,
+        max_attempts=3,
+        session_maker=session_maker
+    )
+    ids = await _enqueue(session_maker, "a@example.com", "b@example.com")
+    
+    assert await dispatcher.dispatch_once() == 2
+    
+    for message_id in ids:
+        message = await _load(session_maker, message_id)
+        assert message.status == EmailStatus.PENDING
+        assert message.attempts == 1
+        assert message.next_attempt_at > datetime.utcnow()
+    
+    await dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_connection_between_batches(dispatcher, smtp_server, session_maker):
+    await _enqueue(session_maker, "a@example.com")
+    await dispatcher.dispatch_once()
+    idle = list(dispatcher.pool._idle)
+    
+    await _enqueue(session_maker, "b@example.com")
+    await dispatcher.dispatch_once()
+    
+    assert len(idle) == 1
+    assert dispatcher.pool._idle == idle
+    assert len(smtp_server.handler.messages) == 2
+
+
+# ===== Bail (lease) =====
+@pytest.mark.asyncio
+async def test_claim_takes_lease_on_claimed_emails(session_maker):
+    [message_id] = await _enqueue(session_maker, "a@example.com")
+    
+    async with session_maker() as session:
+        await EmailOutboxRepository(session).claim_batch(10, SENDING_LEASE)
+        await session.commit()
+    
+    message = await _load(session_maker, message_id)
+    assert message.status == EmailStatus.SENDING
+    assert message.attempts == 1
+    assert message.next_attempt_at > datetime.utcnow() + SENDING_LEASE - timedelta(minutes=1)
+    
+    # Bail en cours : un autre dispatcher ne reprend pas l'email
+    async with session_maker() as session:
+        assert await EmailOutboxRepository(session).claim_batch(10, SENDING_LEASE) == []
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed(dispatcher, smtp_server, session_maker):
+    [message_id] = await _enqueue(session_maker, "a@example.com")
+    
+    # Dispatcher interrompu après la réservation
+    async with session_maker() as session:
+        await EmailOutboxRepository(session).claim_batch(10, SENDING_LEASE)
+        await session.commit()
+    
+    assert await dispatcher.dispatch_once() == 0
+    
+    await _make_due(session_maker, message_id)
+    assert await dispatcher.dispatch_once() == 1
+    
+    message = await _load(session_maker, message_id)
+    assert message.status == EmailStatus.SENT
+    assert message.attempts == 2
+    assert len(smtp_server.handler.messages) == 1
+
+
+# ===== SKIP LOCKED (MySQL) =====
+@pytest.mark.asyncio
+async def test_concurrent_claims_skip_locked_rows(mysql_session_maker):
+    await _enqueue(mysql_session_maker, *(f"user{i}@example.com" for i in range(6)))
+    
+    async with mysql_session_maker() as first, mysql_session_maker() as second:
+        # Premier dispatcher : lignes verrouillées jusqu'au commit
+        claimed_first = await EmailOutboxRepository(first).claim_batch(4, SENDING_LEASE)
+        
+        # Second dispatcher : ne bloque pas, prend les lignes restantes
+        claimed_second = await asyncio.wait_for(
+            EmailOutboxRepository(second).claim_batch(4, SENDING_LEASE),
+            timeout=5
+        )
+        
+        first_ids = {message.id for message in claimed_first}
+        second_ids = {message.id for message in claimed_second}
+        
+        assert len(first_ids) == 4
+        assert len(second_ids) == 2
+        assert first_ids.isdisjoint(second_ids)
+        
+        await first.commit()
+        await second.commit()
@@ -0,0 +1,90 @@
+"""
+Tests des métriques Prometheus (exposition texte, étiquetage des requêtes)
+"""
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.core.metrics import HTTP_REQUESTS, MetricsRegistry
+from app.core.rate_limit import rate_limiter
+from app.main import app
+
+
+# ===== Exposition texte =====
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latence", ["route"], buckets=(0.125, 0.5, 1.0))
+    
+    # Borne incluse (le = "inférieur ou égal")
+    for value in (0.0625, 0.125, 0.25, 2.0):
+        histogram.observe(value, "/a")
+    histogram.observe(0.75, "/b")
+    
+    assert histogram.render() == [
+        "# HELP latency_seconds Latence",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.125"} 2',
+        'latency_seconds_bucket{route="/a",le="0.5"} 3',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 2.4375',
+        'latency_seconds_count{route="/a"} 4',
+        'latency_seconds_bucket{route="/b",le="0.125"} 0',
+        'latency_seconds_bucket{route="/b",le="0.5"} 0',
+        'latency_seconds_bucket{route="/b",le="1.0"} 1',
+        'latency_seconds_bucket{route="/b",le="+Inf"} 1',
+        'latency_seconds_sum{route="/b"} 0.75',
+        'latency_seconds_count{route="/b"} 1',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = MetricsRegistry().counter("errors_total", "Erreurs", ["message"])
+    
+    counter.inc('say "hi"\\\nbye')
+    
+    assert counter.render()[-1] == 'errors_total{message="say \\"hi\\"\\\\\\nbye"} 1'
+
+
+def test_registry_renders_all_metrics_after_collectors():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Tâches")
+    gauge = registry.gauge("pool_size", "Taille", ["pool"])
+    registry.add_collector(lambda: gauge.set(5, "primary"))
+    
+    counter.inc()
+    counter.inc(amount=2)
+    
+    assert registry.render() == "\n".join([
+        "# HELP jobs_total Tâches",
+        "# TYPE jobs_total counter",
+        "jobs_total 3",
+        "# HELP pool_size Taille",
+        "# TYPE pool_size gauge",
+        'pool_size{pool="primary"} 5',
+    ]) + "\n"
+
+
+# ===== Étiquetage des requêtes HTTP =====
+@pytest.mark.asyncio
+async def test_requests_are_labelled_by_route_template(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "enabled", False)
+    template = ("GET", f"{settings.API_V1_PREFIX}/products/{{product_id}}", "422")
+    unmatched = ("GET", "unmatched", "404")
+    before = {key: HTTP_REQUESTS._values.get(key, 0) for key in (template, unmatched)}
+    
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        # IDs invalides : rejetés à la validation, sans accès à la base
+        for product_id in ("a", "b", "c"):
+            assert (await client.get(f"{settings.API_V1_PREFIX}/products/{product_id}")).status_code == 422
+        assert (await client.get("/introuvable/42")).status_code == 404
+        
+        response = await client.get("/metrics")
+    
+    assert HTTP_REQUESTS._values[template] == before[template] + 3
+    assert HTTP_REQUESTS._values[unmatched] == before[unmatched] + 1
+    assert not any("/products/a" in labels[1] for labels in HTTP_REQUESTS._values)
+    
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert f'route="{template[1]}"' in response.text
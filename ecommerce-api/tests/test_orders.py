@@ -1 +1,313 @@
+"""
+Tests des commandes : réservation du stock sans survente au checkout,
+changement de statut groupé
+"""
 
+import asyncio
+from decimal import Decimal
+from typing import List, Optional
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, func, select
+
+from app.core import database
+from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.security import create_access_token
+from app.main import app
+from app.models.address import Address, AddressType
+from app.models.cart import Cart, CartItem
+from app.models.email_outbox import EmailOutbox
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product import Product
+from app.models.user import User, UserRole
+from app.schemas.order import OrderFromCart
+from app.services.order import OrderService
+
+
+async def _seed(session_maker, stocks: List[int], buyers: int) -> tuple:
+    """
+    Crée des produits et `buyers` clients ayant chacun 1 exemplaire de
+    chaque produit dans leur panier
+    
+    Returns:
+        (IDs des produits, [(ID client, ID adresse)])
+    """
+    async with session_maker() as session:
+        products = [
+            Product(name=f"Produit {i}", slug=f"produit-{i}", price=Decimal("10.00"), stock=stock)
+            for i, stock in enumerate(stocks)
+        ]
+        session.add_all(products)
+        await session.flush()
+        
+        customers = []
+        for i in range(buyers):
+            user = User(
+                first_name="Client",
+                last_name=str(i),
+                email=f"client{i}@example.com",
+                password_hash="x"
+            )
+            session.add(user)
+            await session.flush()
+            
+            address = Address(
+                user_id=user.id,
+                type=AddressType.SHIPPING,
+                address_line1="1 rue de la Paix",
+                city="Paris",
+                country="FR"
+            )
+            cart = Cart(user_id=user.id)
+            session.add_all([address, cart])
+            await session.flush()
+            
+            session.add_all([
+                CartItem(cart_id=cart.id, product_id=product.id, quantity=1, price=product.price)
+                for product in products
+            ])
+            customers.append((user.id, address.id))
+        
+        await session.commit()
+        return [product.id for product in products], customers
+
+
+async def _checkout(session_maker, user_id: int, address_id: int) -> Optional[HTTPException]:
+    """Passe commande dans sa propre transaction ; retourne l'erreur éventuelle"""
+    async with session_maker() as session:
+        try:
+            await OrderService(session).create_order_from_cart(
+                user_id,
+                OrderFromCart(billing_address_id=address_id, shipping_address_id=address_id)
+            )
+        except HTTPException as e:
+            await session.rollback()
+            return e
+        
+        await session.commit()
+        return None
+
+
+async def _stocks(session_maker, product_ids: List[int]) -> List[int]:
+    async with session_maker() as session:
+        result = await session.execute(
+            select(Product.id, Product.stock).where(Product.id.in_(product_ids))
+        )
+        stocks = dict(result.all())
+        return [stocks[product_id] for product_id in product_ids]
+
+
+async def _order_count(session_maker) -> int:
+    async with session_maker() as session:
+        return (await session.execute(select(func.count(Order.id)))).scalar_one()
+
+
+def _assert_shortage(error: HTTPException) -> None:
+    assert error.status_code == 400
+    assert "Stock insuffisant" in error.detail
+
+
+@pytest.mark.asyncio
+async def test_checkout_beyond_stock_is_refused(session_maker):
+    [product_id], customers = await _seed(session_maker, [2], buyers=3)
+    
+    errors = [await _checkout(session_maker, *customer) for customer in customers]
+    
+    assert errors[:2] == [None, None]
+    _assert_shortage(errors[2])
+    assert await _stocks(session_maker, [product_id]) == [0]
+    assert await _order_count(session_maker) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_checkouts_never_oversell(mysql_session_maker):
+    stock, buyers = 3, 12
+    [product_id], customers = await _seed(mysql_session_maker, [stock], buyers)
+    
+    errors = await asyncio.gather(*(
+        _checkout(mysql_session_maker, *customer) for customer in customers
+    ))
+    
+    winners = [error for error in errors if error is None]
+    losers = [error for error in errors if error is not None]
+    
+    assert len(winners) == stock
+    assert len(losers) == buyers - stock
+    for error in losers:
+        _assert_shortage(error)
+    
+    assert await _stocks(mysql_session_maker, [product_id]) == [0]
+    assert await _order_count(mysql_session_maker) == stock
+
+
+@pytest.mark.asyncio
+async def test_concurrent_checkouts_reserve_all_or_nothing(mysql_session_maker):
+    # Le second produit limite les commandes : le premier ne doit pas être décrémenté pour les perdants
+    product_ids, customers = await _seed(mysql_session_maker, [5, 2], buyers=6)
+    
+    errors = await asyncio.gather(*(
+        _checkout(mysql_session_maker, *customer) for customer in customers
+    ))
+    
+    assert sum(1 for error in errors if error is None) == 2
+    for error in errors:
+        if error is not None:
+            _assert_shortage(error)
+    
+    assert await _stocks(mysql_session_maker, product_ids) == [3, 0]
+
+
+# ===== Changement de statut groupé =====
+async def _seed_orders(session_maker) -> tuple:
+    """
+    Commandes d'un même client sur deux produits :
+    en attente (A x2, B x1), payée (A x3), expédiée (A x1)
+    
+    Returns:
+        (IDs des produits, IDs des commandes)
+    """
+    async with session_maker() as session:
+        products = [
+            Product(name="Produit A", slug="produit-a", price=Decimal("10.00"), stock=0),
+            Product(name="Produit B", slug="produit-b", price=Decimal("10.00"), stock=5),
+        ]
+        user = User(first_name="Client", last_name="Test", email="client@example.com", password_hash="x")
+        session.add_all([*products, user])
+        await session.flush()
+        
+        lines = [
+            (OrderStatus.PENDING, [(products[0], 2), (products[1], 1)]),
+            (OrderStatus.PAID, [(products[0], 3)]),
+            (OrderStatus.SHIPPED, [(products[0], 1)]),
+        ]
+        orders = []
+        for order_status, items in lines:
+            order = Order(user_id=user.id, status=order_status, total_amount=Decimal("10.00"))
+            session.add(order)
+            await session.flush()
+            session.add_all([
+                OrderItem(order_id=order.id, product_id=product.id, quantity=quantity, unit_price=product.price)
+                for product, quantity in items
+            ])
+            orders.append(order.id)
+        
+        await session.commit()
+        return [product.id for product in products], orders
+
+
+async def _statuses(session_maker, order_ids: List[int]) -> List[OrderStatus]:
+    async with session_maker() as session:
+        result = await session.execute(select(Order.id, Order.status).where(Order.id.in_(order_ids)))
+        statuses = dict(result.all())
+        return [statuses[order_id] for order_id in order_ids]
+
+
+def _statements(engine) -> list:
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    return statements
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_rejects_per_order_and_applies_the_rest(session_maker):
+    _, (pending, paid, shipped) = await _seed_orders(session_maker)
+    
+    async with session_maker() as session:
+        report, recipients = await OrderService(session).bulk_update_order_status(
+            [999999, pending, paid, shipped],
+            OrderStatus.SHIPPED
+        )
+        await session.commit()
+    
+    assert report.updated == 1
+    assert [(rejection.order_id, rejection.reason) for rejection in report.rejected] == [
+        (999999, "Commande non trouvée"),
+        (pending, "Transition pending -> shipped non autorisée"),
+        (shipped, "Transition shipped -> shipped non autorisée"),
+    ]
+    assert [order.id for _, order in recipients] == [paid]
+    assert await _statuses(session_maker, [pending, paid, shipped]) == [
+        OrderStatus.PENDING,
+        OrderStatus.SHIPPED,
+        OrderStatus.SHIPPED,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_cancel_collapses_duplicates_and_releases_stock_once(engine, session_maker):
+    product_ids, (pending, paid, shipped) = await _seed_orders(session_maker)
+    statements = _statements(engine)
+    
+    async with session_maker() as session:
+        report, recipients = await OrderService(session).bulk_update_order_status(
+            [pending, paid, pending, shipped, paid],
+            OrderStatus.CANCELLED
+        )
+        await session.commit()
+    
+    assert report.updated == 2
+    assert [rejection.order_id for rejection in report.rejected] == [shipped]
+    assert [order.id for _, order in recipients] == [pending, paid]
+    
+    # A : 2 + 3 restitués, B : 1 ; un seul UPDATE pour tous les produits
+    assert await _stocks(session_maker, product_ids) == [5, 6]
+    assert sum(1 for statement in statements if statement.startswith("UPDATE products")) == 1
+
+
+@pytest_asyncio.fixture
+async def staff_client(monkeypatch, session_maker):
+    # Sessions des dépendances ouvertes sur la base de test
+    monkeypatch.setattr(database, "async_session_maker", session_maker)
+    monkeypatch.setattr(rate_limiter, "enabled", False)
+    
+    async with session_maker() as session:
+        admin = User(
+            first_name="Admin",
+            last_name="Test",
+            email="admin@example.com",
+            password_hash="x",
+            role=UserRole.ADMIN
+        )
+        session.add(admin)
+        await session.commit()
+    
+    token = create_access_token({"sub": str(admin.id)})
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+        headers={"Authorization": f"Bearer {token}"}
+    ) as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_route_queues_notifications_in_one_batch(engine, session_maker, staff_client):
+    _, (pending, paid, shipped) = await _seed_orders(session_maker)
+    statements = _statements(engine)
+    
+    response = await staff_client.post(
+        f"{settings.API_V1_PREFIX}/orders/bulk/status",
+        json={"order_ids": [pending, paid, shipped, 999999], "status": "cancelled"}
+    )
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 2
+    assert body["notifications_queued"] == 2
+    assert [rejection["order_id"] for rejection in body["rejected"]] == [shipped, 999999]
+    
+    assert sum(1 for statement in statements if statement.startswith("INSERT INTO email_outbox")) == 1
+    async with session_maker() as session:
+        result = await session.execute(select(EmailOutbox.to_email, EmailOutbox.subject).order_by(EmailOutbox.id))
+        assert result.all() == [
+            ("client@example.com", f"Votre commande #{pending} a été annulée"),
+            ("client@example.com", f"Votre commande #{paid} a été annulée"),
+        ]
@@ -0,0 +1,167 @@
+"""
+Tests de la pagination par curseur (keyset) des listings produits
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from app.api.dependencies import create_paginated_response
+from app.models.product import Product
+from app.models.user import User
+from app.repositories.product import ProductQuerySpec
+from app.repositories.user import UserRepository
+from app.schemas.product import ProductFilterParams
+from app.services.product import ProductService
+from app.utils.pagination import Cursor
+
+
+SORTS = [
+    (sort_by, sort_order)
+    for sort_by in ("created_at", "price", "name", "stock", "relevance")
+    for sort_order in ("asc", "desc")
+]
+
+
+@pytest_asyncio.fixture
+async def catalog(db):
+    # Valeurs de tri en double : l'ID départage les ex aequo
+    start = datetime(2024, 1, 1, 12, 0, 0)
+    rows = [
+        ("Lampe", "10.50", 3, 0),
+        ("Chaise", "20.00", 0, 1),
+        ("Table", "10.50", 8, 1),
+        ("Bureau", "99.00", 3, 2),
+        ("Tapis", "20.00", 1, 3),
+        ("Miroir", "12.25", 8, 3),
+        ("Vase", "10.50", 0, 4),
+    ]
+    db.add_all([
+        Product(
+            name=name,
+            slug=name.lower(),
+            price=Decimal(price),
+            stock=stock,
+            created_at=start + timedelta(minutes=minutes)
+        )
+        for name, price, stock, minutes in rows
+    ])
+    await db.commit()
+
+
+async def _walk(service: ProductService, filters: ProductFilterParams, page_size: int) -> tuple:
+    """Suit les next_cursor jusqu'à la fin du listing"""
+    ids, cursor, pages = [], None, 0
+    sort_by = ProductService.cursor_field(filters)
+    
+    while True:
+        after = Cursor.decode(cursor) if cursor else None
+        items, total = await service.get_product_page(filters, 0, page_size, after=after)
+        page = create_paginated_response(
+            items=items,
+            total=total,
+            page=1,
+            page_size=page_size,
+            cursor=cursor,
+            sort_by=sort_by
+        )
+        ids.extend(item.id for item in items)
+        pages += 1
+        
+        cursor = page["next_cursor"]
+        if cursor is None:
+            assert not page["has_next"]
+            return ids, pages
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort_by,sort_order", SORTS)
+async def test_cursor_walk_matches_offset_listing(db, catalog, sort_by, sort_order):
+    service = ProductService(db)
+    filters = ProductFilterParams(sort_by=sort_by, sort_order=sort_order)
+    
+    expected, total = await service.get_products(filters, 0, 100)
+    ids, pages = await _walk(service, filters, page_size=3)
+    
+    assert total == 7
+    assert ids == [product.id for product in expected]
+    assert pages == 3
+
+
+@pytest.mark.asyncio
+async def test_cursor_from_another_sort_is_rejected(db, catalog):
+    service = ProductService(db)
+    by_price = ProductFilterParams(sort_by="price", sort_order="asc")
+    
+    items, total = await service.get_product_page(by_price, 0, 3)
+    cursor = create_paginated_response(items, total, 1, 3, sort_by="price")["next_cursor"]
+    
+    with pytest.raises(HTTPException) as error:
+        await service.get_products(
+            ProductFilterParams(sort_by="name", sort_order="asc"),
+            0,
+            3,
+            after=Cursor.decode(cursor)
+        )
+    assert error.value.status_code == 400
+
+
+def test_fulltext_relevance_has_no_cursor():
+    spec = ProductQuerySpec().matching("miroir").sort("relevance")
+    assert spec.keyset_field is None
+    
+    # Sans recherche plein texte, la pertinence retombe sur la date
+    assert ProductQuerySpec().matching("ab").sort("relevance").keyset_field == "created_at"
+    
+    items = [Product(id=i, name="x", created_at=datetime(2024, 1, 1)) for i in range(3)]
+    page = create_paginated_response(items, None, 1, 3, sort_by=None)
+    assert page["next_cursor"] is None
+    assert page["has_next"] is True
+
+
+def test_cursor_round_trip_keeps_value_type():
+    for value in (datetime(2024, 1, 1, 12, 30), Decimal("10.50"), "Lampe", 3):
+        cursor = Cursor(value, 42, "sort")
+        assert Cursor.decode(cursor.encode()) == cursor
+    
+    with pytest.raises(ValueError):
+        Cursor.decode("pas-un-curseur")
+
+
+@pytest.mark.asyncio
+async def test_get_all_rejects_order_by_with_cursor(db):
+    cursor = Cursor(datetime(2024, 1, 1), 1)
+    
+    with pytest.raises(ValueError):
+        await UserRepository(db).get_all(order_by="email", after=cursor)
+    
+    with pytest.raises(ValueError):
+        await UserRepository(db).get_all(after=Cursor(Decimal("1"), 1, "price"))
+
+
+@pytest.mark.asyncio
+async def test_get_all_follows_created_at_cursor(db):
+    start = datetime(2024, 1, 1)
+    db.add_all([
+        User(
+            first_name="Client",
+            last_name=str(i),
+            email=f"client{i}@example.com",
+            password_hash="x",
+            created_at=start + timedelta(minutes=i // 2)
+        )
+        for i in range(5)
+    ])
+    await db.commit()
+    repo = UserRepository(db)
+    
+    first = await repo.get_all(limit=2)
+    rest = await repo.get_all(limit=10, after=Cursor.from_item(first[-1]))
+    
+    assert [user.id for user in first + rest] == [
+        user.id for user in await repo.get_all(limit=10)
+    ]
+    assert len(first + rest) == 5
@@ -1 +1,227 @@
+"""
+Tests des listings produits (pagination avec total) et de la recherche
+(préfixe et FULLTEXT)
+"""
 
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, insert, text
+from sqlalchemy.dialects import mysql
+
+from app.models.product import Product, product_categories
+from app.repositories.category import CategoryRepository
+from app.repositories.product import ProductQuerySpec, ProductRepository
+from app.schemas.product import ProductFilterParams
+from app.utils.pagination import Cursor
+
+
+WORDS = ["lampe", "chaise", "table", "bureau", "tapis", "miroir", "vase", "coussin"]
+
+
+async def _add_products(session, *names_and_skus) -> None:
+    session.add_all([
+        Product(name=name, slug=f"produit-{i}", sku=sku, price=Decimal("10.00"))
+        for i, (name, sku) in enumerate(names_and_skus)
+    ])
+    await session.commit()
+
+
+async def _explain(session, spec: ProductQuerySpec) -> dict:
+    statement = spec.to_query().compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await session.execute(text(f"EXPLAIN {statement}"))
+    return dict(result.mappings().first())
+
+
+# ===== Composition des filtres =====
+def _compile(spec: ProductQuerySpec) -> str:
+    return str(spec.to_query().compile(dialect=mysql.dialect())).lower()
+
+
+def test_filters_compose_into_one_statement():
+    filters = ProductFilterParams(
+        search="miroir",
+        category_id=3,
+        min_price=Decimal("10"),
+        max_price=Decimal("50"),
+        on_sale=True,
+        sort_by="price",
+        sort_order="asc"
+    )
+    sql = _compile(ProductQuerySpec.from_filters(filters))
+    
+    assert sql.count("select") == 2
+    assert "match (products.name, products.description, products.sku) against" in sql
+    assert "category_closure.ancestor_id" in sql
+    assert "products.price >= %s" in sql and "products.price <= %s" in sql
+    assert "products.sale_price is not null" in sql
+    assert "products.is_active" in sql
+    assert sql.endswith("order by products.price asc, products.id asc")
+
+
+@pytest.mark.parametrize("sort_by,sort_order,order_by", [
+    ("name", "desc", "order by products.name desc, products.id desc"),
+    ("stock", "asc", "order by products.stock asc, products.id asc"),
+    ("created_at", "asc", "order by products.created_at asc, products.id asc"),
+    ("inconnu", "asc", "order by products.created_at asc, products.id asc"),
+    (None, "asc", "desc, products.id desc"),
+])
+def test_sort_reaches_order_by(sort_by, sort_order, order_by):
+    filters = ProductFilterParams(search="miroir", sort_by=sort_by, sort_order=sort_order)
+    sql = _compile(ProductQuerySpec.from_filters(filters))
+    
+    assert sql.endswith(order_by)
+    if sort_by is None:
+        # Recherche sans tri explicite : pertinence décroissante
+        assert sql.rsplit("order by", 1)[1].startswith(" match (")
+
+
+@pytest.mark.asyncio
+async def test_composed_filters_select_expected_products(db, engine):
+    categories = CategoryRepository(db)
+    maison = await categories.create({"name": "Maison", "slug": "maison"})
+    salon = await categories.create({"name": "Salon", "slug": "salon", "parent_id": maison.id})
+    jardin = await categories.create({"name": "Jardin", "slug": "jardin"})
+    
+    rows = [
+        # (nom, prix, prix promo, catégorie)
+        ("Lampe salon", "30.00", "25.00", salon.id),
+        ("Lampe maison", "20.00", "15.00", maison.id),
+        ("Lampe chère", "90.00", "80.00", salon.id),
+        ("Lampe pleine", "30.00", None, salon.id),
+        ("Lampe jardin", "30.00", "25.00", jardin.id),
+        ("Chaise", "30.00", "25.00", salon.id),
+    ]
+    products = [
+        Product(
+            name=name,
+            slug=f"produit-{i}",
+            price=Decimal(price),
+            sale_price=Decimal(sale_price) if sale_price else None
+        )
+        for i, (name, price, sale_price, _) in enumerate(rows)
+    ]
+    db.add_all(products)
+    await db.flush()
+    await db.execute(insert(product_categories), [
+        {"product_id": product.id, "category_id": category_id}
+        for product, (*_, category_id) in zip(products, rows)
+    ])
+    await db.commit()
+    
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    filters = ProductFilterParams(
+        search="la",
+        category_id=maison.id,
+        max_price=Decimal("50"),
+        on_sale=True,
+        sort_by="price",
+        sort_order="desc"
+    )
+    
+    found = await ProductRepository(db).find(ProductQuerySpec.from_filters(filters))
+    
+    # Sous-catégorie incluse ; prix, promotion et recherche combinés
+    assert [product.name for product in found] == ["Lampe salon", "Lampe maison"]
+    assert len([statement for statement in statements if "FROM products" in statement]) == 1
+
+
+# ===== Listing paginé avec total =====
+@pytest.mark.asyncio
+async def test_find_with_total_counts_whole_listing(db):
+    db.add_all([
+        Product(name=f"Produit {i}", slug=f"produit-{i}", price=Decimal("10.00") + i, stock=i % 2)
+        for i in range(6)
+    ])
+    await db.commit()
+    repo = ProductRepository(db)
+    spec = ProductQuerySpec().in_stock().sort("price", "asc")
+    
+    products, total = await repo.find_with_total(spec, skip=1, limit=1)
+    assert [product.slug for product in products] == ["produit-3"]
+    assert total == 3
+    
+    # Avec un curseur, le total porte sur tout le listing, pas sur la suite
+    spec.after(Cursor.from_item(products[0], "price"))
+    products, total = await repo.find_with_total(spec, limit=10)
+    assert [product.slug for product in products] == ["produit-5"]
+    assert total == 3
+    
+    # Offset au-delà du listing : total conservé
+    assert await repo.find_with_total(ProductQuerySpec().in_stock(), skip=50, limit=10) == ([], 3)
+
+
+# ===== Recherche par préfixe (termes courts) =====
+def test_prefix_search_compiles_to_index_friendly_like():
+    query = ProductQuerySpec().matching("ab").to_query()
+    sql = str(query.compile(dialect=mysql.dialect())).lower()
+    
+    assert "like" in sql
+    assert "lower(" not in sql
+
+
+@pytest.mark.asyncio
+async def test_short_term_matches_name_and_sku_prefix(db):
+    await _add_products(
+        db,
+        ("Ab lampe", None),
+        ("Chaise", "AB-12"),
+        ("Tab", None),
+    )
+    
+    products = await ProductRepository(db).search("ab")
+    
+    assert sorted(product.name for product in products) == ["Ab lampe", "Chaise"]
+
+
+@pytest.mark.asyncio
+async def test_wildcards_in_term_are_matched_literally(db):
+    await _add_products(
+        db,
+        ("5% remise", None),
+        ("50 tasses", None),
+        ("a_b", None),
+        ("abc", None),
+    )
+    repo = ProductRepository(db)
+    
+    assert [product.name for product in await repo.search("5%")] == ["5% remise"]
+    assert [product.name for product in await repo.search("a_")] == ["a_b"]
+
+
+# ===== Plans d'exécution (MySQL) =====
+@pytest.mark.asyncio
+async def test_search_plans_use_indexes(mysql_session_maker):
+    async with mysql_session_maker() as session:
+        # Noms préfixés par deux lettres variées : un préfixe court reste sélectif
+        rows = [
+            {
+                "name": f"{chr(97 + n % 26)}{chr(97 + n // 26 % 26)} {word} {n}",
+                "slug": f"{word}-{n}",
+                "sku": f"{word[:3].upper()}-{n:05d}",
+                "description": f"{word} en bois, modèle {n}",
+                "price": Decimal("19.90"),
+                "stock": n % 7,
+                "is_active": True,
+            }
+            for n in range(500)
+            for word in WORDS
+        ]
+        await session.execute(insert(Product), rows)
+        await session.commit()
+        await session.execute(text("ANALYZE TABLE products"))
+        
+        # Terme court : parcours d'index sur le nom et/ou le SKU, jamais un scan complet
+        plan = await _explain(session, ProductQuerySpec().matching("qd"))
+        assert plan["type"] in ("range", "index_merge")
+        assert plan["key"] is not None
+        
+        # Terme indexable : index FULLTEXT
+        plan = await _explain(session, ProductQuerySpec().matching("miroir"))
+        assert plan["type"] == "fulltext"
+        assert plan["key"] == "ix_products_fulltext"
@@ -0,0 +1,140 @@
+"""
+Tests du profilage SQL par requête HTTP
+"""
+
+import json
+import logging
+import re
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core import profiling
+from app.core.config import settings
+from app.core.profiling import (
+    RequestProfile,
+    SLOWEST_STATEMENTS,
+    install_sql_profiling,
+    log_profile,
+    start_profile,
+    statement_shape
+)
+from app.main import app
+
+
+# ===== Forme des requêtes =====
+def test_statement_shape_collapses_in_lists():
+    shapes = {
+        statement_shape("SELECT * FROM products WHERE id IN (%s, %s, %s)"),
+        statement_shape("SELECT * FROM products WHERE id IN (%s)"),
+        statement_shape("SELECT * FROM products\n  WHERE id IN (?, ?)"),
+        statement_shape("SELECT * FROM products WHERE id IN (%(id_1)s, %(id_2)s)"),
+        statement_shape("SELECT * FROM products WHERE id IN (:id_1, :id_2)"),
+    }
+    
+    assert shapes == {"SELECT * FROM products WHERE id IN (?)"}
+
+
+def test_statement_shape_collapses_multi_row_values():
+    single = statement_shape("INSERT INTO email_outbox (to_email, subject) VALUES (%s, %s)")
+    multi = statement_shape(
+        "INSERT INTO email_outbox (to_email, subject) VALUES (%s, %s), (%s, %s), (%s, %s)"
+    )
+    
+    assert single == multi == "INSERT INTO email_outbox (to_email, subject) VALUES (?)"
+
+
+def test_statement_shape_keeps_scalar_parameters():
+    assert statement_shape("SELECT * FROM products WHERE id = %s AND stock > %s") == (
+        "SELECT * FROM products WHERE id = %s AND stock > %s"
+    )
+
+
+# ===== Profil d'une requête HTTP =====
+def test_slowest_statements_keep_the_top_n():
+    profile = RequestProfile("GET", "/")
+    
+    for i, duration in enumerate([0.003, 0.010, 0.001, 0.007, 0.020, 0.002, 0.015, 0.004]):
+        profile.record(f"SELECT {i}", duration)
+    
+    slowest = profile.slowest()
+    assert len(slowest) == SLOWEST_STATEMENTS
+    assert [entry["ms"] for entry in slowest] == [20.0, 15.0, 10.0, 7.0, 4.0]
+    assert slowest[0]["sql"] == "SELECT 4"
+    assert profile.query_count == 8
+    assert profile.db_time == pytest.approx(0.062)
+
+
+def test_repeated_statements_flag_n_plus_one():
+    profile = RequestProfile("GET", "/api/v1/orders")
+    
+    profile.record("SELECT * FROM orders", 0.001)
+    for product_id in range(12):
+        profile.record(f"SELECT * FROM products WHERE id IN ({', '.join(['%s'] * (product_id + 1))})", 0.001)
+    for _ in range(3):
+        profile.record("SELECT * FROM users WHERE id = %s", 0.001)
+    
+    assert profile.repeated_statements(10) == [
+        {"count": 12, "sql": "SELECT * FROM products WHERE id IN (?)"},
+    ]
+    assert [entry["count"] for entry in profile.repeated_statements(2)] == [12, 3]
+
+
+def test_n_plus_one_is_logged_as_warning(caplog, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_N_PLUS_ONE_THRESHOLD", 2)
+    profile = RequestProfile("GET", "/api/v1/cart")
+    for _ in range(3):
+        profile.record("SELECT * FROM products WHERE id = %s", 0.001)
+    
+    with caplog.at_level(logging.INFO, logger=profiling.__name__):
+        log_profile(profile, 200)
+    
+    [record] = caplog.records
+    assert record.levelno == logging.WARNING
+    summary = json.loads(record.getMessage())
+    assert summary["queries"] == 3
+    assert summary["n_plus_one"] == [{"count": 3, "sql": "SELECT * FROM products WHERE id = %s"}]
+
+
+@pytest.mark.asyncio
+async def test_engine_statements_are_recorded_in_current_profile():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    install_sql_profiling(engine.sync_engine)
+    
+    # Hors requête HTTP : rien n'est enregistré
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    
+    profile = start_profile("GET", "/")
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        await conn.execute(text("SELECT 2"))
+    
+    assert profile.query_count == 2
+    assert profile.db_time > 0
+    assert re.fullmatch(r'db;dur=[\d.]+;desc="2 queries", total;dur=[\d.]+', profile.server_timing())
+    await engine.dispose()
+
+
+# ===== En-tête Server-Timing =====
+@pytest.mark.asyncio
+async def test_server_timing_header(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/")
+    
+    assert re.fullmatch(r'db;dur=0\.00;desc="0 queries", total;dur=[\d.]+', response.headers["Server-Timing"])
+    
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/")
+    
+    assert "Server-Timing" not in response.headers
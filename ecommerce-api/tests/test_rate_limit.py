@@ -0,0 +1,161 @@
+"""
+Tests de la limitation de débit (token bucket)
+"""
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.rate_limit import (
+    LocalTokenBucketStore,
+    RateLimiter,
+    SEARCH_COST,
+    rate_limiter
+)
+from app.core.security import create_access_token, create_refresh_token
+from app.main import app
+
+
+API = settings.API_V1_PREFIX
+
+
+def _request(
+    method: str = "GET",
+    path: str = f"{API}/products",
+    query: str = "",
+    authorization: str = None,
+    host: str = "10.0.0.1"
+) -> Request:
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query.encode(),
+        "headers": headers,
+        "client": (host, 1234),
+    })
+
+
+@pytest.fixture
+def limiter():
+    # 60 / minute : un jeton rechargé par seconde
+    return RateLimiter(LocalTokenBucketStore(), ip_per_minute=60, user_per_minute=120)
+
+
+# ===== Seaux =====
+def test_bucket_refills_over_time_up_to_capacity():
+    store = LocalTokenBucketStore()
+    
+    assert store.take_now("ip:a", 10, capacity=10, refill_rate=1, now=0) == (True, 0)
+    assert store.take_now("ip:a", 1, capacity=10, refill_rate=1, now=0) == (False, 0)
+    
+    # 3 secondes : 3 jetons rechargés
+    assert store.take_now("ip:a", 1, capacity=10, refill_rate=1, now=3) == (True, 2)
+    
+    # Longue inactivité : plafonné à la capacité
+    assert store.take_now("ip:a", 1, capacity=10, refill_rate=1, now=1000) == (True, 9)
+
+
+def test_shards_evict_least_recently_used_bucket():
+    store = LocalTokenBucketStore(shards=1, shard_size=2)
+    
+    store.take_now("ip:a", 5, capacity=10, refill_rate=0, now=0)
+    store.take_now("ip:b", 5, capacity=10, refill_rate=0, now=0)
+    store.take_now("ip:a", 1, capacity=10, refill_rate=0, now=0)
+    
+    # Troisième seau : "b", le moins récemment utilisé, est évincé
+    store.take_now("ip:c", 1, capacity=10, refill_rate=0, now=0)
+    assert sum(len(shard) for shard in store._shards) == 2
+    
+    # "a" garde son état ; "b" repart d'un seau plein
+    assert store.take_now("ip:a", 1, capacity=10, refill_rate=0, now=0) == (True, 3)
+    assert store.take_now("ip:b", 1, capacity=10, refill_rate=0, now=0) == (True, 9)
+
+
+# ===== Coût et identification =====
+def test_weighted_cost_for_login_and_search():
+    assert RateLimiter.request_cost(_request("POST", f"{API}/auth/login")) == 5
+    assert RateLimiter.request_cost(_request("POST", f"{API}/auth/login/")) == 5
+    assert RateLimiter.request_cost(_request(query="search=lampe")) == SEARCH_COST
+    assert RateLimiter.request_cost(_request()) == 1
+    assert RateLimiter.request_cost(_request(query="category_id=3")) == 1
+
+
+def test_authenticated_requests_use_user_bucket(limiter):
+    token = create_access_token({"sub": "7"})
+    
+    assert limiter.identify(_request(authorization=f"Bearer {token}")) == ("user:7", 120)
+    assert limiter.identify(_request()) == ("ip:10.0.0.1", 60)
+    
+    # Token invalide ou de rafraîchissement : retour à l'IP
+    assert limiter.identify(_request(authorization="Bearer invalide")) == ("ip:10.0.0.1", 60)
+    refresh = create_refresh_token({"sub": "7"})
+    assert limiter.identify(_request(authorization=f"Bearer {refresh}")) == ("ip:10.0.0.1", 60)
+
+
+@pytest.mark.asyncio
+async def test_user_and_ip_buckets_are_independent(limiter):
+    token = create_access_token({"sub": "7"})
+    
+    for _ in range(60):
+        assert (await limiter.check(_request())).allowed
+    
+    assert not (await limiter.check(_request())).allowed
+    assert (await limiter.check(_request(authorization=f"Bearer {token}"))).allowed
+    assert (await limiter.check(_request(host="10.0.0.2"))).allowed
+
+
+@pytest.mark.asyncio
+async def test_refused_decision_reports_retry_delay(limiter):
+    for _ in range(12):
+        await limiter.check(_request("POST", f"{API}/auth/login"))
+    
+    decision = await limiter.check(_request("POST", f"{API}/auth/login"))
+    
+    assert not decision.allowed
+    assert decision.remaining == 0
+    assert 1 <= decision.retry_after <= 5
+    assert decision.headers()["Retry-After"] == str(decision.retry_after)
+
+
+# ===== Middleware =====
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "ip_per_minute", 2)
+    store = rate_limiter.store
+    rate_limiter.use_store(LocalTokenBucketStore())
+    
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    
+    rate_limiter.use_store(store)
+
+
+@pytest.mark.asyncio
+async def test_middleware_returns_429_with_headers(client):
+    # Route inconnue : aucune base nécessaire, mais la requête est limitée
+    for remaining in (1, 0):
+        response = await client.get(f"{API}/introuvable")
+        assert response.status_code == 404
+        assert response.headers["X-RateLimit-Limit"] == "2"
+        assert response.headers["X-RateLimit-Remaining"] == str(remaining)
+        assert "Retry-After" not in response.headers
+    
+    response = await client.get(f"{API}/introuvable")
+    
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+    assert int(response.headers["X-RateLimit-Reset"]) >= 1
+
+
+@pytest.mark.asyncio
+async def test_exempt_paths_are_not_limited(client):
+    for _ in range(5):
+        response = await client.get("/")
+        assert response.status_code == 200
+        assert "X-RateLimit-Limit" not in response.headers
@@ -0,0 +1,170 @@
+"""
+Tests des agrégats de notes (product_rating_stats)
+Les agrégats sont maintenus par upsert MySQL : base MySQL de TEST_DATABASE_URL
+"""
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.product import Product
+from app.models.review import ProductRatingStats, Review
+from app.models.user import User
+from app.repositories.review import RATING_COLUMNS, ReviewRepository
+
+
+async def _seed(session, products: int = 1) -> tuple:
+    """
+    Returns:
+        (ID du client, IDs des produits)
+    """
+    user = User(first_name="Client", last_name="Test", email="client@example.com", password_hash="x")
+    rows = [
+        Product(name=f"Produit {i}", slug=f"produit-{i}", price=Decimal("10.00"), stock=1)
+        for i in range(products)
+    ]
+    session.add_all([user, *rows])
+    await session.commit()
+    return user.id, [product.id for product in rows]
+
+
+async def _stats(session, product_id: int) -> tuple:
+    """(Nombre d'avis, somme des notes, {note: nombre}) lus en base"""
+    result = await session.execute(
+        select(
+            ProductRatingStats.review_count,
+            ProductRatingStats.rating_sum,
+            *[getattr(ProductRatingStats, column) for column in RATING_COLUMNS.values()]
+        )
+        .where(ProductRatingStats.product_id == product_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return 0, 0, {}
+    
+    review_count, rating_sum, *counts = row
+    distribution = {rating: count for rating, count in zip(RATING_COLUMNS, counts) if count}
+    return review_count, rating_sum, distribution
+
+
+async def _truth(session, product_id: int) -> tuple:
+    """Agrégats recalculés depuis les avis approuvés"""
+    result = await session.execute(
+        select(Review.rating).where(Review.product_id == product_id, Review.is_approved == True)
+    )
+    ratings = result.scalars().all()
+    distribution = {rating: ratings.count(rating) for rating in set(ratings)}
+    return len(ratings), sum(ratings), distribution
+
+
+@pytest.mark.asyncio
+async def test_approve_and_reject_move_rating_in_and_out(mysql_session_maker):
+    async with mysql_session_maker() as session:
+        user_id, [product_id] = await _seed(session)
+        repo = ReviewRepository(session)
+        
+        review = await repo.create({"product_id": product_id, "user_id": user_id, "rating": 4})
+        await session.commit()
+        assert await _stats(session, product_id) == (0, 0, {})
+        
+        await repo.approve(review.id)
+        await session.commit()
+        assert await _stats(session, product_id) == (1, 4, {4: 1})
+        
+        # Approbation répétée : transition nulle, pas de double comptage
+        await repo.approve(review.id)
+        await session.commit()
+        assert await _stats(session, product_id) == (1, 4, {4: 1})
+        
+        await repo.reject(review.id)
+        await session.commit()
+        assert await _stats(session, product_id) == (0, 0, {})
+
+
+@pytest.mark.asyncio
+async def test_rating_change_on_approved_review_moves_distribution(mysql_session_maker):
+    async with mysql_session_maker() as session:
+        user_id, [product_id] = await _seed(session)
+        repo = ReviewRepository(session)
+        
+        review = await repo.create({"product_id": product_id, "user_id": user_id, "rating": 2, "is_approved": True})
+        await repo.create({"product_id": product_id, "user_id": user_id, "rating": 5, "is_approved": True})
+        await session.commit()
+        assert await _stats(session, product_id) == (2, 7, {2: 1, 5: 1})
+        
+        await repo.update(review.id, {"rating": 5})
+        await session.commit()
+        assert await _stats(session, product_id) == (2, 10, {5: 2})
+        
+        # Commentaire seul : agrégats inchangés
+        await repo.update(review.id, {"comment": "Très bien"})
+        await session.commit()
+        assert await _stats(session, product_id) == (2, 10, {5: 2})
+
+
+@pytest.mark.asyncio
+async def test_apply_transition_between_approval_states(mysql_session_maker):
+    async with mysql_session_maker() as session:
+        _, [product_id] = await _seed(session)
+        repo = ReviewRepository(session)
+        
+        await repo._apply_transition(product_id, (False, 3), (True, 3))
+        await repo._apply_transition(product_id, (True, 3), (True, 3))
+        assert await _stats(session, product_id) == (1, 3, {3: 1})
+        
+        await repo._apply_transition(product_id, (True, 3), (True, 1))
+        assert await _stats(session, product_id) == (1, 1, {1: 1})
+        
+        await repo._apply_transition(product_id, (True, 1), (False, 4))
+        assert await _stats(session, product_id) == (0, 0, {})
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_only_approved_ratings(mysql_session_maker):
+    async with mysql_session_maker() as session:
+        user_id, [product_id] = await _seed(session)
+        repo = ReviewRepository(session)
+        
+        approved = await repo.create({"product_id": product_id, "user_id": user_id, "rating": 3, "is_approved": True})
+        pending = await repo.create({"product_id": product_id, "user_id": user_id, "rating": 1})
+        await session.commit()
+        
+        assert await repo.delete(pending.id)
+        await session.commit()
+        assert await _stats(session, product_id) == (1, 3, {3: 1})
+        
+        assert await repo.delete(approved.id)
+        await session.commit()
+        assert await _stats(session, product_id) == (0, 0, {})
+        
+        assert not await repo.delete(approved.id)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_repairs_injected_drift(mysql_session_maker):
+    async with mysql_session_maker() as session:
+        user_id, [drifted, emptied, untouched] = await _seed(session, products=3)
+        repo = ReviewRepository(session)
+        
+        for product_id, rating in ((drifted, 4), (drifted, 5), (emptied, 2), (untouched, 3)):
+            await repo.create({"product_id": product_id, "user_id": user_id, "rating": rating, "is_approved": True})
+        await session.commit()
+        
+        # Écarts injectés : compteurs faussés, avis désapprouvé hors repository
+        await session.execute(
+            update(ProductRatingStats)
+            .where(ProductRatingStats.product_id == drifted)
+            .values(review_count=ProductRatingStats.review_count + 3, rating_1=7)
+        )
+        await session.execute(
+            update(Review).where(Review.product_id == emptied).values(is_approved=False)
+        )
+        await session.commit()
+        
+        assert await repo.reconcile_rating_stats() > 0
+        await session.commit()
+        
+        assert await _stats(session, drifted) == await _truth(session, drifted) == (2, 9, {4: 1, 5: 1})
+        assert await _stats(session, emptied) == await _truth(session, emptied) == (0, 0, {})
+        assert await _stats(session, untouched) == (1, 3, {3: 1})
@@ -0,0 +1,140 @@
+"""
+Tests des agrégats journaliers (journal de deltas, report, réconciliation)
+Le report et la réconciliation (upsert MySQL, verrous) utilisent la base
+MySQL de TEST_DATABASE_URL
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.models.order import Order, OrderStatus
+from app.models.statistics import OrderDailyStats, OrderStatsDelta
+from app.models.user import User
+from app.repositories.order import OrderRepository
+from app.repositories.statistics import StatisticsRepository
+
+
+async def _create_orders(session, *amounts: str) -> List[int]:
+    user_id = (await session.execute(select(User.id).limit(1))).scalar_one_or_none()
+    if user_id is None:
+        user = User(first_name="Client", last_name="Test", email="client@example.com", password_hash="x")
+        session.add(user)
+        await session.flush()
+        user_id = user.id
+    
+    repo = OrderRepository(session)
+    ids = [
+        (await repo.create({"user_id": user_id, "total_amount": Decimal(amount)})).id
+        for amount in amounts
+    ]
+    await session.commit()
+    return ids
+
+
+async def _totals(stats: StatisticsRepository) -> dict:
+    """Totaux lus (agrégats + deltas), statuts vides exclus"""
+    return {
+        row_status: counts
+        for row_status, counts in (await stats.get_totals(Order)).items()
+        if counts[0] != 0
+    }
+
+
+async def _truth(session) -> dict:
+    """Totaux par statut calculés directement sur la table orders"""
+    result = await session.execute(
+        select(Order.status, func.count(), func.sum(Order.total_amount)).group_by(Order.status)
+    )
+    return {row_status: (total, amount) for row_status, total, amount in result.all()}
+
+
+async def _pending_deltas(session) -> int:
+    return (await session.execute(select(func.count(OrderStatsDelta.id)))).scalar_one()
+
+
+# ===== Journal de deltas (lectures agrégats + deltas) =====
+@pytest.mark.asyncio
+async def test_reads_include_pending_deltas(db):
+    first, second, _ = await _create_orders(db, "10.00", "20.00", "30.00")
+    repo = OrderRepository(db)
+    
+    await repo.update_status(first, OrderStatus.PAID)
+    await repo.bulk_update_status([first, second], OrderStatus.SHIPPED)
+    await db.commit()
+    
+    stats = StatisticsRepository(db)
+    assert await _totals(stats) == {
+        OrderStatus.PENDING: (1, Decimal("30.00")),
+        OrderStatus.SHIPPED: (2, Decimal("30.00")),
+    }
+    
+    daily = await stats.get_daily(Order, date.today() - timedelta(days=1), date.today() + timedelta(days=1))
+    assert [(row_status, total) for _, row_status, total, _ in daily] == [
+        (OrderStatus.PENDING, 1),
+        (OrderStatus.SHIPPED, 2),
+    ]
+
+
+# ===== Report et réconciliation (MySQL) =====
+@pytest.mark.asyncio
+async def test_fold_then_read_is_consistent(mysql_session_maker):
+    async with mysql_session_maker() as session:
+        first, second, _ = await _create_orders(session, "10.00", "20.00", "30.00")
+        repo = OrderRepository(session)
+        await repo.update_status(first, OrderStatus.PAID)
+        await repo.update_status(second, OrderStatus.CANCELLED)
+        await session.commit()
+        
+        stats = StatisticsRepository(session)
+        before = await _totals(stats)
+        
+        assert await stats.fold_deltas(Order) > 0
+        await session.commit()
+        
+        assert await _pending_deltas(session) == 0
+        assert await _totals(stats) == before == await _truth(session)
+        
+        # Rien à reporter : lecture inchangée
+        assert await stats.fold_deltas(Order) == 0
+        assert await _totals(stats) == before
+
+
+@pytest.mark.asyncio
+async def test_reconcile_keeps_pending_deltas(mysql_session_maker):
+    async with mysql_session_maker() as session:
+        first, _ = await _create_orders(session, "10.00", "20.00")
+        stats = StatisticsRepository(session)
+        await stats.fold_deltas(Order)
+        await session.commit()
+        
+        # Deltas en attente au moment de la réconciliation
+        await _create_orders(session, "40.00")
+        await OrderRepository(session).update_status(first, OrderStatus.PAID)
+        await session.commit()
+        pending = await _pending_deltas(session)
+        assert pending > 0
+        
+        # Écart injecté dans les agrégats
+        await session.execute(
+            update(OrderDailyStats)
+            .where(OrderDailyStats.status == OrderStatus.PENDING)
+            .values(total=OrderDailyStats.total + 5)
+        )
+        await session.commit()
+        
+        await stats.reconcile(Order)
+        await session.commit()
+        
+        truth = await _truth(session)
+        assert await _pending_deltas(session) == pending
+        assert await _totals(stats) == truth
+        
+        # Les deltas conservés ne sont pas comptés deux fois au report
+        await stats.fold_deltas(Order)
+        await session.commit()
+        assert await _pending_deltas(session) == 0
+        assert await _totals(stats) == truth
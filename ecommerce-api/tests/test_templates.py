@@ -0,0 +1,80 @@
+"""
+Tests des templates d'emails (compilation, échappement, locales)
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from app.core.templates import EMAIL_TEMPLATES_DIR, EmailTemplates
+from app.models.email_outbox import EmailOutbox
+from app.models.order import OrderStatus
+from app.services.email import EmailService
+
+
+@pytest.fixture
+def templates():
+    templates = EmailTemplates(EMAIL_TEMPLATES_DIR, "fr")
+    templates.load()
+    return templates
+
+
+def test_user_fields_are_escaped(templates):
+    html = templates.render(
+        "order_cancelled",
+        user=SimpleNamespace(first_name="<b>Jo</b>"),
+        order=SimpleNamespace(id=7),
+        reason='<script>alert("x")</script>'
+    )
+    
+    assert "Bonjour &lt;b&gt;Jo&lt;/b&gt;," in html
+    assert "&lt;script&gt;" in html
+    assert "<b>Jo" not in html
+    assert "<script>" not in html
+    assert "Votre commande #7 a été annulée." in html
+
+
+def test_unknown_locale_falls_back_to_default(templates):
+    template = templates.get("order_shipped", locale="en")
+    
+    assert template.name == "fr/order_shipped.html"
+    assert templates.get("order_shipped", locale="en") is template
+    assert templates.get("order_shipped") is template
+
+
+def test_templates_are_compiled_once(tmp_path):
+    (tmp_path / "fr").mkdir()
+    source = tmp_path / "fr" / "hello.html"
+    source.write_text("Bonjour {{ name }}")
+    
+    templates = EmailTemplates(tmp_path, "fr")
+    assert templates.load() == 1
+    
+    # Fichier modifié après le chargement : le template compilé est conservé
+    source.write_text("Au revoir {{ name }}")
+    assert templates.render("hello", name="Jo") == "Bonjour Jo"
+
+
+@pytest.mark.asyncio
+async def test_status_notifications_are_rendered_per_recipient(db):
+    recipients = [
+        (SimpleNamespace(id=1, email="jo@example.com", first_name="<i>Jo</i>"), SimpleNamespace(id=10)),
+        (SimpleNamespace(id=2, email="max@example.com", first_name="Max"), SimpleNamespace(id=11)),
+    ]
+    service = EmailService(db)
+    
+    assert await service.send_order_status_notifications(OrderStatus.SHIPPED, recipients) == 2
+    # Statut sans notification : rien n'est mis en file
+    assert await service.send_order_status_notifications(OrderStatus.PAID, recipients) == 0
+    await db.commit()
+    
+    result = await db.execute(select(EmailOutbox).order_by(EmailOutbox.id))
+    emails = result.scalars().all()
+    
+    assert [(email.to_email, email.subject) for email in emails] == [
+        ("jo@example.com", "Votre commande #10 a été expédiée"),
+        ("max@example.com", "Votre commande #11 a été expédiée"),
+    ]
+    assert "Bonjour &lt;i&gt;Jo&lt;/i&gt;," in emails[0].html_content
+    assert "Votre commande #11 a été expédiée." in emails[1].html_content